@@ -0,0 +1,220 @@
+"""
+Пропускная способность главной и страниц новостей: WSGI против ASGI.
+
+Скрипт создаёт временную базу с новостями и комментариями, по очереди
+поднимает локальный сервер в двух вариантах и нагружает его заданным
+числом одновременных соединений:
+
+* WSGI — manage.py runserver (поток на соединение), синхронные views;
+* ASGI — uvicorn (pip install uvicorn), NEWS_ASYNC_VIEWS = True.
+
+Запуск из корня репозитория:
+    python benchmarks/asgi_vs_wsgi.py --concurrency 10 100 500
+    python benchmarks/asgi_vs_wsgi.py --no-cache  # без кэша страниц
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+PROJECT_DIR = BASE_DIR / 'ya_news'
+
+SETTINGS = '''from yanews.settings import *  # noqa
+
+DEBUG = False
+DATABASES['default']['NAME'] = {database!r}
+NEWS_ASYNC_VIEWS = {async_views}
+'''
+NO_CACHE = '''
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+'''
+
+
+def write_settings(directory, no_cache):
+    database = str(Path(directory) / 'db.sqlite3')
+    for name, async_views in (('bench_wsgi', False), ('bench_asgi', True)):
+        text = SETTINGS.format(database=database, async_views=async_views)
+        if no_cache:
+            text += NO_CACHE
+        (Path(directory) / f'{name}.py').write_text(text)
+
+
+def server_env(directory, settings_module):
+    env = dict(os.environ)
+    env['DJANGO_SETTINGS_MODULE'] = settings_module
+    env['PYTHONPATH'] = os.pathsep.join(
+        [directory, str(PROJECT_DIR), env.get('PYTHONPATH', '')]
+    )
+    return env
+
+
+def seed(directory, news_count, comments_per_news):
+    """Мигрирует временную базу и наполняет её в отдельном процессе."""
+    script = f'''
+import django
+django.setup()
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from news.models import Comment, News
+call_command('migrate', verbosity=0)
+author = get_user_model().objects.create(username='bench')
+News.objects.bulk_create(
+    News(title=f'Новость {{i}}', text='Текст новости. ' * 50)
+    for i in range({news_count})
+)
+Comment.objects.bulk_create(
+    Comment(news=news, author=author, text=f'Комментарий {{i}}')
+    for news in News.objects.all()
+    for i in range({comments_per_news})
+)
+'''
+    subprocess.run(
+        [sys.executable, '-c', script],
+        env=server_env(directory, 'bench_wsgi'),
+        cwd=PROJECT_DIR,
+        check=True,
+    )
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Сервер не запустился на порту {port}.')
+
+
+def start_server(kind, directory, port):
+    if kind == 'wsgi':
+        command = [
+            sys.executable, 'manage.py', 'runserver', '--noreload',
+            f'127.0.0.1:{port}',
+        ]
+        settings_module = 'bench_wsgi'
+    else:
+        command = [
+            sys.executable, '-m', 'uvicorn', 'yanews.asgi:application',
+            '--port', str(port), '--log-level', 'warning',
+            '--backlog', '4096',
+        ]
+        settings_module = 'bench_asgi'
+    process = subprocess.Popen(
+        command,
+        cwd=PROJECT_DIR,
+        env=server_env(directory, settings_module),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    wait_for_port(port)
+    return process
+
+
+async def fetch(port, path):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(
+        f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n'
+        'Connection: close\r\n\r\n'.encode()
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    await reader.read()
+    writer.close()
+    return int(status_line.split()[1])
+
+
+async def load(port, paths, concurrency, duration):
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + duration
+
+    async def worker(offset):
+        nonlocal errors
+        index = offset
+        while time.monotonic() < deadline:
+            started = time.monotonic()
+            try:
+                status = await fetch(port, paths[index % len(paths)])
+            except OSError:
+                status = None
+            if status == 200:
+                latencies.append(time.monotonic() - started)
+            else:
+                errors += 1
+            index += concurrency
+
+    started = time.monotonic()
+    await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    return latencies, errors, time.monotonic() - started
+
+
+def percentile(values, share):
+    if not values:
+        return float('nan')
+    return statistics.quantiles(values, n=100)[share - 1] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--concurrency', type=int, nargs='+', default=[10, 100, 500]
+    )
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--news', type=int, default=200)
+    parser.add_argument('--comments', type=int, default=20)
+    parser.add_argument(
+        '--no-cache', action='store_true',
+        help='отключить кэш страниц (DummyCache)'
+    )
+    parser.add_argument(
+        '--servers', nargs='+', choices=('wsgi', 'asgi'),
+        default=['wsgi', 'asgi']
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_settings(directory, args.no_cache)
+        seed(directory, args.news, args.comments)
+        paths = ['/'] + [f'/news/{pk}/' for pk in range(1, args.news + 1)]
+        print(
+            f'{"сервер":<6} {"conn":>5} {"req/s":>8} {"p50, мс":>8} '
+            f'{"p99, мс":>8} {"ошибки":>7}'
+        )
+        for kind in args.servers:
+            port = free_port()
+            process = start_server(kind, directory, port)
+            try:
+                for concurrency in args.concurrency:
+                    latencies, errors, elapsed = asyncio.run(
+                        load(port, paths, concurrency, args.duration)
+                    )
+                    print(
+                        f'{kind:<6} {concurrency:>5} '
+                        f'{len(latencies) / elapsed:>8.0f} '
+                        f'{percentile(latencies, 50):>8.1f} '
+                        f'{percentile(latencies, 99):>8.1f} {errors:>7}'
+                    )
+            finally:
+                process.terminate()
+                process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+SQL-запросы на запрос авторизованного пользователя: сессии в БД
+и AuthenticationMiddleware (по умолчанию) против cached_db и кэша
+пользователя (USER_CACHE_ENABLED).
+
+Каждая страница запрашивается --requests раз одним клиентом после входа;
+кэш страниц для анонимов здесь не участвует.
+
+Запуск из корня репозитория:
+    python benchmarks/auth_queries.py --requests 20
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / 'ya_news'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    CaptureQueriesContext, setup_test_environment,
+)
+from django.urls import reverse  # noqa: E402
+
+from news.models import Comment, News  # noqa: E402
+
+CACHED = {
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+    'USER_CACHE_ENABLED': True,
+}
+
+
+def measure(pages, requests):
+    user = get_user_model().objects.get(username='bench')
+    client = Client()
+    client.force_login(user)
+    result = {}
+    for title, url in pages:
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(requests):
+                client.get(url)
+        result[title] = len(queries) / requests
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+    author = get_user_model().objects.create(username='bench')
+    news = News.objects.create(title='Новость', text='Текст')
+    Comment.objects.create(news=news, author=author, text='Комментарий')
+    pages = (
+        ('home', reverse('news:home')),
+        ('detail', reverse('news:detail', args=(news.pk,))),
+        ('edit', reverse('news:edit', args=(news.comment_set.get().pk,))),
+    )
+    before = measure(pages, args.requests)
+    with override_settings(**CACHED):
+        after = measure(pages, args.requests)
+
+    print(f'{"страница":<8} {"было":>6} {"стало":>6} {"экономия":>9}')
+    for title, _ in pages:
+        print(
+            f'{title:<8} {before[title]:>6.2f} {after[title]:>6.2f} '
+            f'{before[title] - after[title]:>9.2f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
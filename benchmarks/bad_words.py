@@ -0,0 +1,66 @@
+"""
+Сравнение проверки запрещённых слов: цикл по списку против trie-выражения.
+
+Запуск из корня репозитория:
+    python benchmarks/bad_words.py --words 5000 --length 2000
+"""
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / 'ya_news'))
+
+from news.badwords import build_regex  # noqa: E402
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+
+
+def random_word(rng):
+    return ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(4, 10)))
+
+
+def loop_matcher(words):
+    """Исходная реализация CommentForm.clean_text."""
+    def match(text):
+        lowered_text = text.lower()
+        for word in words:
+            if word in lowered_text:
+                return True
+        return False
+    return match
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--words', type=int, default=5000)
+    parser.add_argument('--length', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    words = list({random_word(rng) for _ in range(args.words)})
+    # Чистый текст — худший случай: проверяются все слова списка.
+    text = ' '.join(
+        random_word(rng).upper() for _ in range(args.length)
+    )
+    words = [word for word in words if word not in text.lower()]
+
+    build_time = timeit.timeit(lambda: build_regex(words), number=1)
+    regex = build_regex(words)
+    loop = loop_matcher(words)
+    assert regex.search(text) is None and not loop(text)
+
+    loop_time = timeit.timeit(lambda: loop(text), number=args.repeat)
+    regex_time = timeit.timeit(lambda: regex.search(text), number=args.repeat)
+    print(f'Слов в списке: {len(words)}, слов в тексте: {args.length}')
+    print(f'Сборка выражения:  {build_time * 1000:.1f} мс')
+    print(f'Цикл по списку:    {loop_time / args.repeat * 1000:.2f} мс')
+    print(f'Trie-выражение:    {regex_time / args.repeat * 1000:.2f} мс')
+    print(f'Ускорение:         {loop_time / regex_time:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,418 @@
+"""
+Сквозной бенчмарк обоих проектов: задержки, запросы к БД и пропускная
+способность основных страниц.
+
+Для каждого проекта создаётся временная база, которая наполняется
+командой seed_data. Затем сценарии прогоняются дважды:
+
+* client — django.test.Client в одном процессе, без сети; число
+  SQL-запросов считается через CaptureQueriesContext;
+* server — manage.py runserver и --concurrency одновременных соединений;
+  число запросов берётся из заголовка Server-Timing
+  (QUERY_BUDGET_ENABLED = True).
+
+Сценарии: news:home (аноним), news:detail и отправка комментария
+(авторизованный пользователь), notes:list, notes:add (POST с
+кириллическим заголовком и пустым slug) и notes:detail. Для каждого
+печатаются p50/p95/p99, запросы на запрос и запросы в секунду; результаты
+сохраняются в JSON (--output) для сравнения между коммитами.
+
+Запуск из корня репозитория:
+    python benchmarks/end_to_end.py
+    python benchmarks/end_to_end.py --requests 500 --output before.json
+    python benchmarks/end_to_end.py --projects ya_news --news 5000
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlencode
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+OUTPUT = BASE_DIR / '.benchmarks' / 'end_to_end.json'
+
+PROJECTS = {
+    'ya_news': {
+        'settings': 'yanews.settings',
+        'seed': ('--users', '--news', '--comments'),
+    },
+    'ya_note': {
+        'settings': 'yanote.settings',
+        'seed': ('--users', '--notes'),
+    },
+}
+SETTINGS = '''from {settings} import *  # noqa
+
+DEBUG = False
+ALLOWED_HOSTS = ['*']
+DATABASES['default']['NAME'] = {database!r}
+DATABASE_REPLICAS = []
+QUERY_BUDGET_ENABLED = True
+QUERY_BUDGET_LOG = {log!r}
+NEWS_COMMENT_RATE_LIMIT = (10 ** 9, 60)
+'''
+# Любая строка из 32 латинских букв и цифр подходит как секрет CSRF:
+# сервер сравнивает cookie с заголовком X-CSRFToken.
+CSRF_TOKEN = 'benchmark' * 3 + 'token'
+
+
+def news_scenarios():
+    from django.urls import reverse
+
+    from news.models import News
+
+    news = News.objects.order_by('-comment_count').first()
+    detail = reverse('news:detail', args=(news.pk,))
+    return [
+        ('news:home', 'GET', reverse('news:home'), None, False),
+        ('news:detail', 'GET', detail, None, True),
+        ('news:comment', 'POST', detail, {'text': 'Комментарий {i}'}, True),
+    ]
+
+
+def notes_scenarios(user):
+    from django.urls import reverse
+
+    from notes.models import Note
+
+    note = Note.objects.filter(author=user).order_by('pk').first()
+    return [
+        ('notes:list', 'GET', reverse('notes:list'), None, True),
+        (
+            'notes:add', 'POST', reverse('notes:add'),
+            {'title': 'Список покупок', 'text': 'Молоко {i}', 'slug': ''},
+            True,
+        ),
+        (
+            'notes:detail', 'GET', reverse('notes:detail', args=(note.slug,)),
+            None, True,
+        ),
+    ]
+
+
+def request_data(data, index):
+    if data is None:
+        return None
+    return {key: value.format(i=index) for key, value in data.items()}
+
+
+def summary(latencies, queries, errors, elapsed):
+    def percentile(share):
+        if not latencies:
+            return None
+        if len(latencies) == 1:
+            return round(latencies[0] * 1000, 3)
+        value = statistics.quantiles(latencies, n=100)[share - 1]
+        return round(value * 1000, 3)
+
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': percentile(50),
+        'p95_ms': percentile(95),
+        'p99_ms': percentile(99),
+        'queries': (
+            round(statistics.mean(queries), 2) if queries else None
+        ),
+        'throughput': round(len(latencies) / elapsed, 1) if elapsed else None,
+    }
+
+
+def worker(project, requests):
+    """
+    Выполняется внутри проекта: client-сценарии и сессия для server.
+
+    Печатает в stdout JSON со сценариями, их результатами и ключом
+    сессии авторизованного пользователя.
+    """
+    import django
+
+    django.setup()
+
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    # Самый активный пользователь seed_data — первый по закону Ципфа.
+    username = 'reader0' if project == 'ya_news' else 'writer0'
+    user = get_user_model().objects.get(username=username)
+    scenarios = (
+        news_scenarios() if project == 'ya_news' else notes_scenarios(user)
+    )
+    anonymous, authorized = Client(), Client()
+    authorized.force_login(user)
+    results = {}
+    for name, method, path, data, login in scenarios:
+        client = authorized if login else anonymous
+        latencies, queries, errors = [], [], 0
+        started = time.perf_counter()
+        for index in range(requests):
+            request_started = time.perf_counter()
+            with CaptureQueriesContext(connection) as captured:
+                if method == 'GET':
+                    response = client.get(path)
+                else:
+                    response = client.post(path, request_data(data, index))
+            if response.status_code >= 400:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - request_started)
+            queries.append(len(captured))
+        results[name] = summary(
+            latencies, queries, errors, time.perf_counter() - started
+        )
+    print(json.dumps({
+        'scenarios': scenarios,
+        'client': results,
+        'session': authorized.cookies[settings.SESSION_COOKIE_NAME].value,
+    }))
+
+
+def project_env(directory, project):
+    env = dict(os.environ)
+    env['DJANGO_SETTINGS_MODULE'] = f'bench_{project}'
+    env['PYTHONPATH'] = os.pathsep.join(
+        [directory, str(BASE_DIR / project), env.get('PYTHONPATH', '')]
+    )
+    return env
+
+
+def prepare(directory, project, args):
+    (Path(directory) / f'bench_{project}.py').write_text(SETTINGS.format(
+        settings=PROJECTS[project]['settings'],
+        database=str(Path(directory) / f'{project}.sqlite3'),
+        log=str(Path(directory) / f'{project}.jsonl'),
+    ))
+    seed_options = []
+    for option in PROJECTS[project]['seed']:
+        seed_options += [option, str(getattr(args, option[2:]))]
+    for command in (['migrate'], ['seed_data', *seed_options]):
+        subprocess.run(
+            [sys.executable, 'manage.py', *command, '-v', '0'],
+            cwd=BASE_DIR / project,
+            env=project_env(directory, project),
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Сервер не запустился на порту {port}.')
+
+
+async def fetch(port, method, path, body, cookie):
+    """Один HTTP-запрос; возвращает статус и число SQL-запросов."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    headers = [
+        f'{method} {path} HTTP/1.1', 'Host: 127.0.0.1',
+        'Connection: close', f'Cookie: {cookie}',
+    ]
+    if body is not None:
+        headers += [
+            'Content-Type: application/x-www-form-urlencoded',
+            f'Content-Length: {len(body)}', f'X-CSRFToken: {CSRF_TOKEN}',
+        ]
+    writer.write('\r\n'.join(headers).encode() + b'\r\n\r\n' + (body or b''))
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    queries = None
+    while True:
+        line = (await reader.readline()).decode('latin-1').strip()
+        if not line:
+            break
+        name, _, value = line.partition(':')
+        if name.lower() == 'server-timing' and ' queries' in value:
+            queries = int(value.split('desc="')[1].split()[0])
+    await reader.read()
+    writer.close()
+    return status, queries
+
+
+async def load(port, scenario, session, requests, concurrency):
+    _, method, path, data, login = scenario
+    cookie = f'csrftoken={CSRF_TOKEN}'
+    if login:
+        cookie += f'; sessionid={session}'
+    latencies, queries = [], []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def run():
+        nonlocal errors
+        for index in counter:
+            body = data and urlencode(request_data(data, index)).encode()
+            started = time.perf_counter()
+            try:
+                status, count = await fetch(port, method, path, body, cookie)
+            except OSError:
+                status = None
+            if status is None or status >= 400:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            if count is not None:
+                queries.append(count)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run() for _ in range(concurrency)))
+    return summary(latencies, queries, errors, time.perf_counter() - started)
+
+
+def serve(directory, project, prepared, args):
+    port = free_port()
+    process = subprocess.Popen(
+        [
+            sys.executable, 'manage.py', 'runserver', '--noreload',
+            f'127.0.0.1:{port}',
+        ],
+        cwd=BASE_DIR / project,
+        env=project_env(directory, project),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_port(port)
+        return {
+            scenario[0]: asyncio.run(load(
+                port, scenario, prepared['session'], args.requests,
+                args.concurrency,
+            ))
+            for scenario in prepared['scenarios']
+        }
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=BASE_DIR, text=True,
+            capture_output=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_worker(directory, project, requests):
+    """Client-сценарии в отдельном процессе; см. worker."""
+    output = subprocess.run(
+        [
+            sys.executable, __file__, '--worker', project,
+            '--requests', str(requests),
+        ],
+        cwd=BASE_DIR / project,
+        env=project_env(directory, project),
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def run_project(directory, project, args):
+    prepare(directory, project, args)
+    prepared = run_worker(directory, project, args.requests)
+    results = {'client': prepared['client']}
+    if not args.no_server:
+        results['server'] = serve(directory, project, prepared, args)
+    return [
+        {'project': project, 'mode': mode, 'scenario': name, **stats}
+        for mode, scenarios in results.items()
+        for name, stats in scenarios.items()
+    ]
+
+
+def add_data_arguments(parser):
+    """Объём данных seed_data и число запросов на сценарий."""
+    parser.add_argument(
+        '--projects', nargs='+', choices=tuple(PROJECTS),
+        default=list(PROJECTS)
+    )
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--news', type=int, default=1000)
+    parser.add_argument('--comments', type=int, default=20000)
+    parser.add_argument('--notes', type=int, default=5000)
+
+
+def print_results(results):
+    def number(value, digits):
+        return '—' if value is None else f'{value:.{digits}f}'
+
+    print(
+        f'{"режим":<7} {"сценарий":<13} {"req/s":>8} {"p50, мс":>8} '
+        f'{"p95, мс":>8} {"p99, мс":>8} {"SQL":>6} {"ошибки":>7}'
+    )
+    for result in results:
+        print(
+            f'{result["mode"]:<7} {result["scenario"]:<13} '
+            f'{number(result["throughput"], 0):>8} '
+            f'{number(result["p50_ms"], 1):>8} '
+            f'{number(result["p95_ms"], 1):>8} '
+            f'{number(result["p99_ms"], 1):>8} '
+            f'{number(result["queries"], 1):>6} {result["errors"]:>7}'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    add_data_arguments(parser)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument(
+        '--no-server', action='store_true',
+        help='только тестовый клиент, без runserver'
+    )
+    parser.add_argument('--output', type=Path, default=OUTPUT)
+    parser.add_argument('--worker', choices=tuple(PROJECTS),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        return worker(args.worker, args.requests)
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for project in args.projects:
+            results += run_project(directory, project, args)
+    print_results(results)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps({
+        'created': datetime.now(timezone.utc).isoformat(),
+        'commit': git_commit(),
+        'options': {
+            key: value for key, value in vars(args).items()
+            if key not in ('output', 'worker')
+        },
+        'results': results,
+    }, ensure_ascii=False, indent=1))
+    print(f'\nРезультаты сохранены в {args.output}')
+
+
+if __name__ == '__main__':
+    main()
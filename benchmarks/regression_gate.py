@@ -0,0 +1,191 @@
+"""
+Проверка производительности страниц на регрессии относительно базовой
+линии.
+
+Сценарии end_to_end.py (тестовый клиент, без сети) прогоняются --rounds
+раз, каждый раз в новом процессе на одной и той же наполненной базе.
+Для каждой страницы и метрики берутся медиана по прогонам и MAD
+(медиана абсолютных отклонений):
+
+* queries — среднее число SQL-запросов; оно детерминировано, поэтому
+  регрессия — любой рост больше --query-tolerance;
+* p50_ms и p95_ms — задержка; регрессия, если медиана выросла больше
+  чем на --mad-factor объединённых MAD и одновременно больше чем на
+  --min-change от базовой медианы. Второй порог отсекает шум на
+  быстрых страницах, где MAD почти нулевой.
+
+Команда record сохраняет базовую линию, check сравнивает с ней, печатает
+отчёт по каждой странице и метрике и завершается с кодом 1 при
+регрессиях. Базовую линию стоит записывать на той же машине, на которой
+запускается check.
+
+Запуск из корня репозитория:
+    python benchmarks/regression_gate.py record
+    python benchmarks/regression_gate.py check --rounds 7
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+from end_to_end import (
+    BASE_DIR, add_data_arguments, git_commit, prepare, run_worker,
+)
+
+BASELINE = BASE_DIR / '.benchmarks' / 'baseline.json'
+METRICS = ('queries', 'p50_ms', 'p95_ms')
+DATA_OPTIONS = ('requests', 'users', 'news', 'comments', 'notes')
+# MAD нормального распределения в 1.4826 раза меньше его сигмы.
+MAD_SCALE = 1.4826
+
+
+def median_mad(samples):
+    median = statistics.median(samples)
+    return median, statistics.median(abs(value - median) for value in samples)
+
+
+def measure(args):
+    """{project: {scenario: {metric: {median, mad, samples}}}}."""
+    measurements = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for project in args.projects:
+            prepare(directory, project, args)
+            samples = {}
+            for _ in range(args.rounds):
+                client = run_worker(directory, project, args.requests)
+                for scenario, stats in client['client'].items():
+                    for metric in METRICS:
+                        if stats[metric] is None:
+                            continue
+                        samples.setdefault(scenario, {}).setdefault(
+                            metric, []
+                        ).append(stats[metric])
+            measurements[project] = {
+                scenario: {
+                    metric: dict(zip(
+                        ('median', 'mad'), median_mad(values)
+                    ), samples=values)
+                    for metric, values in metrics.items()
+                }
+                for scenario, metrics in samples.items()
+            }
+    return measurements
+
+
+def threshold(metric, baseline, current, args):
+    """Допустимый рост медианы метрики."""
+    if metric == 'queries':
+        return args.query_tolerance
+    spread = MAD_SCALE * (baseline['mad'] ** 2 + current['mad'] ** 2) ** 0.5
+    return max(args.mad_factor * spread, args.min_change * baseline['median'])
+
+
+def compare(baseline, current, args):
+    """Строки отчёта: (проект, страница, метрика, было, стало, порог, итог)."""
+    rows = []
+    for project, scenarios in current.items():
+        for scenario, metrics in scenarios.items():
+            for metric, now in metrics.items():
+                before = baseline.get(project, {}).get(scenario, {}).get(
+                    metric
+                )
+                if before is None:
+                    rows.append((
+                        project, scenario, metric, None, now['median'],
+                        None, 'новая',
+                    ))
+                    continue
+                limit = threshold(metric, before, now, args)
+                delta = now['median'] - before['median']
+                if delta > limit:
+                    verdict = 'РЕГРЕССИЯ'
+                elif -delta > limit:
+                    verdict = 'улучшение'
+                else:
+                    verdict = 'ok'
+                rows.append((
+                    project, scenario, metric, before['median'],
+                    now['median'], limit, verdict,
+                ))
+    return rows
+
+
+def print_report(rows):
+    print(
+        f'{"страница":<13} {"метрика":<8} {"было":>9} {"стало":>9} '
+        f'{"разница":>16} {"порог":>8}  итог'
+    )
+    for _, scenario, metric, before, after, limit, verdict in rows:
+        if before is None:
+            print(
+                f'{scenario:<13} {metric:<8} {"—":>9} {after:>9.2f} '
+                f'{"":>16} {"":>8}  {verdict}'
+            )
+            continue
+        delta = after - before
+        relative = f'{delta / before:+.0%}' if before else ''
+        print(
+            f'{scenario:<13} {metric:<8} {before:>9.2f} {after:>9.2f} '
+            f'{delta:>+9.2f} {relative:>6} {limit:>8.2f}  {verdict}'
+        )
+    regressions = [row for row in rows if row[-1] == 'РЕГРЕССИЯ']
+    for _, scenario, metric, before, after, _, _ in regressions:
+        print(
+            f'Регрессия: {scenario}, {metric}: '
+            f'{before:.2f} → {after:.2f} ({after - before:+.2f})',
+            file=sys.stderr,
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('action', choices=('record', 'check'))
+    add_data_arguments(parser)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--baseline', type=Path, default=BASELINE)
+    parser.add_argument('--mad-factor', type=float, default=3.0)
+    parser.add_argument('--min-change', type=float, default=0.2)
+    parser.add_argument('--query-tolerance', type=float, default=0.0)
+    parser.set_defaults(news=300, comments=5000, notes=2000, requests=100)
+    args = parser.parse_args()
+    options = {key: getattr(args, key) for key in DATA_OPTIONS}
+
+    if args.action == 'check' and not args.baseline.exists():
+        parser.error(
+            f'Нет базовой линии {args.baseline}: сначала выполните record.'
+        )
+    current = measure(args)
+    if args.action == 'record':
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({
+            'created': datetime.now(timezone.utc).isoformat(),
+            'commit': git_commit(),
+            'options': options,
+            'results': current,
+        }, ensure_ascii=False, indent=1))
+        print(f'Базовая линия сохранена в {args.baseline}')
+        return 0
+    baseline = json.loads(args.baseline.read_text())
+    print(f'Базовая линия: коммит {baseline["commit"]}')
+    if baseline['options'] != options:
+        print(
+            'Внимание: базовая линия записана с другими параметрами: '
+            f'{baseline["options"]}', file=sys.stderr
+        )
+    regressions = print_report(compare(baseline['results'], current, args))
+    if regressions:
+        print(f'Найдено регрессий: {len(regressions)}', file=sys.stderr)
+        return 1
+    print('Регрессий не найдено')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
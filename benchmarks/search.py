@@ -0,0 +1,195 @@
+"""
+Поиск по новостям на корпусе из --comments комментариев (по умолчанию
+миллион): ранжирование в SQL (news.search.SearchResults) против
+прежнего пересечения в Python.
+
+Тексты собираются из --vocabulary псевдослов с частотами по закону Ципфа,
+поэтому частые слова встречаются почти в каждой новости, а редкие — в
+нескольких. Индекс строится командой rebuild_search_index, как после
+загрузки данных. Для каждого запроса время — count() и первая страница,
+как у Paginator на странице поиска.
+
+Запуск из корня репозитория:
+    python benchmarks/search.py --news 10000 --comments 1000000
+"""
+import argparse
+import itertools
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / 'ya_news'))
+
+SETTINGS = '''from yanews.settings import *  # noqa
+
+DATABASES['default']['NAME'] = {database!r}
+DATABASE_REPLICAS = []
+'''
+SYLLABLES = (
+    'ба', 'ве', 'го', 'ду', 'жи', 'зо', 'ка', 'ле', 'ми', 'но', 'пу', 'ро',
+    'са', 'ти', 'фо', 'ху', 'це', 'ча', 'ша', 'ны', 'ры', 'ль', 'ст', 'кр',
+)
+ENDINGS = ('', 'а', 'ы', 'ом', 'ами', 'ах')
+PAGE_SIZE = 10
+BATCH = 20000
+
+
+def vocabulary(size):
+    words = []
+    for length in itertools.count(3):
+        for parts in itertools.product(SYLLABLES, repeat=length):
+            words.append(''.join(parts))
+            if len(words) == size:
+                return words
+
+
+def sentence(words, weights, count):
+    return ' '.join(
+        word + random.choice(ENDINGS)
+        for word in random.choices(words, weights, k=count)
+    )
+
+
+def seed(args, words):
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import connection, transaction
+
+    call_command('migrate', verbosity=0)
+    author = get_user_model().objects.create(username='bench')
+    weights = [1 / rank for rank in range(1, len(words) + 1)]
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            'INSERT INTO news_news (title, text, excerpt, date, comment_count)'
+            " VALUES (%s, %s, '', date('now'), 0)",
+            [
+                (sentence(words, weights, 6), sentence(words, weights, 60))
+                for _ in range(args.news)
+            ],
+        )
+    for start in range(0, args.comments, BATCH):
+        rows = []
+        for _ in range(start, min(start + BATCH, args.comments)):
+            text = sentence(words, weights, random.randint(5, 15))
+            rows.append((random.randint(1, args.news), author.pk, text, text))
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(
+                'INSERT INTO news_comment '
+                '(news_id, author_id, text, text_html, created) '
+                "VALUES (%s, %s, %s, %s, datetime('now'))",
+                rows,
+            )
+    started = time.perf_counter()
+    call_command('rebuild_search_index', stdout=open(os.devnull, 'w'))
+    return time.perf_counter() - started
+
+
+def python_page(terms):
+    """Прежняя выдача: все записи слов в Python, пересечение и сортировка."""
+    from news.models import News, NewsSearchTerm
+
+    scores = None
+    for variants in terms:
+        hits = Counter()
+        for news_id, weight in NewsSearchTerm.objects.filter(
+            term__in=variants
+        ).values_list('news_id', 'weight'):
+            hits[news_id] += weight
+        if scores is not None:
+            hits = Counter({
+                news_id: scores[news_id] + weight
+                for news_id, weight in hits.items() if news_id in scores
+            })
+        scores = hits
+        if not scores:
+            break
+    ranked = [
+        news_id for news_id, _ in sorted(
+            (scores or {}).items(), key=lambda item: (-item[1], -item[0])
+        )
+    ]
+    ids = ranked[:PAGE_SIZE]
+    news = News.objects.for_list().in_bulk(ids)
+    return len(ranked), [news[pk] for pk in ids if pk in news]
+
+
+def sql_page(query):
+    from news.search import SearchResults
+
+    results = SearchResults(query)
+    return results.count(), results[:PAGE_SIZE]
+
+
+def measure(function, argument, repeat):
+    function(argument)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(argument)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--news', type=int, default=10000)
+    parser.add_argument('--comments', type=int, default=1000000)
+    parser.add_argument('--vocabulary', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+    random.seed(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        (Path(directory) / 'bench_search.py').write_text(SETTINGS.format(
+            database=str(Path(directory) / 'db.sqlite3'),
+        ))
+        sys.path.insert(0, directory)
+        os.environ['DJANGO_SETTINGS_MODULE'] = 'bench_search'
+        import django
+        django.setup()
+        from django.db import connection
+        from pytils.translit import translify
+
+        from news.search import query_terms
+
+        words = vocabulary(args.vocabulary)
+        rebuild = seed(args, words)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM news_newssearchterm')
+            postings = cursor.fetchone()[0]
+        print(
+            f'новостей {args.news}, комментариев {args.comments}, '
+            f'записей индекса {postings}; '
+            f'rebuild_search_index {rebuild:.1f} с\n'
+        )
+        queries = (
+            ('частое слово', words[0]),
+            ('два частых', f'{words[0]} {words[1]}'),
+            ('среднее', words[100]),
+            ('частое + редкое', f'{words[0]} {words[-1]}'),
+            ('латиница', translify(words[2])),
+            ('нет совпадений', f'{words[0]} футбол'),
+        )
+        print(
+            f'{"запрос":<16} {"найдено":>8} {"Python, мс":>16} '
+            f'{"SQL, мс":>16}'
+        )
+        for title, query in queries:
+            found, _ = sql_page(query)
+            before = measure(python_page, query_terms(query), args.repeat)
+            after = measure(sql_page, query, args.repeat)
+            print(
+                f'{title:<16} {found:>8} '
+                f'{before[0]:>7.1f} (max {before[1]:>4.0f}) '
+                f'{after[0]:>7.1f} (max {after[1]:>4.0f})'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+"""
+Конкурентные чтение и запись в SQLite: стандартные настройки против
+профиля из settings.py (WAL, synchronous=NORMAL, busy_timeout, mmap,
+cache_size, BEGIN IMMEDIATE, CONN_MAX_AGE).
+
+Читатели выбирают главную и страницу комментариев, писатели в транзакции
+читают счётчик, добавляют комментарий и увеличивают счётчик — как при
+отправке формы. После каждой операции соединение закрывается так же,
+как в конце запроса (close_if_unusable_or_obsolete), поэтому без
+CONN_MAX_AGE каждая операция открывает соединение заново.
+
+Запуск из корня репозитория:
+    python benchmarks/sqlite_concurrency.py --readers 8 --writers 4
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / 'ya_news'))
+
+SETTINGS = '''from yanews.settings import *  # noqa
+
+DATABASES = {{
+    'default': {{
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': {baseline!r},
+    }},
+    'tuned': {{**DATABASES['default'], 'NAME': {tuned!r}}},
+}}
+'''
+
+HOME = (
+    'SELECT id, title, date, comment_count FROM news_news '
+    'ORDER BY date DESC, id DESC LIMIT 10'
+)
+COMMENTS = (
+    'SELECT id, author_id, text, created FROM news_comment '
+    'WHERE news_id = %s ORDER BY created, id LIMIT 50'
+)
+COUNT = 'SELECT comment_count FROM news_news WHERE id = %s'
+INSERT = (
+    'INSERT INTO news_comment (news_id, author_id, text, text_html, created) '
+    "VALUES (%s, %s, %s, %s, datetime('now'))"
+)
+INCREMENT = (
+    'UPDATE news_news SET comment_count = comment_count + 1 WHERE id = %s'
+)
+
+
+def seed(alias, news_count, comments_per_news):
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import connections, transaction
+
+    call_command('migrate', database=alias, verbosity=0)
+    author = get_user_model().objects.db_manager(alias).create(
+        username='bench'
+    )
+    with transaction.atomic(using=alias), connections[alias].cursor() as c:
+        c.executemany(
+            'INSERT INTO news_news (title, text, excerpt, date, comment_count)'
+            " VALUES (%s, %s, '', date('now'), %s)",
+            [
+                (f'Новость {i}', 'Текст новости. ' * 50, comments_per_news)
+                for i in range(news_count)
+            ],
+        )
+        c.executemany(INSERT, [
+            (news_id, author.pk, f'Комментарий {i}', f'Комментарий {i}')
+            for news_id in range(1, news_count + 1)
+            for i in range(comments_per_news)
+        ])
+    connections[alias].close()
+    return author.pk
+
+
+def run(alias, readers, writers, duration, news_count, author_id):
+    from django.db import OperationalError, connections, transaction
+
+    stats = {'reads': 0, 'writes': 0, 'errors': 0, 'latencies': []}
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def read():
+        with connections[alias].cursor() as cursor:
+            cursor.execute(HOME)
+            cursor.fetchall()
+            cursor.execute(COMMENTS, [random.randint(1, news_count)])
+            cursor.fetchall()
+
+    def write():
+        news_id = random.randint(1, news_count)
+        with transaction.atomic(using=alias):
+            with connections[alias].cursor() as cursor:
+                cursor.execute(COUNT, [news_id])
+                cursor.fetchone()
+                cursor.execute(
+                    INSERT, [news_id, author_id, 'Комментарий', 'Комментарий']
+                )
+                cursor.execute(INCREMENT, [news_id])
+
+    def worker(operation, counter):
+        while time.monotonic() < deadline:
+            started = time.monotonic()
+            try:
+                operation()
+            except OperationalError:
+                with lock:
+                    stats['errors'] += 1
+            else:
+                with lock:
+                    stats[counter] += 1
+                    if counter == 'writes':
+                        stats['latencies'].append(
+                            time.monotonic() - started
+                        )
+            finally:
+                connections[alias].close_if_unusable_or_obsolete()
+        connections[alias].close()
+
+    threads = [
+        threading.Thread(target=worker, args=(read, 'reads'))
+        for _ in range(readers)
+    ] + [
+        threading.Thread(target=worker, args=(write, 'writes'))
+        for _ in range(writers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=5)
+    parser.add_argument('--news', type=int, default=500)
+    parser.add_argument('--comments', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        (Path(directory) / 'bench_sqlite.py').write_text(SETTINGS.format(
+            baseline=str(Path(directory) / 'baseline.sqlite3'),
+            tuned=str(Path(directory) / 'tuned.sqlite3'),
+        ))
+        sys.path.insert(0, directory)
+        os.environ['DJANGO_SETTINGS_MODULE'] = 'bench_sqlite'
+        import django
+        django.setup()
+
+        print(
+            f'{"профиль":<9} {"чтений/с":>9} {"записей/с":>10} '
+            f'{"ошибки":>7} {"запись p99, мс":>15}'
+        )
+        for alias, title in (('default', 'baseline'), ('tuned', 'tuned')):
+            author_id = seed(alias, args.news, args.comments)
+            stats = run(
+                alias, args.readers, args.writers, args.duration,
+                args.news, author_id
+            )
+            latencies = stats['latencies']
+            p99 = (
+                statistics.quantiles(latencies, n=100)[98] * 1000
+                if len(latencies) > 1 else float('nan')
+            )
+            print(
+                f'{title:<9} {stats["reads"] / args.duration:>9.0f} '
+                f'{stats["writes"] / args.duration:>10.0f} '
+                f'{stats["errors"]:>7} {p99:>15.1f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Рендеринг главной и страницы новости: загрузчики шаблонов и время по
+шаблонам и фильтрам.
+
+В тестовой базе создаются --news новостей по --text-kb КБ текста и одна
+новость с --comments комментариями по --comment-length символов (с
+переносами строк); --page-size задаёт, сколько из них выводится на
+странице. Страницы запрашиваются авторизованным клиентом, чтобы не
+попадать в кэш страниц для анонимов.
+
+1. Загрузчики: APP_DIRS без кэша (как при DEBUG = True) против
+   кэширующего загрузчика из settings_production.
+2. Собственное время шаблонов и фильтров (yanews.template_profile).
+   Анонсы и HTML комментариев считаются при сохранении, поэтому
+   |truncatewords и |linebreaksbr в списке быть не должно; с
+   --page-size 5000 видно, сколько стоит сама разметка комментариев.
+
+Запуск из корня репозитория:
+    python benchmarks/template_render.py --text-kb 300 --comments 5000
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / 'ya_news'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from news.models import Comment, News  # noqa: E402
+from yanews import template_profile  # noqa: E402
+from yanews.settings_production import TEMPLATES as CACHED  # noqa: E402
+
+UNCACHED = [{
+    **settings.TEMPLATES[0],
+    'APP_DIRS': True,
+    'OPTIONS': {
+        **settings.TEMPLATES[0]['OPTIONS'],
+        'debug': True,
+    },
+}]
+UNCACHED[0]['OPTIONS'].pop('loaders', None)
+
+
+def seed(args):
+    author = get_user_model().objects.create(username='bench')
+    paragraph = 'Текст новости, достаточно длинный для обрезки. ' * 20
+    text = '\n\n'.join(
+        [paragraph] * max(1, args.text_kb * 1024 // len(paragraph.encode()))
+    )
+    News.objects.bulk_create(
+        News(title=f'Новость {index}', text=text)
+        for index in range(args.news)
+    )
+    news = News.objects.first()
+    line = 'Строка комментария <b>с разметкой</b> & амперсандом. '
+    comment = '\n'.join(
+        [line] * max(1, args.comment_length // len(line))
+    )[:args.comment_length]
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=comment)
+        for _ in range(args.comments)
+    )
+    client = Client()
+    client.force_login(author)
+    return client, (
+        ('home', reverse('news:home')),
+        ('detail', reverse('news:detail', args=(news.pk,))),
+    )
+
+
+def timed(client, url, repeat):
+    client.get(url)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        client.get(url)
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--news', type=int, default=10)
+    parser.add_argument('--text-kb', type=int, default=300)
+    parser.add_argument('--comments', type=int, default=5000)
+    parser.add_argument('--comment-length', type=int, default=500)
+    parser.add_argument(
+        '--page-size', type=int, default=None,
+        help='COMMENTS_PAGE_SIZE; по умолчанию из настроек'
+    )
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--top', type=int, default=8)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+    if args.page_size:
+        settings.COMMENTS_PAGE_SIZE = args.page_size
+    client, pages = seed(args)
+
+    print(f'{"страница":<8} {"без кэша, мс":>13} {"с кэшем, мс":>12}')
+    for title, url in pages:
+        with override_settings(TEMPLATES=UNCACHED):
+            uncached = timed(client, url, args.repeat)
+        with override_settings(TEMPLATES=CACHED):
+            cached = timed(client, url, args.repeat)
+        print(f'{title:<8} {uncached:>13.2f} {cached:>12.2f}')
+
+    with override_settings(TEMPLATES=template_profile.timed(CACHED)):
+        for title, url in pages:
+            client.get(url)
+            with template_profile.collect() as timings:
+                for _ in range(args.repeat):
+                    client.get(url)
+            total = sum(timings.values())
+            print(f'\n{title}: рендеринг {total / args.repeat * 1000:.2f} мс')
+            for name, seconds in timings.most_common(args.top):
+                print(
+                    f'{seconds / args.repeat * 1000:>9.3f} мс '
+                    f'{seconds / total:>5.0%}  {name}'
+                )
+
+
+if __name__ == '__main__':
+    main()
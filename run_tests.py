@@ -0,0 +1,324 @@
+"""
+Параллельный запуск проверок репозитория вместо последовательного
+run_tests.sh.
+
+Одновременно выполняются flake8, structure_test.py и тесты обоих
+проектов. Тесты каждого проекта делятся по файлам на --workers частей
+(по времени прошлого запуска, самые долгие — первыми), каждая часть идёт
+в своём процессе pytest со своей файловой базой SQLite. Мигрированная
+база-шаблон строится один раз и переиспользуется, пока не изменятся
+миграции; перед запуском она копируется в базу воркера, а pytest
+получает --reuse-db и не создаёт таблицы заново.
+
+В конце печатаются время по частям и самые медленные тесты; полный
+профиль сохраняется в .test_cache/profile.json и используется для
+разбиения при следующем запуске.
+
+Запуск из корня репозитория:
+    python run_tests.py
+    python run_tests.py --workers 4 --top 20
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from xml.etree import ElementTree
+
+BASE_DIR = Path(__file__).resolve().parent
+CACHE_DIR = BASE_DIR / '.test_cache'
+PROFILE = CACHE_DIR / 'profile.json'
+
+PROJECTS = {
+    'ya_news': {
+        'settings': 'yanews.settings',
+        'tests': 'news/pytest_tests',
+        'failure': (
+            'При запуске упали ваши тесты для проекта YaNews. '
+            'Проверьте тесты этого проекта'
+        ),
+    },
+    'ya_note': {
+        'settings': 'yanote.settings',
+        'tests': 'notes/tests',
+        'failure': (
+            'При запуске упали ваши тесты для проекта YaNote. '
+            'Проверьте тесты этого проекта'
+        ),
+    },
+}
+CHECKS = (
+    (
+        'flake8',
+        [sys.executable, '-m', 'flake8', '--config=setup.cfg'],
+        'flake8 обнаружил отклонения от стандартов, '
+        'приведите код в соответствие с PEP8',
+    ),
+    (
+        'structure',
+        [sys.executable, 'structure_test.py'],
+        'Убедитесь, что написанные вами тесты скопированы в указанные '
+        'в ТЗ директории',
+    ),
+)
+
+TEMPLATE_SCRIPT = '''
+import sys
+
+import django
+
+django.setup()
+
+from django.conf import settings
+from django.db import connection
+
+settings.DATABASES['default'].setdefault('TEST', {})['NAME'] = sys.argv[1]
+connection.creation.create_test_db(verbosity=0, keepdb=True, serialize=False)
+'''
+
+
+def run(command, cwd=BASE_DIR, env=None):
+    started = time.monotonic()
+    result = subprocess.run(
+        command, cwd=cwd, env=env, text=True,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+    )
+    return result.returncode, result.stdout, time.monotonic() - started
+
+
+def project_env(project, **extra):
+    env = dict(os.environ)
+    env['DJANGO_SETTINGS_MODULE'] = PROJECTS[project]['settings']
+    env.update(extra)
+    return env
+
+
+def migrations_hash(project):
+    digest = hashlib.sha1()
+    for path in sorted((BASE_DIR / project).glob('*/migrations/*.py')):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def remove_database(path):
+    for suffix in ('', '-wal', '-shm', '-journal'):
+        Path(f'{path}{suffix}').unlink(missing_ok=True)
+
+
+def template_database(project):
+    """Путь к мигрированной базе-шаблону; строит её, если её ещё нет."""
+    directory = CACHE_DIR / project
+    directory.mkdir(parents=True, exist_ok=True)
+    template = directory / f'template-{migrations_hash(project)}.sqlite3'
+    if template.exists():
+        return template, 0.0
+    for stale in directory.glob('template-*.sqlite3'):
+        remove_database(stale)
+    code, output, elapsed = run(
+        [sys.executable, '-c', TEMPLATE_SCRIPT, str(template)],
+        cwd=BASE_DIR / project,
+        env=project_env(project),
+    )
+    if code:
+        remove_database(template)
+        raise RuntimeError(output)
+    return template, elapsed
+
+
+def split(files, timings, workers):
+    """Раскладывает файлы по частям: самые долгие — в наименее занятые."""
+    default = (
+        sum(timings.values()) / len(timings) if timings else 1.0
+    )
+    shards = [[0.0, []] for _ in range(min(workers, len(files)) or 1)]
+    for path in sorted(files, key=lambda path: -timings.get(path, default)):
+        shard = min(shards, key=lambda shard: shard[0])
+        shard[0] += timings.get(path, default)
+        shard[1].append(path)
+    return [paths for _, paths in shards if paths]
+
+
+def junit_times(report):
+    if not report.exists():
+        return []
+    return [
+        {
+            'test': f'{case.get("classname")}::{case.get("name")}',
+            'time': float(case.get('time', 0)),
+        }
+        for case in ElementTree.parse(report).iter('testcase')
+    ]
+
+
+def run_shard(project, index, files, template):
+    directory = CACHE_DIR / project
+    database = directory / f'worker-{index}.sqlite3'
+    report = directory / f'worker-{index}.xml'
+    remove_database(database)
+    report.unlink(missing_ok=True)
+    shutil.copyfile(template, database)
+    code, output, elapsed = run(
+        [
+            sys.executable, '-m', 'pytest', '-q', '--tb=short',
+            '-p', 'no:cacheprovider', '--reuse-db',
+            f'--junitxml={report}', *files,
+        ],
+        cwd=BASE_DIR / project,
+        env=project_env(project, TEST_DB_NAME=str(database)),
+    )
+    return {
+        'project': project,
+        'shard': index,
+        'files': files,
+        'code': code,
+        'output': output,
+        'elapsed': elapsed,
+        'tests': junit_times(report),
+    }
+
+
+def run_project(project, workers, timings, pool):
+    template, build_time = template_database(project)
+    tests_dir = BASE_DIR / project / PROJECTS[project]['tests']
+    files = [
+        str(path.relative_to(BASE_DIR / project))
+        for path in sorted(tests_dir.glob('test_*.py'))
+    ]
+    shards = split(files, timings.get(project, {}), workers)
+    futures = [
+        pool.submit(run_shard, project, index, shard_files, template)
+        for index, shard_files in enumerate(shards)
+    ]
+    return build_time, [future.result() for future in futures]
+
+
+def load_timings():
+    """Время каждого файла тестов по профилю прошлого запуска."""
+    if not PROFILE.exists():
+        return {}
+    timings = {}
+    for entry in json.loads(PROFILE.read_text()):
+        project_timings = timings.setdefault(entry['project'], {})
+        project_timings[entry['file']] = (
+            project_timings.get(entry['file'], 0.0) + entry['time']
+        )
+    return timings
+
+
+def test_file(classname, files):
+    """Файл теста по classname из JUnit: модуль или модуль.Класс."""
+    for path in files:
+        module = path[:-len('.py')].replace('/', '.')
+        if classname == module or classname.startswith(module + '.'):
+            return path
+    return classname
+
+
+def save_profile(results):
+    profile = [
+        {
+            'project': result['project'],
+            'file': test_file(test['test'].split('::')[0], result['files']),
+            **test,
+        }
+        for result in results
+        for test in result['tests']
+    ]
+    PROFILE.write_text(json.dumps(profile, ensure_ascii=False, indent=1))
+    return profile
+
+
+def print_message(message, failed=False):
+    width = shutil.get_terminal_size().columns
+    color = '\033[0;31m' if failed else '\033[0;32m'
+    print(f'{color}{f" {message} ".center(width, "=")}\033[0m')
+
+
+def print_report(check_results, project_results, profile, top):
+    print(f'{"часть":<14} {"тестов":>7} {"время, с":>9}')
+    for name, (_, _, elapsed) in check_results.items():
+        print(f'{name:<14} {"":>7} {elapsed:>9.2f}')
+    for project, (build_time, shards) in project_results.items():
+        if build_time:
+            print(f'{project + " шаблон":<14} {"":>7} {build_time:>9.2f}')
+        for shard in shards:
+            title = f'{project}#{shard["shard"]}'
+            print(
+                f'{title:<14} {len(shard["tests"]):>7} '
+                f'{shard["elapsed"]:>9.2f}'
+            )
+    print(f'\nСамые медленные тесты (всего {len(profile)}):')
+    for test in sorted(profile, key=lambda test: -test['time'])[:top]:
+        print(f'{test["time"]:>8.3f}  {test["project"]}  {test["test"]}')
+
+
+def exit_status(check_results, project_results):
+    """Выводит ошибки в порядке run_tests.sh; код первой упавшей части."""
+    status = 0
+    for name, _, failure in CHECKS:
+        code, output, _ = check_results[name]
+        if code:
+            print(output, file=sys.stderr)
+            print_message(failure, failed=True)
+            status = status or code
+    for project, (_, shards) in project_results.items():
+        failed = [shard for shard in shards if shard['code']]
+        for shard in failed:
+            print(shard['output'], file=sys.stderr)
+        if failed:
+            print_message(PROJECTS[project]['failure'], failed=True)
+            status = status or failed[0]['code']
+    if not status:
+        print_message('Все проверки пройдены')
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--workers', type=int, default=os.cpu_count() or 1,
+        help='число процессов pytest на проект'
+    )
+    parser.add_argument(
+        '--top', type=int, default=15, help='сколько медленных тестов вывести'
+    )
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    timings = load_timings()
+    with ThreadPoolExecutor(
+        max_workers=len(CHECKS) + len(PROJECTS) * (args.workers + 1)
+    ) as pool:
+        checks = {
+            name: pool.submit(run, command) for name, command, _ in CHECKS
+        }
+        projects = {
+            project: pool.submit(
+                run_project, project, args.workers, timings, pool
+            )
+            for project in PROJECTS
+        }
+        check_results = {
+            name: future.result() for name, future in checks.items()
+        }
+        project_results = {
+            project: future.result() for project, future in projects.items()
+        }
+    wall = time.monotonic() - started
+
+    profile = save_profile([
+        shard for _, shards in project_results.values() for shard in shards
+    ])
+    print_report(check_results, project_results, profile, args.top)
+    print(f'\nОбщее время: {wall:.2f} с')
+    return exit_status(check_results, project_results)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class NewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'news'
     verbose_name = 'Новости'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        # Сброс кэша пользователя при изменении учётной записи.
+        from yanews import auth  # noqa: F401
+        from yanews.sqlite_backend.base import set_journal_mode
+        post_migrate.connect(set_journal_mode, sender=self)
@@ -0,0 +1,91 @@
+"""
+Поиск запрещённых слов одним скомпилированным регулярным выражением.
+
+Список слов сворачивается в префиксное дерево (trie), а дерево — в
+регулярное выражение без перебора альтернатив: общие префиксы слов
+проверяются один раз. Поэтому проверка текста занимает время, почти
+не зависящее от длины списка.
+"""
+import os
+import re
+
+from django.conf import settings
+
+_matcher = None
+
+
+def _trie_to_regex(node):
+    end = '' in node
+    branches = [
+        re.escape(char) + _trie_to_regex(child)
+        for char, child in sorted(node.items()) if char
+    ]
+    if not branches:
+        return ''
+    if len(branches) == 1 and not end:
+        return branches[0]
+    pattern = '(?:' + '|'.join(branches) + ')'
+    return pattern + '?' if end else pattern
+
+
+def build_regex(words):
+    """Компилирует список слов в выражение с учётом границ слов."""
+    trie = {}
+    for word in words:
+        word = word.strip().lower()
+        if not word:
+            continue
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+    if not trie:
+        # Пустой список: выражение, которое ничего не находит.
+        return re.compile(r'(?!)')
+    return re.compile(
+        r'(?<!\w)' + _trie_to_regex(trie) + r'(?!\w)', re.IGNORECASE
+    )
+
+
+def _source(default):
+    """
+    Возвращает подпись источника слов и функцию их загрузки.
+
+    Файл из BAD_WORDS_FILE (по слову в строке, # — комментарий)
+    важнее списка BAD_WORDS в настройках; если нет ни того, ни другого,
+    используется список по умолчанию.
+    """
+    path = settings.BAD_WORDS_FILE
+    if path:
+        stat = os.stat(path)
+        return (os.fspath(path), stat.st_mtime_ns, stat.st_size), (
+            lambda: _read_words(path)
+        )
+    words = tuple(settings.BAD_WORDS or default)
+    return words, lambda: words
+
+
+def _read_words(path):
+    with open(path, encoding='utf-8') as file:
+        return [
+            line for line in (line.strip() for line in file)
+            if line and not line.startswith('#')
+        ]
+
+
+def get_matcher(default=()):
+    """
+    Возвращает скомпилированное выражение для текущего списка слов.
+
+    Выражение собирается один раз и пересобирается только тогда,
+    когда меняется список в настройках или файл со словами.
+    """
+    global _matcher
+    signature, load = _source(default)
+    if _matcher is None or _matcher[0] != signature:
+        _matcher = (signature, build_regex(load()))
+    return _matcher[1]
+
+
+def contains_bad_words(text, default=()):
+    return get_matcher(default).search(text) is not None
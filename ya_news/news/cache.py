@@ -0,0 +1,88 @@
+"""
+Версионированный кэш страниц приложения news.
+
+У главной страницы и у каждой новости есть свой номер версии. Версия
+входит в ключ закэшированной страницы, поэтому для инвалидации достаточно
+сменить версию: старые страницы просто перестают запрашиваться и со
+временем вытесняются из кэша.
+
+Версия начинается со времени её смены, поэтому из неё же берётся
+Last-Modified страницы (см. news.conditional): правка или удаление
+комментария и правка текста новости сдвигают его вперёд.
+"""
+import math
+import time
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+HOME_VERSION_KEY = 'news:home:version'
+NEWS_VERSION_KEY = 'news:{pk}:version'
+
+
+def get_cache():
+    return caches[settings.NEWS_CACHE_ALIAS]
+
+
+def new_version():
+    # Секунды округляются вверх: Last-Modified с точностью до секунды
+    # не должен оказаться раньше самой смены.
+    return f'{math.ceil(time.time())}-{uuid4().hex}'
+
+
+def version_time(version):
+    """Время смены версии (timestamp) или None для версии без времени."""
+    try:
+        return int(version.split('-', 1)[0])
+    except ValueError:
+        return None
+
+
+def get_version(key):
+    """Возвращает текущую версию, создавая её при первом обращении."""
+    cache = get_cache()
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, new_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    get_cache().set(key, new_version(), None)
+
+
+def _bump_news(pk):
+    bump_version(HOME_VERSION_KEY)
+    bump_version(NEWS_VERSION_KEY.format(pk=pk))
+
+
+def invalidate_news(pk):
+    """
+    Сбрасывает страницу новости и главную, где выводится её анонс.
+
+    Версию меняем сразу и ещё раз после коммита: иначе страница,
+    закэшированная конкурентным запросом до коммита, осталась бы в кэше.
+    """
+    _bump_news(pk)
+    transaction.on_commit(lambda: _bump_news(pk))
+
+
+def home_page_key():
+    return f'news:page:home:{get_version(HOME_VERSION_KEY)}'
+
+
+def detail_page_key(pk):
+    version = get_version(NEWS_VERSION_KEY.format(pk=pk))
+    return f'news:page:{pk}:{version}'
+
+
+def get_page(key):
+    """Словарь с HTML страницы (content) и заголовками ETag/Last-Modified."""
+    return get_cache().get(key)
+
+
+def set_page(key, page):
+    get_cache().set(key, page, settings.NEWS_PAGE_CACHE_TIMEOUT)
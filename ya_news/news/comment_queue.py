@@ -0,0 +1,167 @@
+"""
+Отложенная запись комментариев (write-behind).
+
+Проверенные комментарии складываются в очередь процесса и записываются
+пачками через Comment.objects.bulk_create: по таймеру
+(NEWS_COMMENT_QUEUE_INTERVAL) или сразу при накоплении
+NEWS_COMMENT_QUEUE_BATCH_SIZE штук. Одна транзакция на пачку вместо
+транзакции на каждый POST снимает конкуренцию за блокировку SQLite.
+Счётчики, поисковый индекс и кэш страниц обновляет bulk_create.
+
+Поток записи запускается при первом комментарии, то есть уже после
+fork воркера. Оставшееся в очереди записывается при завершении процесса
+(atexit). В синхронном режиме (NEWS_COMMENT_QUEUE_SYNC, для тестов)
+каждый комментарий записывается сразу в вызывающем потоке.
+
+Пачка, упавшая с OperationalError (например, «database is locked»),
+возвращается в начало очереди, но не больше
+NEWS_COMMENT_QUEUE_MAX_RETRIES раз подряд. После этого, как и при
+любой другой ошибке БД, пачка делится пополам, пока сбойные
+комментарии не останутся по одному; они пишутся в лог и отбрасываются,
+чтобы не задерживать остальные.
+"""
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError, OperationalError, connection
+
+from .models import Comment
+
+logger = logging.getLogger(__name__)
+
+
+class CommentQueue:
+
+    def __init__(self, batch_size, interval, sync=False, max_retries=5):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.sync = sync
+        self.max_retries = max_retries
+        self._retries = 0
+        self._items = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, comment):
+        with self._lock:
+            self._items.append(comment)
+            full = len(self._items) >= self.batch_size
+        if self.sync:
+            self.flush()
+            return
+        self._start()
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """Записывает накопленное одной пачкой; возвращает число записей."""
+        with self._lock:
+            batch, self._items = self._items, []
+        if not batch:
+            return 0
+        try:
+            Comment.objects.bulk_create(batch)
+        except OperationalError:
+            self._retries += 1
+            if self._retries <= self.max_retries:
+                logger.warning(
+                    'Не удалось записать %s комментариев, повторим позже',
+                    len(batch), exc_info=True
+                )
+                with self._lock:
+                    self._items[:0] = batch
+                return 0
+            logger.exception(
+                'Пачка из %s комментариев не записана за %s попыток',
+                len(batch), self._retries
+            )
+            self._retries = 0
+            return self._save_halves(batch)
+        except DatabaseError:
+            logger.exception(
+                'Не удалось записать пачку из %s комментариев', len(batch)
+            )
+            self._retries = 0
+            return self._save_halves(batch)
+        self._retries = 0
+        return len(batch)
+
+    def _save_halves(self, batch):
+        """Записывает упавшую пачку по половинам; возвращает число записей."""
+        if len(batch) == 1:
+            logger.error(
+                'Комментарий к новости %s отброшен', batch[0].news_id
+            )
+            return 0
+        middle = len(batch) // 2
+        return sum(
+            self._save_part(part) for part in (batch[:middle], batch[middle:])
+        )
+
+    def _save_part(self, part):
+        try:
+            Comment.objects.bulk_create(part)
+        except DatabaseError:
+            return self._save_halves(part)
+        return len(part)
+
+    def stop(self):
+        """Останавливает поток записи и сохраняет остаток очереди."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _start(self):
+        if self._thread is not None or self._stopped.is_set():
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='comment-queue', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        try:
+            while not self._stopped.is_set():
+                self._wakeup.wait(self.interval)
+                self._wakeup.clear()
+                self.flush()
+        finally:
+            connection.close()
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_queue():
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = CommentQueue(
+                settings.NEWS_COMMENT_QUEUE_BATCH_SIZE,
+                settings.NEWS_COMMENT_QUEUE_INTERVAL,
+                sync=settings.NEWS_COMMENT_QUEUE_SYNC,
+                max_retries=settings.NEWS_COMMENT_QUEUE_MAX_RETRIES,
+            )
+            atexit.register(_queue.stop)
+        return _queue
+
+
+def save_comment(comment):
+    """Сохраняет комментарий сразу или через очередь, если она включена."""
+    if settings.NEWS_COMMENT_QUEUE_ENABLED:
+        get_queue().put(comment)
+    else:
+        comment.save()
@@ -0,0 +1,65 @@
+"""
+Валидаторы условных GET-запросов (ETag и Last-Modified) для страниц news.
+
+Считаются одним запросом по индексам, без рендеринга шаблона: для каждой
+показанной новости берутся дата, счётчик комментариев и время последнего
+комментария. Правки и удаления, которые этих полей не меняют,
+учитываются через версию страницы из кэша (см. news.cache): она входит
+в ETag, а время её смены — в Last-Modified. ETag зависит и от
+пользователя: авторизованному показываются форма и ссылки на
+редактирование его комментариев. В форме есть токен CSRF, поэтому для
+авторизованного в ETag входит и секрет из cookie CSRF, а Last-Modified
+не отдаётся: по дате не видно, что токен сменился после нового входа.
+"""
+import calendar
+import hashlib
+from datetime import datetime, time
+
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from django.utils.http import quote_etag
+
+from . import cache
+from .models import Comment, News
+
+
+def news_rows(queryset):
+    last_comment = Comment.objects.filter(
+        news=OuterRef('pk')
+    ).order_by('-created').values('created')[:1]
+    return list(queryset.annotate(
+        commented=Subquery(last_comment)
+    ).values_list('pk', 'date', 'comment_count', 'commented'))
+
+
+def validators(rows, version, user, csrf_secret=None):
+    """Возвращает пару (ETag, Last-Modified как timestamp)."""
+    if not rows:
+        return None, None
+    key = (rows, version, user.pk)
+    if user.is_authenticated:
+        key += (csrf_secret,)
+    etag = quote_etag(hashlib.md5(repr(key).encode()).hexdigest())
+    if user.is_authenticated:
+        return etag, None
+    moments = [
+        timezone.make_aware(datetime.combine(date, time.min))
+        for _, date, _, _ in rows
+    ] + [commented for *_, commented in rows if commented is not None]
+    last_modified = calendar.timegm(max(moments).utctimetuple())
+    return etag, max(last_modified, cache.version_time(version) or 0)
+
+
+def home_validators(user, csrf_secret=None):
+    rows = news_rows(
+        News.objects.all()[:settings.NEWS_COUNT_ON_HOME_PAGE]
+    )
+    version = cache.get_version(cache.HOME_VERSION_KEY)
+    return validators(rows, version, user, csrf_secret)
+
+
+def detail_validators(pk, user, csrf_secret=None):
+    rows = news_rows(News.objects.filter(pk=pk))
+    version = cache.get_version(cache.NEWS_VERSION_KEY.format(pk=pk))
+    return validators(rows, version, user, csrf_secret)
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from news.cache import NEWS_VERSION_KEY, bump_version
+from news.models import Comment, render_comment_html
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает HTML комментариев, например для записей, '
+        'изменённых через QuerySet.update() или до миграции.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        """
+        Комментарии читаются порциями по первичному ключу, без кэша QuerySet.
+
+        Записываются лишь изменившиеся строки; кэш сбрасывается только
+        у страниц новостей, где такие комментарии есть.
+        """
+        chunk_size = options['chunk_size']
+        updated = 0
+        news_ids = set()
+        last_id = 0
+        while True:
+            chunk = list(Comment.objects.filter(pk__gt=last_id).order_by(
+                'pk'
+            ).only('id', 'news_id', 'text', 'text_html')[:chunk_size])
+            if not chunk:
+                break
+            last_id = chunk[-1].pk
+            changed = []
+            for comment in chunk:
+                text_html = render_comment_html(comment.text)
+                if comment.text_html != text_html:
+                    comment.text_html = text_html
+                    changed.append(comment)
+            Comment.objects.bulk_update(changed, ('text_html',))
+            updated += len(changed)
+            news_ids.update(comment.news_id for comment in changed)
+        for news_id in news_ids:
+            bump_version(NEWS_VERSION_KEY.format(pk=news_id))
+        self.stdout.write(f'Обновлено комментариев: {updated}')
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from news.cache import HOME_VERSION_KEY, bump_version
+from news.models import News, make_excerpt
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает анонсы новостей, например после смены '
+        'NEWS_EXCERPT_WORDS или правок текста через QuerySet.update().'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        """
+        Новости читаются порциями по первичному ключу, без кэша QuerySet.
+
+        Тексты бывают по сотне килобайт, поэтому в памяти держится
+        только текущая порция; записываются лишь изменившиеся анонсы.
+        """
+        updated = 0
+        last_id = 0
+        while True:
+            chunk = list(News.objects.filter(pk__gt=last_id).order_by(
+                'pk'
+            ).only('id', 'text', 'excerpt')[:options['chunk_size']])
+            if not chunk:
+                break
+            last_id = chunk[-1].pk
+            changed = []
+            for news in chunk:
+                excerpt = make_excerpt(news.text)
+                if news.excerpt != excerpt:
+                    news.excerpt = excerpt
+                    changed.append(news)
+            News.objects.bulk_update(changed, ('excerpt',))
+            updated += len(changed)
+        if updated:
+            bump_version(HOME_VERSION_KEY)
+        self.stdout.write(f'Обновлено анонсов: {updated}')
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from news import search
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересобирает поисковый индекс новостей и комментариев. '
+        'Нужна после loaddata: записи фикстур не индексируются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            search.rebuild(chunk_size=options['chunk_size'])
+        self.stdout.write('Поисковый индекс пересобран.')
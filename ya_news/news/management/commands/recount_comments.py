@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F
+
+from news.cache import invalidate_news
+from news.models import News
+
+
+class Command(BaseCommand):
+    help = 'Сверяет News.comment_count с реальным числом комментариев.'
+
+    def handle(self, *args, **options):
+        fixed = 0
+        with transaction.atomic():
+            drifted = News.objects.annotate(
+                actual=Count('comment')
+            ).exclude(
+                comment_count=F('actual')
+            ).values_list('pk', 'actual')
+            for pk, actual in drifted.iterator():
+                News.objects.filter(pk=pk).update(comment_count=actual)
+                invalidate_news(pk)
+                fixed += 1
+        self.stdout.write(f'Исправлено счётчиков: {fixed}')
@@ -0,0 +1,159 @@
+import random
+from datetime import date, timedelta
+from itertools import accumulate, islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from news import search
+from news.models import Comment, News
+
+User = get_user_model()
+
+WORDS = (
+    'город', 'погода', 'новость', 'дорога', 'жители', 'власти', 'школа',
+    'праздник', 'концерт', 'выставка', 'ремонт', 'мост', 'парк', 'река',
+    'снег', 'дождь', 'утро', 'вечер', 'открытие', 'сезон', 'матч',
+    'команда', 'победа', 'рынок', 'цены', 'транспорт', 'метро', 'автобус',
+    'больница', 'библиотека', 'музей', 'театр', 'фестиваль', 'улица',
+    'район', 'проект', 'строительство', 'решение', 'событие', 'история',
+)
+# Ограничение SQLite на число параметров в одном запросе.
+LOOKUP_CHUNK = 900
+
+
+def sentence(rng, low=5, high=15):
+    words = rng.choices(WORDS, k=rng.randint(low, high))
+    return ' '.join(words).capitalize() + '.'
+
+
+def paragraph(rng, sentences):
+    return ' '.join(sentence(rng) for _ in range(sentences))
+
+
+def popularity(count, skew):
+    """Кумулятивные веса закона Ципфа: k-й по популярности получает 1/k**s."""
+    return list(accumulate(1 / rank ** skew for rank in range(1, count + 1)))
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def create_users(count, prefix, password):
+    """Создаёт недостающих пользователей prefix0..prefixN-1, возвращает id."""
+    usernames = [f'{prefix}{index}' for index in range(count)]
+    password = make_password(password)
+    User.objects.bulk_create(
+        (User(username=name, password=password) for name in usernames),
+        ignore_conflicts=True,
+    )
+    ids = []
+    for batch in batches(usernames, LOOKUP_CHUNK):
+        ids.extend(User.objects.filter(
+            username__in=batch
+        ).values_list('pk', flat=True))
+    return ids
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет базу пользователями, новостями и комментариями '
+        'для нагрузочных проверок.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--news', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Показатель закона Ципфа для комментариев по новостям.'
+        )
+        parser.add_argument(
+            '--paragraphs', type=int, default=5,
+            help='Среднее число абзацев в тексте новости.'
+        )
+        parser.add_argument('--days', type=int, default=365)
+        parser.add_argument('--prefix', default='reader')
+        parser.add_argument('--password', default='password')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        users = create_users(
+            options['users'], options['prefix'], options['password']
+        )
+        news = self.create_news(rng, options)
+        comments = self.create_comments(rng, news, users, options)
+        with transaction.atomic():
+            search.rebuild()
+        self.stdout.write(
+            f'Создано: пользователей {len(users)}, новостей {len(news)}, '
+            f'комментариев {comments}'
+        )
+
+    def create_news(self, rng, options):
+        last_id = News.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+        today = date.today()
+        for batch in batches(range(options['news']), options['batch_size']):
+            News.objects.bulk_create(
+                News(
+                    title=sentence(rng, 2, 5)[:50],
+                    text='\n\n'.join(
+                        paragraph(rng, rng.randint(3, 8))
+                        for _ in range(
+                            rng.randint(1, 2 * options['paragraphs'])
+                        )
+                    ),
+                    date=today - timedelta(
+                        days=rng.randrange(options['days'])
+                    ),
+                )
+                for _ in batch
+            )
+        # bulk_create в SQLite не возвращает id.
+        return list(News.objects.filter(pk__gt=last_id).order_by(
+            'pk'
+        ).values_list('pk', flat=True))
+
+    def create_comments(self, rng, news, users, options):
+        """
+        Комментарии распределяются по новостям и авторам по Ципфу.
+
+        Порядок новостей перемешивается, поэтому самые обсуждаемые — не
+        обязательно самые свежие. Комментарии создаются по новостям
+        подряд, так что пачка bulk_create обновляет счётчики и индекс
+        лишь нескольких новостей.
+        """
+        if not news or not users:
+            return 0
+        news = rng.sample(news, len(news))
+        targets = sorted(rng.choices(
+            news,
+            cum_weights=popularity(len(news), options['skew']),
+            k=options['comments'],
+        ))
+        authors = popularity(len(users), options['skew'])
+        for batch in batches(targets, options['batch_size']):
+            Comment.objects.bulk_create(
+                Comment(
+                    news_id=news_id,
+                    author_id=rng.choices(users, cum_weights=authors)[0],
+                    text='\n'.join(
+                        sentence(rng) for _ in range(rng.choice((1, 1, 2, 4)))
+                    ),
+                )
+                for news_id in batch
+            )
+        return len(targets)
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from yanews import template_profile
+
+
+class Command(BaseCommand):
+    help = (
+        'Компилирует все шаблоны проекта и выводит время компиляции; '
+        'падает на первой синтаксической ошибке.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Включить шаблоны установленных пакетов (admin и др.).'
+        )
+        parser.add_argument('--limit', type=int, default=10)
+
+    def handle(self, *args, **options):
+        compiled = template_profile.warm_up(include_all=options['all'])
+        for name, seconds in sorted(compiled, key=lambda item: -item[1])[
+            :options['limit']
+        ]:
+            self.stdout.write(f'{seconds * 1000:>9.2f} мс  {name}')
+        total = sum(seconds for _, seconds in compiled)
+        self.stdout.write(
+            f'Скомпилировано шаблонов: {len(compiled)} '
+            f'за {total * 1000:.1f} мс'
+        )
+        if not template_profile.is_cached():
+            self.stderr.write(
+                'Кэширующий загрузчик выключен: в этом процессе шаблоны '
+                'будут разбираться заново (DEBUG = True?).'
+            )
@@ -0,0 +1,43 @@
+# Generated by Django 3.2.15 on 2026-10-18 18:44
+
+from django.db import migrations, models
+
+CHUNK_SIZE = 200
+# Значение NEWS_EXCERPT_WORDS на момент миграции; после его смены анонсы
+# пересчитывает команда backfill_excerpts.
+EXCERPT_WORDS = 15
+
+
+def fill_excerpt(apps, schema_editor):
+    News = apps.get_model('news', 'News')
+    words = EXCERPT_WORDS
+    last_id = 0
+    while True:
+        chunk = list(News.objects.filter(pk__gt=last_id).order_by('pk').only(
+            'id', 'text'
+        )[:CHUNK_SIZE])
+        if not chunk:
+            break
+        last_id = chunk[-1].pk
+        for news in chunk:
+            parts = news.text.split(None, words)
+            news.excerpt = ' '.join(parts[:words]) + (
+                ' …' if len(parts) > words else ''
+            )
+        News.objects.bulk_update(chunk, ('excerpt',))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='excerpt',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.RunPython(fill_excerpt, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 3.2.15 on 2026-10-18 18:47
+
+from django.db import migrations, models
+from django.template.defaultfilters import linebreaksbr
+
+CHUNK_SIZE = 500
+
+
+def fill_text_html(apps, schema_editor):
+    Comment = apps.get_model('news', 'Comment')
+    last_id = 0
+    while True:
+        chunk = list(Comment.objects.filter(pk__gt=last_id).order_by(
+            'pk'
+        ).only('id', 'text')[:CHUNK_SIZE])
+        if not chunk:
+            break
+        last_id = chunk[-1].pk
+        for comment in chunk:
+            comment.text_html = str(
+                linebreaksbr(comment.text, autoescape=True)
+            )
+        Comment.objects.bulk_update(chunk, ('text_html',))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_news_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='text_html',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.RunPython(fill_text_html, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.15 on 2026-10-18 19:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_comment_text_html'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='newssearchterm',
+            index=models.Index(fields=['term', 'news', 'weight'], name='news_search_term_cover_idx'),
+        ),
+    ]
@@ -1,37 +1,172 @@
 from datetime import datetime
 
+from collections import Counter
+
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.template.defaultfilters import linebreaksbr
+
+from .cache import invalidate_news
+
+
+def make_excerpt(text, words=None):
+    """
+    То же, что {{ text|truncatewords:N }}, без разбиения всего текста.
+
+    split с maxsplit отделяет только первые N слов, поэтому анонс статьи
+    в сотни килобайт не требует списка из всех её слов.
+    """
+    words = words or settings.NEWS_EXCERPT_WORDS
+    parts = text.split(None, words)
+    if len(parts) > words:
+        return ' '.join(parts[:words]) + ' …'
+    return ' '.join(parts)
+
+
+def render_comment_html(text):
+    """
+    То же, что {{ text|linebreaksbr }}: экранированный текст с <br>.
+
+    Результат хранится в Comment.text_html и выводится в шаблоне без
+    повторного экранирования.
+    """
+    return str(linebreaksbr(text, autoescape=True))
+
+
+class NewsQuerySet(models.QuerySet):
+
+    def for_list(self):
+        """Только поля, которые выводятся в списках новостей, без текста."""
+        return self.only('id', 'title', 'date', 'comment_count', 'excerpt')
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """bulk_create не вызывает save(), поэтому анонсы считаем здесь."""
+        objs = list(objs)
+        for news in objs:
+            news.excerpt = make_excerpt(news.text)
+        return super().bulk_create(objs, *args, **kwargs)
 
 
 class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
+    # Анонс для списков: первые NEWS_EXCERPT_WORDS слов текста. Считается
+    # при сохранении; после смены настройки — командой backfill_excerpts.
+    excerpt = models.TextField(default='', editable=False)
     date = models.DateField(default=datetime.today)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = NewsQuerySet.as_manager()
 
     class Meta:
-        ordering = ('-date',)
+        ordering = ('-date', '-id')
+        indexes = (
+            models.Index(fields=('-date', '-id'), name='news_date_id_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # Анонс считает news.signals.fill_excerpt; при сохранении
+        # части полей он должен попасть в запись вместе с текстом.
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        super().save(*args, **kwargs)
+
+
+class CommentQuerySet(models.QuerySet):
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        bulk_create не вызывает save() и не отправляет сигналы post_save.
+
+        Поэтому HTML комментариев и счётчики обновляем здесь же,
+        одним UPDATE на каждую затронутую новость, сбрасываем кэш
+        и добавляем комментарии в поисковый индекс.
+        """
+        from .search import index_comments
+
+        objs = list(objs)
+        for comment in objs:
+            comment.text_html = render_comment_html(comment.text)
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            index_comments(objs)
+            counts = Counter(comment.news_id for comment in objs)
+            for news_id, count in counts.items():
+                News.objects.using(self.db).filter(pk=news_id).update(
+                    comment_count=F('comment_count') + count
+                )
+                invalidate_news(news_id)
+        return objs
+
 
 class Comment(models.Model):
     news = models.ForeignKey(
         News,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        # Покрывается составным индексом comment_news_created_idx.
+        db_index=False,
     )
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
     text = models.TextField()
+    # Текст, уже обработанный как {{ text|linebreaksbr }}. Считается при
+    # сохранении; для старых записей — командой backfill_comment_html.
+    text_html = models.TextField(default='', editable=False)
     created = models.DateTimeField(auto_now_add=True)
 
+    objects = CommentQuerySet.as_manager()
+
     class Meta:
-        ordering = ('created',)
+        ordering = ('created', 'id')
+        indexes = (
+            models.Index(
+                fields=('news', 'created', 'id'),
+                name='comment_news_created_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
+
+    def save(self, *args, **kwargs):
+        # HTML считает news.signals.fill_comment_html; при сохранении
+        # части полей он должен попасть в запись вместе с текстом.
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'text_html'}
+        super().save(*args, **kwargs)
+
+
+class NewsSearchTerm(models.Model):
+    """
+    Запись обратного индекса поиска: вес основы слова в новости.
+
+    Вес складывается из вхождений в заголовок, текст и комментарии
+    новости и поддерживается инкрементально, см. news.search.
+    """
+    term = models.CharField(max_length=50)
+    news = models.ForeignKey(News, on_delete=models.CASCADE)
+    weight = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('term', 'news'), name='news_search_term_unique'
+            ),
+        )
+        # Поиск читает только этот индекс, не обращаясь к таблице.
+        indexes = (
+            models.Index(
+                fields=('term', 'news', 'weight'),
+                name='news_search_term_cover_idx'
+            ),
+        )
@@ -0,0 +1,48 @@
+import base64
+import binascii
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+
+from .models import Comment
+
+
+def encode_cursor(comment):
+    """Курсор — это пара (created, id) последнего показанного комментария."""
+    raw = f'{comment.created.isoformat()}|{comment.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Разбирает курсор; при некорректном значении бросает ValueError."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created), int(pk)
+    except (binascii.Error, UnicodeError) as error:
+        raise ValueError(cursor) from error
+
+
+def comments_page(news_id, after=None, size=None):
+    """
+    Возвращает страницу комментариев новости и курсор следующей страницы.
+
+    Пагинация keyset по (created, id): каждая страница — это один
+    запрос по индексу, без OFFSET.
+    """
+    size = size or settings.COMMENTS_PAGE_SIZE
+    queryset = Comment.objects.filter(
+        news_id=news_id
+    ).select_related('author').order_by('created', 'id')
+    if after:
+        created, pk = decode_cursor(after)
+        queryset = queryset.filter(
+            Q(created__gt=created) | Q(created=created, pk__gt=pk)
+        )
+    comments = list(queryset[:size + 1])
+    next_cursor = None
+    if len(comments) > size:
+        comments = comments[:size]
+        next_cursor = encode_cursor(comments[-1])
+    return comments, next_cursor
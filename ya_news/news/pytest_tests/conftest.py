@@ -1,46 +1,158 @@
+import copy
+import os
+from types import SimpleNamespace
+
 import pytest
 
 from datetime import timedelta
 
+from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.urls import reverse
 from django.utils import timezone
 from django.conf import settings
+from django.core.cache import caches
 from django.test.client import Client
 
 from news.models import News, Comment
 
 
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix):
+    """Файл тестовой БД воркера, который задаёт run_tests.py."""
+    name = os.environ.get('TEST_DB_NAME')
+    if name:
+        settings.DATABASES['default'].setdefault('TEST', {})['NAME'] = name
+
+
+@pytest.fixture(autouse=True)
+def clear_page_cache():
+    """Кэш страниц не должен переживать тест: id объектов повторяются."""
+    caches[settings.NEWS_CACHE_ALIAS].clear()
+
+
+def create_author():
+    return get_user_model().objects.create(username='Автор')
+
+
+def create_not_author():
+    return get_user_model().objects.create(username='Не автор')
+
+
+def create_news():
+    return News.objects.create(title='Заголовок', text='Текст заметки')
+
+
+def login(user):
+    """Ключ сессии пользователя после force_login."""
+    client = Client()
+    client.force_login(user)
+    return client.cookies[settings.SESSION_COOKIE_NAME].value
+
+
+def logged_in_client(session_key):
+    """
+    Клиент с готовой сессией вместо нового force_login.
+
+    Кэш очищается перед каждым тестом, поэтому сессия заново кладётся
+    в него, как это делает force_login, — иначе первый запрос теста
+    читал бы её из БД и бюджеты запросов разошлись бы.
+    """
+    client = Client()
+    client.cookies[settings.SESSION_COOKIE_NAME] = session_key
+    client.session.load()
+    return client
+
+
+def uses_shared_data(module):
+    """Общие данные нужны модулю, если в нём есть тесты без transaction."""
+    marker = module.get_closest_marker('django_db')
+    if marker and marker.kwargs.get('transaction'):
+        return False
+    return any(
+        item.get_closest_marker('django_db')
+        for item in module.session.items
+        if item.module is module.obj
+    )
+
+
+@pytest.fixture(scope='module', autouse=True)
+def shared_data(request, django_db_blocker):
+    """
+    Пользователи, новость и сессии, общие для всех тестов модуля.
+
+    Создаются один раз в транзакции модуля, которая откатывается после
+    его последнего теста. Тест идёт внутри неё в собственной точке
+    сохранения (её открывает pytest-django), поэтому его изменения
+    откатываются, а общие данные остаются. Для модулей с
+    transaction=True и модулей без БД возвращает None: там фикстуры
+    создают объекты для каждого теста, как раньше.
+
+    Фикстура автоматическая: модульная транзакция должна открыться раньше
+    транзакции теста, а lazy_fixture в параметрах запрашивает фикстуры
+    уже после неё.
+    """
+    if not uses_shared_data(request.node):
+        yield None
+        return
+    request.getfixturevalue('django_db_setup')
+    atomic = transaction.atomic()
+    with django_db_blocker.unblock():
+        atomic.__enter__()
+        try:
+            author = create_author()
+            not_author = create_not_author()
+            data = SimpleNamespace(
+                author=author,
+                not_author=not_author,
+                news=create_news(),
+                sessions={user.pk: login(user) for user in (
+                    author, not_author
+                )},
+            )
+        except Exception:
+            transaction.set_rollback(True)
+            atomic.__exit__(None, None, None)
+            raise
+    yield data
+    with django_db_blocker.unblock():
+        transaction.set_rollback(True)
+        atomic.__exit__(None, None, None)
+
+
 @pytest.fixture
-def author(django_user_model):
-    return django_user_model.objects.create(username='Автор')
+def author(shared_data, db):
+    if shared_data is None:
+        return create_author()
+    return copy.deepcopy(shared_data.author)
 
 
 @pytest.fixture
-def not_author(django_user_model):
-    return django_user_model.objects.create(username='Не автор')
+def not_author(shared_data, db):
+    if shared_data is None:
+        return create_not_author()
+    return copy.deepcopy(shared_data.not_author)
 
 
 @pytest.fixture
-def author_client(author):
-    client = Client()
-    client.force_login(author)
-    return client
+def author_client(shared_data, author):
+    if shared_data is None:
+        return logged_in_client(login(author))
+    return logged_in_client(shared_data.sessions[author.pk])
 
 
 @pytest.fixture
-def not_author_client(not_author):
-    client = Client()
-    client.force_login(not_author)
-    return client
+def not_author_client(shared_data, not_author):
+    if shared_data is None:
+        return logged_in_client(login(not_author))
+    return logged_in_client(shared_data.sessions[not_author.pk])
 
 
 @pytest.fixture
-def news():
-    news = News.objects.create(
-        title='Заголовок',
-        text='Текст заметки',
-    )
-    return news
+def news(shared_data, db):
+    if shared_data is None:
+        return create_news()
+    return copy.deepcopy(shared_data.news)
 
 
 @pytest.fixture
@@ -85,7 +197,7 @@ def all_comments(news, author):
 
 @pytest.fixture
 def id_for_comment(comment):
-    return (comment.news.id,)
+    return (comment.id,)
 
 
 @pytest.fixture
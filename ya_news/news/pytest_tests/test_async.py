@@ -0,0 +1,73 @@
+import asyncio
+from urllib.parse import urlencode
+
+import pytest
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.db import SessionStore
+from django.http import Http404
+from django.test import AsyncRequestFactory
+
+from news.models import Comment
+from news.views import AsyncNewsDetail, AsyncNewsList
+
+factory = AsyncRequestFactory()
+
+
+def call(view_class, request, **kwargs):
+    if not hasattr(request, 'user'):
+        request.user = AnonymousUser()
+    request.session = SessionStore()
+    return async_to_sync(view_class.as_view())(request, **kwargs)
+
+
+def test_views_are_coroutines():
+    """Проверка, что представления асинхронные"""
+    assert asyncio.iscoroutinefunction(AsyncNewsList.as_view())
+    assert asyncio.iscoroutinefunction(AsyncNewsDetail.as_view())
+
+
+@pytest.mark.django_db
+def test_list_renders_news(all_news, settings):
+    """Проверка списка новостей в асинхронном представлении"""
+    response = call(AsyncNewsList, factory.get('/'))
+    assert response.status_code == 200
+    assert response.is_rendered
+    assert len(response.context_data['object_list']) == (
+        settings.NEWS_COUNT_ON_HOME_PAGE
+    )
+
+
+@pytest.mark.django_db
+def test_cached_page_served_without_queries(
+        news, django_assert_num_queries
+):
+    """Проверка ответа из кэша страниц без запросов к БД"""
+    first = call(AsyncNewsDetail, factory.get('/'), pk=news.pk)
+    with django_assert_num_queries(0):
+        second = call(AsyncNewsDetail, factory.get('/'), pk=news.pk)
+    assert second.content == first.content
+
+
+@pytest.mark.django_db
+def test_missing_news_raises_404():
+    """Проверка 404 для несуществующей новости"""
+    with pytest.raises(Http404):
+        call(AsyncNewsDetail, factory.get('/'), pk=404)
+
+
+@pytest.mark.django_db
+def test_post_creates_comment(news, author):
+    """Проверка создания комментария асинхронным представлением"""
+    request = factory.post(
+        '/',
+        urlencode({'text': 'Асинхронный комментарий'}),
+        content_type='application/x-www-form-urlencoded'
+    )
+    request.user = author
+    response = call(AsyncNewsDetail, request, pk=news.pk)
+    assert response.status_code == 302
+    assert Comment.objects.filter(
+        news=news, author=author, text='Асинхронный комментарий'
+    ).exists()
@@ -0,0 +1,71 @@
+import pytest
+
+from django.urls import reverse
+
+from yanews import auth
+
+HOME_URL = reverse('news:home')
+
+
+@pytest.fixture
+def user_cache(settings):
+    settings.USER_CACHE_ENABLED = True
+    settings.SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('user_cache')
+def test_user_loaded_from_cache(author_client, django_assert_num_queries):
+    """Проверка, что повторный запрос не читает сессию и пользователя"""
+    author_client.get(HOME_URL)
+    # Только ETag и список новостей.
+    with django_assert_num_queries(2):
+        response = author_client.get(HOME_URL)
+    assert response.context['user'].is_authenticated
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('user_cache')
+def test_password_change_invalidates_cached_user(author_client, author):
+    """Проверка выхода из всех сессий после смены пароля"""
+    author_client.get(HOME_URL)
+    author.set_password('новый пароль')
+    author.save()
+    response = author_client.get(HOME_URL)
+    assert not response.context['user'].is_authenticated
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('user_cache')
+def test_logout_drops_cached_user(author_client):
+    """Проверка удаления пользователя из кэша при выходе"""
+    response = author_client.get(HOME_URL)
+    user_key, _ = auth.cache_keys(response.wsgi_request)
+    assert auth.get_cache().get(user_key) is not None
+    author_client.get(reverse('users:logout'))
+    assert auth.get_cache().get(user_key) is None
+
+
+@pytest.mark.django_db
+def test_user_cache_disabled_by_default(author_client):
+    """Проверка, что по умолчанию пользователь читается из БД"""
+    author_client.get(HOME_URL)
+    response = author_client.get(HOME_URL)
+    assert auth.get_cache().get(
+        auth.cache_keys(response.wsgi_request)[0]
+    ) is None
+
+
+def test_process_local_cache_warning(settings):
+    """Проверка предупреждения о LocMemCache при кэше пользователя"""
+    assert auth.check_shared_cache(None) == []
+    settings.USER_CACHE_ENABLED = True
+    assert [
+        warning.id for warning in auth.check_shared_cache(None)
+    ] == ['yanews.W001']
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        },
+    }
+    assert auth.check_shared_cache(None) == []
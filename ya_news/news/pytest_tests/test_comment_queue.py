@@ -0,0 +1,62 @@
+import time
+
+import pytest
+
+from django.db import OperationalError
+
+from news.comment_queue import CommentQueue
+from news.models import Comment, News
+
+# Очередь пишет из своего потока и своего соединения: данные теста должны
+# быть зафиксированы, а не лежать в общей транзакции модуля (см. conftest).
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def test_comment_queue_flushes_batches(news, author):
+    """Проверка пакетной записи по размеру очереди и при остановке"""
+    queue = CommentQueue(batch_size=3, interval=60)
+    for index in range(3):
+        queue.put(Comment(news=news, author=author, text=f'Текст {index}'))
+    deadline = time.monotonic() + 5
+    while Comment.objects.count() < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert Comment.objects.count() == 3
+    queue.put(Comment(news=news, author=author, text='Последний'))
+    assert len(queue) == 1
+    queue.stop()
+    assert Comment.objects.count() == 4
+    news.refresh_from_db()
+    assert news.comment_count == 4
+
+
+def test_comment_queue_drops_broken_comments(news, author):
+    """Проверка, что сбойный комментарий не задерживает остальные"""
+    orphan = News.objects.create(title='Удалённая', text='Текст')
+    queue = CommentQueue(batch_size=10, interval=60)
+    queue.put(Comment(news=orphan, author=author, text='Сирота'))
+    News.objects.filter(pk=orphan.pk).delete()
+    for index in range(3):
+        queue.put(Comment(news=news, author=author, text=f'Текст {index}'))
+    assert queue.flush() == 3
+    assert len(queue) == 0
+    assert Comment.objects.count() == 3
+    queue.stop()
+
+
+def test_comment_queue_limits_retries(news, author, monkeypatch):
+    """Проверка повторов пачки после OperationalError и их предела"""
+    calls = []
+
+    def locked(objs):
+        calls.append(len(objs))
+        raise OperationalError('database is locked')
+
+    monkeypatch.setattr(Comment.objects, 'bulk_create', locked)
+    queue = CommentQueue(batch_size=10, interval=60, max_retries=2)
+    queue.put(Comment(news=news, author=author, text='Текст'))
+    assert queue.flush() == 0
+    assert queue.flush() == 0
+    assert len(queue) == 1
+    assert queue.flush() == 0
+    assert len(queue) == 0
+    assert calls == [1, 1, 1]
@@ -1,9 +1,26 @@
 import pytest
 
+import json
+import logging
+import time
+from http import HTTPStatus
+from io import StringIO
+from types import SimpleNamespace
+
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.db import connection
+from django.template import defaultfilters
+from django.template.base import Node
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.conf import settings
 
+from news import cache
 from news.forms import CommentForm
+from news.models import Comment
+from yanews import template_profile
 
 
 @pytest.mark.parametrize(
@@ -85,3 +102,239 @@ def test_authorized_client_has_form(author_client, name, args):
     response = author_client.get(url)
     assert 'form' in response.context
     assert isinstance(response.context['form'], CommentForm)
+
+
+@pytest.mark.usefixtures('all_comments')
+@pytest.mark.django_db
+def test_detail_shows_first_comments_page(client, news, settings):
+    """Проверка, что на странице новости выводится только первая страница
+    комментариев, а остальные подгружаются по курсору
+    """
+    settings.COMMENTS_PAGE_SIZE = 1
+    response = client.get(reverse('news:detail', args=(news.id,)))
+    first_page = response.context['comments']
+    assert len(first_page) == 1
+    next_url = response.context['next_url']
+    assert next_url is not None
+    response = client.get(next_url.replace('&format=html', ''))
+    data = response.json()
+    assert [item['text'] for item in data['comments']] == ['Текст 1']
+    assert first_page[0].text == 'Текст 0'
+    assert data['next'] is None
+
+
+@pytest.mark.django_db
+def test_comments_page_rejects_bad_cursor(client, news):
+    """Проверка ответа 400 на некорректный курсор"""
+    url = reverse('news:comments', args=(news.id,))
+    response = client.get(url, {'after': 'не курсор'})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.fixture(params=('locmem', 'filebased'))
+def page_cache(request, settings, tmp_path):
+    backends = {
+        'locmem': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'filebased': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': tmp_path,
+        },
+    }
+    settings.CACHES = {settings.NEWS_CACHE_ALIAS: backends[request.param]}
+
+
+@pytest.mark.parametrize(
+    'name, args',
+    (
+        ('news:home', None),
+        ('news:detail', pytest.lazy_fixture('id_for_news')),
+    ),
+)
+@pytest.mark.usefixtures('page_cache')
+@pytest.mark.django_db
+def test_anonymous_page_is_cached_and_invalidated(
+    client, django_assert_num_queries, name, args, news, author
+):
+    """Проверка кэширования страниц для анонима и сброса кэша
+    при появлении комментария
+    """
+    url = reverse(name, args=args)
+    client.get(url)
+    with django_assert_num_queries(0):
+        cached = client.get(url)
+    Comment.objects.create(news=news, author=author, text='Новый коммент')
+    response = client.get(url)
+    assert response.content != cached.content
+    assert response.context is not None
+
+
+@pytest.mark.parametrize(
+    'name, args',
+    (('news:detail', pytest.lazy_fixture('id_for_news')),),
+)
+@pytest.mark.django_db
+def test_authorized_page_is_not_cached(
+    client, author_client, name, args, comment
+):
+    """Проверка, что авторизованный пользователь видит форму и ссылки
+    редактирования даже после того, как страница попала в кэш
+    """
+    url = reverse(name, args=args)
+    edit_url = reverse('news:edit', args=(comment.id,))
+    assert edit_url not in client.get(url).content.decode()
+    response = author_client.get(url)
+    assert 'form' in response.context
+    assert edit_url in response.content.decode()
+
+
+@pytest.mark.usefixtures('all_news')
+@pytest.mark.django_db
+def test_query_budget_middleware(client, settings, tmp_path):
+    """Проверка заголовка Server-Timing и отчёта query_report"""
+    settings.QUERY_BUDGET_ENABLED = True
+    settings.QUERY_BUDGET_LOG = tmp_path / 'query_budget.jsonl'
+    response = client.get(reverse('news:home'))
+    assert 'db;dur=' in response['Server-Timing']
+    assert '2 queries' in response['Server-Timing']
+    out = StringIO()
+    call_command('query_report', stdout=out)
+    assert 'news:home' in out.getvalue()
+
+
+@pytest.mark.usefixtures('all_news')
+@pytest.mark.django_db
+def test_middleware_stays_async_under_asgi(settings, tmp_path, caplog):
+    """Проверка, что под ASGI middleware проекта не адаптируются к sync"""
+    settings.DEBUG = True
+    settings.QUERY_BUDGET_ENABLED = True
+    settings.QUERY_BUDGET_LOG = tmp_path / 'query_budget.jsonl'
+
+    async def get(url):
+        return await AsyncClient().get(url)
+
+    with caplog.at_level(logging.DEBUG, logger='django.request'):
+        response = async_to_sync(get)(reverse('news:home'))
+    assert not [
+        record for record in caplog.records
+        if record.getMessage().endswith('adapted.')
+    ]
+    assert '2 queries' in response['Server-Timing']
+
+
+@pytest.mark.usefixtures('all_news')
+@pytest.mark.django_db
+def test_home_page_skips_news_text(author_client):
+    """Проверка, что главная не загружает полный текст новостей"""
+    with CaptureQueriesContext(connection) as queries:
+        response = author_client.get(reverse('news:home'))
+    assert not any(
+        '"news_news"."text"' in query['sql'] for query in queries
+    )
+    news = response.context['object_list'][0]
+    assert news.excerpt in response.content.decode()
+
+
+@pytest.mark.usefixtures('comment')
+@pytest.mark.django_db
+def test_template_timing(author_client, id_for_news, settings, tmp_path):
+    """Проверка времени по шаблонам в журнале и отчёте query_report"""
+    render_annotated = Node.render_annotated
+    settings.QUERY_BUDGET_ENABLED = True
+    settings.TEMPLATES = template_profile.timed(settings.TEMPLATES)
+    settings.QUERY_BUDGET_LOG = tmp_path / 'query_budget.jsonl'
+    author_client.get(reverse('news:detail', args=id_for_news))
+    record = json.loads(settings.QUERY_BUDGET_LOG.read_text())
+    assert {
+        'base.html', 'includes/header.html', 'news/detail.html', '|safe'
+    } <= set(record['templates'])
+    out = StringIO()
+    call_command('query_report', templates=True, stdout=out)
+    assert 'news/detail.html' in out.getvalue()
+    # Замер живёт только в движке из timed(), сам Django не меняется.
+    assert defaultfilters.register.filters['safe'] is defaultfilters.safe
+    assert Node.render_annotated is render_annotated
+
+
+def test_warmup_templates_compiles_project_templates():
+    """Проверка компиляции всех шаблонов командой warmup_templates"""
+    out = StringIO()
+    call_command('warmup_templates', limit=100, stdout=out, stderr=StringIO())
+    assert 'news/detail.html' in out.getvalue()
+    assert 'admin/' not in out.getvalue()
+
+
+@pytest.mark.parametrize(
+    'name, args',
+    (
+        ('news:home', None),
+        ('news:detail', pytest.lazy_fixture('id_for_news')),
+    ),
+)
+@pytest.mark.parametrize(
+    'parametrized_client',
+    (pytest.lazy_fixture('client'), pytest.lazy_fixture('author_client')),
+)
+@pytest.mark.django_db
+def test_conditional_get(
+    parametrized_client, django_assert_max_num_queries, name, args, news,
+    author
+):
+    """Проверка ответа 304 на повторный запрос и смены ETag
+    при новом комментарии
+    """
+    url = reverse(name, args=args)
+    response = parametrized_client.get(url)
+    etag = response['ETag']
+    with django_assert_max_num_queries(3):
+        not_modified = parametrized_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+    assert not_modified['ETag'] == etag
+    Comment.objects.create(news=news, author=author, text='Новый коммент')
+    response = parametrized_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+
+
+@pytest.mark.django_db
+def test_last_modified_follows_comment_edit(client, comment, monkeypatch):
+    """Проверка, что правка комментария сдвигает Last-Modified"""
+    url = reverse('news:detail', args=(comment.news_id,))
+    last_modified = client.get(url)['Last-Modified']
+    assert client.get(
+        url, HTTP_IF_MODIFIED_SINCE=last_modified
+    ).status_code == HTTPStatus.NOT_MODIFIED
+    later = time.time() + 5
+    monkeypatch.setattr(cache, 'time', SimpleNamespace(time=lambda: later))
+    comment.text = 'Исправленный текст'
+    comment.save()
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == HTTPStatus.OK
+    assert 'Исправленный текст' in response.content.decode()
+    assert response['Last-Modified'] != last_modified
+
+
+@pytest.mark.django_db
+def test_etag_follows_csrf_token(author_client, id_for_news):
+    """Проверка, что после смены токена CSRF форма приходит заново"""
+    url = reverse('news:detail', args=id_for_news)
+    response = author_client.get(url)
+    etag = response['ETag']
+    assert not response.has_header('Last-Modified')
+    assert author_client.get(
+        url, HTTP_IF_NONE_MATCH=etag
+    ).status_code == HTTPStatus.NOT_MODIFIED
+    author_client.cookies[settings.CSRF_COOKIE_NAME] = 'x' * 64
+    response = author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+
+
+@pytest.mark.django_db
+def test_etag_depends_on_user(client, author_client, id_for_news):
+    """Проверка, что аноним не получит 304 на страницу автора"""
+    url = reverse('news:detail', args=id_for_news)
+    etag = author_client.get(url)['ETag']
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
@@ -0,0 +1,47 @@
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+
+def assert_uses_index(captured, table):
+    """Проверяет, что SELECT-запросы к таблице идут по индексу SQLite.
+
+    План каждого запроса получаем через EXPLAIN QUERY PLAN: в нём не должно
+    быть полного сканирования таблицы и сортировки во временном B-дереве.
+    """
+    queries = [
+        query['sql'] for query in captured
+        if query['sql'].startswith('SELECT')
+        and f'FROM "{table}"' in query['sql']
+    ]
+    assert queries, f'Запросы к {table} не выполнялись'
+    with connection.cursor() as cursor:
+        for sql in queries:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = ' | '.join(row[-1] for row in cursor.fetchall())
+            assert 'INDEX' in plan or 'PRIMARY KEY' in plan, plan
+            assert 'TEMP B-TREE' not in plan, plan
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='План запроса проверяем на SQLite'
+)
+@pytest.mark.parametrize(
+    'name, args, table',
+    (
+        ('news:home', None, 'news_news'),
+        ('news:detail', pytest.lazy_fixture('id_for_news'), 'news_comment'),
+        ('news:comments', pytest.lazy_fixture('id_for_news'), 'news_comment'),
+        ('news:edit', pytest.lazy_fixture('id_for_comment'), 'news_comment'),
+    ),
+)
+@pytest.mark.usefixtures('all_news', 'all_comments')
+@pytest.mark.django_db
+def test_hot_views_use_indexes(author_client, name, args, table):
+    """Проверка использования индексов в запросах нагруженных страниц"""
+    url = reverse(name, args=args)
+    with CaptureQueriesContext(connection) as captured:
+        author_client.get(url)
+    assert_uses_index(captured, table)
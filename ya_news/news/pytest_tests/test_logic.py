@@ -1,11 +1,21 @@
+import json
+from http import HTTPStatus
+from io import StringIO
+
 import pytest
 
 from pytest_django.asserts import assertRedirects, assertFormError
 
+from django.core.management import call_command
+from django.template.defaultfilters import linebreaksbr, truncatewords
 from django.urls import reverse
 
-from news.models import Comment
+from news.models import (
+    Comment, News, NewsSearchTerm, make_excerpt, render_comment_html,
+)
+from news.badwords import contains_bad_words
 from news.forms import BAD_WORDS, WARNING
+from news.throttle import MESSAGE
 
 
 @pytest.mark.parametrize(
@@ -126,3 +136,233 @@ def test_user_cant_edit_comment_of_another_user(
     not_author_client.post(url, data=form_data)
     comment.refresh_from_db()
     assert comment.text != form_data['text']
+
+
+@pytest.mark.parametrize(
+    'name, args',
+    (('news:detail', pytest.lazy_fixture('id_for_news')),),
+)
+def test_comment_count_follows_create_and_delete(
+    author_client, name, args, news, form_data
+):
+    """Проверка обновления счётчика комментариев при создании и удалении"""
+    url = reverse(name, args=args)
+    author_client.post(url, data=form_data)
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    comment = Comment.objects.get()
+    author_client.delete(reverse('news:delete', args=(comment.id,)))
+    news.refresh_from_db()
+    assert news.comment_count == 0
+
+
+@pytest.mark.django_db
+def test_comment_count_bulk_and_cascade(news, author):
+    """Проверка счётчика при bulk_create и каскадном удалении"""
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Текст {index}')
+        for index in range(3)
+    )
+    news.refresh_from_db()
+    assert news.comment_count == 3
+    author.delete()
+    news.refresh_from_db()
+    assert news.comment_count == 0
+
+
+@pytest.mark.parametrize('comments', (1, 200))
+@pytest.mark.django_db
+def test_news_delete_skips_comment_receivers(
+    news, author, comments, django_assert_max_num_queries
+):
+    """Проверка, что удаление новости не зависит от числа комментариев"""
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Текст {index}')
+        for index in range(comments)
+    )
+    # Выборка комментариев, их удаление пачками по 100, записи индекса
+    # и сама новость — без запросов на каждый комментарий.
+    with django_assert_max_num_queries(5):
+        news.delete()
+    assert not NewsSearchTerm.objects.exists()
+
+
+@pytest.mark.usefixtures('all_comments')
+@pytest.mark.django_db
+def test_recount_comments_fixes_drift(news):
+    """Проверка исправления расхождений командой recount_comments"""
+    News.objects.filter(pk=news.pk).update(comment_count=100)
+    call_command('recount_comments')
+    news.refresh_from_db()
+    assert news.comment_count == 2
+
+
+@pytest.mark.parametrize(
+    'text, expected',
+    (
+        ('Ты РЕДИСКА!', True),
+        ('негодяй', True),
+        ('Суп из редиски', False),
+        ('Негодяйство не пройдёт', False),
+        ('Обычный текст', False),
+    ),
+)
+def test_bad_words_matcher(text, expected):
+    """Проверка поиска запрещённых слов с учётом регистра и границ слов"""
+    assert contains_bad_words(text, default=BAD_WORDS) is expected
+
+
+def test_bad_words_reload_on_change(settings, tmp_path):
+    """Проверка пересборки выражения при смене списка слов"""
+    settings.BAD_WORDS = ('бяка',)
+    assert contains_bad_words('вот бяка')
+    words_file = tmp_path / 'bad_words.txt'
+    words_file.write_text('# список\nзлодей\n', encoding='utf-8')
+    settings.BAD_WORDS_FILE = words_file
+    assert contains_bad_words('злодей!')
+    assert not contains_bad_words('вот бяка')
+
+
+@pytest.mark.django_db
+def test_comment_rate_limit(author_client, id_for_news, form_data, settings):
+    """Проверка ограничения частоты комментариев одного пользователя"""
+    settings.NEWS_COMMENT_RATE_LIMIT = (2, 60)
+    url = reverse('news:detail', args=id_for_news)
+    for _ in range(2):
+        author_client.post(url, data=form_data)
+    response = author_client.post(url, data=form_data)
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assertFormError(response, 'form', None, MESSAGE)
+    assert Comment.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_comment_queue_sync_mode(
+    author_client, id_for_news, form_data, settings
+):
+    """Проверка записи комментария через очередь в синхронном режиме"""
+    settings.NEWS_COMMENT_QUEUE_ENABLED = True
+    settings.NEWS_COMMENT_QUEUE_SYNC = True
+    url = reverse('news:detail', args=id_for_news)
+    author_client.post(url, data=form_data)
+    assert Comment.objects.get().text == form_data['text']
+    assert News.objects.get().comment_count == 1
+
+
+@pytest.mark.django_db
+def test_seed_data_skews_comments():
+    """Проверка генерации данных командой seed_data"""
+    existing = list(News.objects.values_list('pk', flat=True))
+    call_command(
+        'seed_data', users=5, news=20, comments=200, batch_size=50,
+        stdout=StringIO()
+    )
+    counts = list(News.objects.exclude(pk__in=existing).order_by(
+        '-comment_count'
+    ).values_list('comment_count', flat=True))
+    assert len(counts) == 20
+    assert sum(counts) == Comment.objects.count() == 200
+    assert counts[0] > 200 / 20 * 3
+    assert NewsSearchTerm.objects.exists()
+
+
+@pytest.mark.parametrize(
+    'text',
+    (
+        'Одно слово',
+        ' Ровно  пятнадцать\nслов: ' + ' '.join(['слово'] * 12) + ' ',
+        'Много слов подряд ' * 20,
+        '',
+    ),
+)
+def test_excerpt_matches_truncatewords(text):
+    """Проверка совпадения анонса с фильтром truncatewords"""
+    assert make_excerpt(text, 15) == truncatewords(text, 15)
+
+
+@pytest.mark.django_db
+def test_excerpt_follows_text(news):
+    """Проверка пересчёта анонса при сохранении и bulk_create"""
+    news.text = 'Совсем новый текст'
+    news.save(update_fields=('text',))
+    news.refresh_from_db()
+    assert news.excerpt == 'Совсем новый текст'
+    News.objects.bulk_create([News(title='Пачка', text='Текст пачки')])
+    assert News.objects.get(title='Пачка').excerpt == 'Текст пачки'
+
+
+@pytest.mark.django_db
+def test_loaddata_fills_excerpt():
+    """Проверка анонсов у новостей из фикстуры"""
+    existing = list(News.objects.values_list('pk', flat=True))
+    call_command('loaddata', 'news.json', verbosity=0)
+    loaded = News.objects.exclude(pk__in=existing)
+    assert loaded.exists()
+    for news in loaded:
+        assert news.excerpt == make_excerpt(news.text)
+
+
+@pytest.mark.django_db
+def test_backfill_excerpts(news, settings):
+    """Проверка пересчёта анонсов командой backfill_excerpts"""
+    settings.NEWS_EXCERPT_WORDS = 1
+    call_command('backfill_excerpts', chunk_size=1, stdout=StringIO())
+    news.refresh_from_db()
+    assert news.excerpt == 'Текст …'
+
+
+@pytest.mark.parametrize(
+    'text',
+    (
+        'Строка',
+        '<script>alert(1)</script> & "кавычки"\nвторая\r\nтретья',
+        '',
+    ),
+)
+def test_comment_html_matches_linebreaksbr(text):
+    """Проверка совпадения HTML комментария с фильтром linebreaksbr"""
+    assert render_comment_html(text) == linebreaksbr(text, autoescape=True)
+
+
+@pytest.mark.django_db
+def test_comment_html_follows_text(author_client, comment, news, author):
+    """Проверка пересчёта HTML при правке комментария и bulk_create"""
+    assert comment.text_html == 'Текст комментария'
+    author_client.post(
+        reverse('news:edit', args=(comment.pk,)),
+        data={'text': '<b>Новый</b>\nтекст'},
+    )
+    comment.refresh_from_db()
+    assert comment.text_html == '&lt;b&gt;Новый&lt;/b&gt;<br>текст'
+    Comment.objects.bulk_create(
+        [Comment(news=news, author=author, text='a\nb')]
+    )
+    assert Comment.objects.get(text='a\nb').text_html == 'a<br>b'
+
+
+@pytest.mark.django_db
+def test_loaddata_fills_comment_html(comment, tmp_path):
+    """Проверка HTML у комментария, загруженного из фикстуры"""
+    fixture = tmp_path / 'comments.json'
+    fixture.write_text(json.dumps([{
+        'model': 'news.comment',
+        'fields': {
+            'news': comment.news_id,
+            'author': comment.author_id,
+            'text': 'a\nb',
+            'created': '2022-11-01T00:00:00Z',
+        },
+    }]))
+    call_command('loaddata', str(fixture), verbosity=0)
+    assert Comment.objects.get(text='a\nb').text_html == 'a<br>b'
+
+
+@pytest.mark.django_db
+def test_backfill_comment_html(comment):
+    """Проверка пересчёта HTML командой backfill_comment_html"""
+    Comment.objects.filter(pk=comment.pk).update(text='a & b', text_html='')
+    out = StringIO()
+    call_command('backfill_comment_html', chunk_size=1, stdout=out)
+    comment.refresh_from_db()
+    assert comment.text_html == 'a &amp; b'
+    assert out.getvalue().strip() == 'Обновлено комментариев: 1'
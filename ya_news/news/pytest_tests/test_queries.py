@@ -0,0 +1,104 @@
+import pytest
+
+from django.urls import reverse
+
+# Запись комментария дополнительно обновляет поисковый индекс:
+# INSERT OR IGNORE новых основ, SELECT записей и один UPDATE весов.
+# Перед рендерингом главной и новости один запрос считает ETag.
+# Для авторизованного клиента добавляются запросы сессии и пользователя.
+
+
+@pytest.mark.parametrize(
+    'name, args, parametrized_client, method, expected_queries',
+    (
+        ('news:home', None, pytest.lazy_fixture('client'), 'get', 2),
+        ('news:home', None, pytest.lazy_fixture('author_client'), 'get', 4),
+        (
+            'news:detail',
+            pytest.lazy_fixture('id_for_news'),
+            pytest.lazy_fixture('client'),
+            'get',
+            3
+        ),
+        (
+            'news:detail',
+            pytest.lazy_fixture('id_for_news'),
+            pytest.lazy_fixture('author_client'),
+            'get',
+            5
+        ),
+        (
+            'news:detail',
+            pytest.lazy_fixture('id_for_news'),
+            pytest.lazy_fixture('author_client'),
+            'post',
+            8
+        ),
+        (
+            'news:comments',
+            pytest.lazy_fixture('id_for_news'),
+            pytest.lazy_fixture('client'),
+            'get',
+            2
+        ),
+        (
+            'news:edit',
+            pytest.lazy_fixture('id_for_comment'),
+            pytest.lazy_fixture('author_client'),
+            'get',
+            3
+        ),
+        (
+            'news:edit',
+            pytest.lazy_fixture('id_for_comment'),
+            pytest.lazy_fixture('author_client'),
+            'post',
+            7
+        ),
+        (
+            'news:delete',
+            pytest.lazy_fixture('id_for_comment'),
+            pytest.lazy_fixture('author_client'),
+            'get',
+            3
+        ),
+        (
+            'news:delete',
+            pytest.lazy_fixture('id_for_comment'),
+            pytest.lazy_fixture('author_client'),
+            'post',
+            8
+        ),
+    )
+)
+@pytest.mark.usefixtures('all_news', 'all_comments')
+@pytest.mark.django_db
+def test_query_budget(
+    django_assert_num_queries, name, args, parametrized_client, method,
+    expected_queries, form_data
+):
+    """Проверка количества SQL-запросов на каждой странице"""
+    url = reverse(name, args=args)
+    with django_assert_num_queries(expected_queries):
+        getattr(parametrized_client, method)(url, data=form_data)
+
+
+@pytest.mark.parametrize(
+    'parametrized_client, expected_queries',
+    (
+        (pytest.lazy_fixture('client'), 2),
+        (pytest.lazy_fixture('author_client'), 4),
+    )
+)
+@pytest.mark.usefixtures('news')
+@pytest.mark.django_db
+def test_search_query_budget(
+    django_assert_num_queries, parametrized_client, expected_queries
+):
+    """Проверка количества SQL-запросов на странице поиска"""
+    # Число найденных и первые id — один запрос, затем сами новости.
+    with django_assert_num_queries(expected_queries):
+        response = parametrized_client.get(
+            reverse('news:search'), {'q': 'заметка'}
+        )
+    assert len(response.context['object_list']) == 1
@@ -0,0 +1,56 @@
+import pytest
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from yanews.middleware import PIN_COOKIE
+
+pytestmark = pytest.mark.django_db(
+    transaction=True, databases=['default', 'replica']
+)
+
+
+@pytest.fixture(autouse=True)
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ['replica']
+
+
+def replica_queries(client, url):
+    with CaptureQueriesContext(connections['replica']) as queries:
+        response = client.get(url)
+    return response, len(queries)
+
+
+@pytest.mark.parametrize('name', ('news:home', 'news:detail'))
+def test_authorized_reads_go_to_replica(author_client, news, name):
+    """Проверка чтения страниц авторизованного пользователя с реплики"""
+    args = (news.pk,) if name == 'news:detail' else None
+    _, count = replica_queries(author_client, reverse(name, args=args))
+    assert count > 0
+
+
+def test_anonymous_reads_stay_on_primary(client, news):
+    """Проверка, что кэшируемые анонимные страницы читаются из default"""
+    _, count = replica_queries(client, reverse('news:home'))
+    assert count == 0
+
+
+def test_read_after_write_is_pinned(author_client, news, form_data):
+    """Проверка, что после записи автор читает из default и видит её"""
+    url = reverse('news:detail', args=(news.pk,))
+    response = author_client.post(url, data=form_data)
+    assert PIN_COOKIE in response.cookies
+    response, count = replica_queries(author_client, url)
+    assert count == 0
+    assert form_data['text'] in response.content.decode()
+
+
+def test_write_views_use_primary(author_client, comment, form_data):
+    """Проверка, что редактирование не читает и не пишет в реплику"""
+    url = reverse('news:edit', args=(comment.pk,))
+    with CaptureQueriesContext(connections['replica']) as queries:
+        author_client.post(url, data=form_data)
+    assert len(queries) == 0
+    comment.refresh_from_db()
+    assert comment.text == form_data['text']
@@ -0,0 +1,120 @@
+import pytest
+
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+
+from news.models import Comment, News, NewsSearchTerm
+from news.search import SearchResults
+
+SEARCH_URL = reverse('news:search')
+
+
+def found(query):
+    return [news.pk for news in SearchResults(query)[:]]
+
+
+@pytest.mark.django_db
+def test_word_forms_match(news):
+    """Проверка поиска по другим формам слов"""
+    assert found('тексты заметки') == [news.pk]
+
+
+@pytest.mark.django_db
+def test_all_words_required(news):
+    """Проверка, что новость должна содержать все слова запроса"""
+    assert found('текст футбол') == []
+
+
+@pytest.mark.django_db
+def test_latin_query_is_transliterated(news):
+    """Проверка поиска по запросу латиницей"""
+    assert found('zagolovok') == [news.pk]
+
+
+@pytest.mark.django_db
+def test_title_outranks_comment(news, author):
+    """Проверка, что совпадение в заголовке выше, чем в комментарии"""
+    other = News.objects.create(title='Погода', text='Без осадков')
+    Comment.objects.create(news=news, author=author, text='Погода хорошая')
+    assert found('погода') == [other.pk, news.pk]
+
+
+@pytest.mark.parametrize('head, page_queries', ((100, 1), (1, 2)))
+@pytest.mark.django_db
+def test_pages_ranked_in_sql(
+    news, django_assert_num_queries, monkeypatch, head, page_queries
+):
+    """Проверка счёта и страниц выдачи одним запросом к индексу"""
+    monkeypatch.setattr(SearchResults, 'HEAD', head)
+    others = [
+        News.objects.create(title='Заметка ' * count, text='Текст заметки')
+        for count in (3, 2)
+    ]
+    results = SearchResults('заметки текст')
+    with django_assert_num_queries(1):
+        assert results.count() == 3
+    with django_assert_num_queries(page_queries):
+        assert [item.pk for item in results[1:3]] == [others[1].pk, news.pk]
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='План запроса проверяем на SQLite'
+)
+@pytest.mark.django_db
+def test_search_reads_covering_index():
+    """Проверка, что поиск читает только покрывающий индекс"""
+    results = SearchResults('погода zagolovok')
+    sql, params = results.ranked().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        plan = ' | '.join(row[-1] for row in cursor.fetchall())
+    assert 'COVERING INDEX news_search_term_cover_idx' in plan, plan
+
+
+@pytest.mark.django_db
+def test_comment_edit_updates_index(comment):
+    """Проверка обновления индекса при правке комментария"""
+    assert found('комментарий') == [comment.news_id]
+    comment.text = 'Совсем другое'
+    comment.save()
+    assert found('комментарий') == []
+    assert found('другое') == [comment.news_id]
+
+
+@pytest.mark.django_db
+def test_comment_delete_updates_index(comment):
+    """Проверка обновления индекса при удалении комментария"""
+    comment.delete()
+    assert found('комментарий') == []
+    assert not NewsSearchTerm.objects.filter(weight__lte=0).exists()
+
+
+@pytest.mark.django_db
+def test_bulk_created_comments_indexed(news, author):
+    """Проверка индексации комментариев из bulk_create"""
+    Comment.objects.bulk_create([
+        Comment(news=news, author=author, text='Ракета стартовала')
+    ])
+    assert found('ракеты') == [news.pk]
+
+
+@pytest.mark.django_db
+def test_rebuild_matches_incremental_index(news, comment):
+    """Проверка, что пересборка даёт тот же индекс"""
+    def snapshot():
+        return set(NewsSearchTerm.objects.values_list(
+            'news_id', 'term', 'weight'
+        ))
+
+    incremental = snapshot()
+    call_command('rebuild_search_index', stdout=open('/dev/null', 'w'))
+    assert snapshot() == incremental
+
+
+@pytest.mark.django_db
+def test_search_page(client, news):
+    """Проверка страницы поиска"""
+    response = client.get(SEARCH_URL, {'q': 'заметка'})
+    assert list(response.context['object_list']) == [news]
+    assert response.context['query'] == 'заметка'
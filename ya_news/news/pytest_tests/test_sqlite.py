@@ -0,0 +1,57 @@
+import sqlite3
+
+import pytest
+
+from django.db import connections
+
+from yanews.sqlite_backend.base import set_journal_mode
+
+
+@pytest.fixture
+def file_connection(tmp_path, django_db_blocker):
+    """Соединение с настройками проекта, но с файловой БД."""
+    default = connections['default']
+    wrapper = default.__class__(
+        {**default.settings_dict, 'NAME': str(tmp_path / 'db.sqlite3')},
+        alias='file',
+    )
+    connections['file'] = wrapper
+    with django_db_blocker.unblock():
+        yield wrapper
+        wrapper.close()
+    del connections['file']
+
+
+def test_pragmas_applied(file_connection):
+    """Проверка PRAGMA, выполняемых при открытии соединения"""
+    with file_connection.cursor() as cursor:
+        pragmas = {
+            name: cursor.execute(f'PRAGMA {name}').fetchone()[0]
+            for name in ('journal_mode', 'synchronous', 'busy_timeout')
+        }
+    assert pragmas == {
+        'journal_mode': 'delete', 'synchronous': 1, 'busy_timeout': 5000
+    }
+
+
+def test_migrate_switches_to_wal(file_connection):
+    """Проверка, что WAL включается после migrate и остаётся в файле"""
+    set_journal_mode(using='file')
+    file_connection.close()
+    with file_connection.cursor() as cursor:
+        assert cursor.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+
+def test_transaction_takes_write_lock_immediately(file_connection):
+    """Проверка, что atomic начинается с BEGIN IMMEDIATE"""
+    file_connection.set_autocommit(
+        False, force_begin_transaction_with_broken_autocommit=True
+    )
+    other = sqlite3.connect(file_connection.settings_dict['NAME'], timeout=0)
+    try:
+        with pytest.raises(sqlite3.OperationalError, match='locked'):
+            other.execute('BEGIN IMMEDIATE')
+    finally:
+        other.close()
+        file_connection.rollback()
+        file_connection.set_autocommit(True)
@@ -0,0 +1,227 @@
+"""
+Поиск по новостям и комментариям.
+
+Текст разбивается на слова, слова приводятся к нижнему регистру (ё → е),
+русские слова — к основе стеммером Snowball (snowballstemmer). Основы
+из индекса и из запроса должны давать один и тот же стеммер, поэтому
+версия пакета закреплена в requirements.txt; после её смены индекс
+пересобирается командой rebuild_search_index. Для каждой пары
+(основа, новость) в NewsSearchTerm хранится суммарный вес: вхождения
+в заголовок, текст и все комментарии новости. Вес меняется на разницу
+между старым и новым текстом атомарными UPDATE, поэтому индекс
+поддерживается при каждом сохранении без пересчёта.
+
+Латинские слова запроса дополнительно переводятся в кириллицу
+через pytils (NEWS_SEARCH_TRANSLIT), так что «novosti» находит «новости».
+"""
+import re
+from collections import Counter
+from functools import lru_cache
+
+import snowballstemmer
+from django.conf import settings
+from django.db.models import Count, Exists, F, Q, Sum, Window
+from pytils.translit import detranslify
+
+from .models import Comment, News, NewsSearchTerm
+
+TITLE_WEIGHT = 10
+TEXT_WEIGHT = 3
+COMMENT_WEIGHT = 1
+
+TOKEN = re.compile(r'\w+')
+CYRILLIC = re.compile(r'[а-я]')
+LATIN = re.compile(r'^[a-z]+$')
+MAX_TERM_LENGTH = NewsSearchTerm._meta.get_field('term').max_length
+
+_stemmer = snowballstemmer.stemmer('russian')
+
+
+@lru_cache(maxsize=2 ** 16)
+def stem(word):
+    if not CYRILLIC.search(word):
+        return word[:MAX_TERM_LENGTH]
+    return _stemmer.stemWord(word)[:MAX_TERM_LENGTH]
+
+
+def words(text):
+    return TOKEN.findall(text.lower().replace('ё', 'е'))
+
+
+def terms(text, weight=1):
+    """Веса основ слов текста."""
+    counter = Counter()
+    for word in words(text):
+        if len(word) > 1:
+            counter[stem(word)] += weight
+    return counter
+
+
+def news_terms(title, text):
+    return terms(title, TITLE_WEIGHT) + terms(text, TEXT_WEIGHT)
+
+
+def comment_terms(text):
+    return terms(text, COMMENT_WEIGHT)
+
+
+def query_terms(query):
+    """Для каждого слова запроса — множество подходящих основ."""
+    result = []
+    for word in words(query):
+        if len(word) < 2:
+            continue
+        variants = {stem(word)}
+        if settings.NEWS_SEARCH_TRANSLIT and LATIN.match(word):
+            variants.add(stem(detranslify(word).lower().replace('ё', 'е')))
+        result.append(variants)
+    return result
+
+
+def apply_delta(news_id, delta):
+    """
+    Изменяет веса основ новости на delta.
+
+    Недостающие записи создаются с нулевым весом (INSERT OR IGNORE),
+    затем все веса меняются одним UPDATE с F-выражениями, поэтому
+    параллельные изменения одной новости не теряются. Обнулившиеся
+    записи удаляются.
+    """
+    delta = {term: weight for term, weight in delta.items() if weight}
+    if not delta:
+        return
+    added = {term for term, weight in delta.items() if weight > 0}
+    if added:
+        NewsSearchTerm.objects.bulk_create(
+            (
+                NewsSearchTerm(term=term, news_id=news_id, weight=0)
+                for term in added
+            ),
+            ignore_conflicts=True
+        )
+    postings = list(NewsSearchTerm.objects.filter(
+        news_id=news_id, term__in=delta
+    ).only('id', 'term'))
+    for posting in postings:
+        posting.weight = F('weight') + delta[posting.term]
+    NewsSearchTerm.objects.bulk_update(postings, ('weight',))
+    if len(added) < len(delta):
+        NewsSearchTerm.objects.filter(
+            news_id=news_id, weight__lte=0,
+            term__in=[term for term in delta if term not in added]
+        ).delete()
+
+
+def subtract(new, old):
+    delta = Counter(new)
+    delta.subtract(old)
+    return delta
+
+
+def index_comments(comments):
+    """Добавляет в индекс новые комментарии, по одному изменению на новость."""
+    deltas = {}
+    for comment in comments:
+        deltas.setdefault(comment.news_id, Counter()).update(
+            comment_terms(comment.text)
+        )
+    for news_id, delta in deltas.items():
+        apply_delta(news_id, delta)
+
+
+def rebuild(chunk_size=500):
+    """
+    Пересобирает индекс с нуля.
+
+    Новости читаются порциями по chunk_size, комментарии каждой
+    порции — потоком через iterator(), так что в памяти держится только
+    словарь текущей порции.
+    """
+    NewsSearchTerm.objects.all().delete()
+    last_id = 0
+    while True:
+        chunk = list(News.objects.filter(pk__gt=last_id).order_by('pk').only(
+            'id', 'title', 'text'
+        )[:chunk_size])
+        if not chunk:
+            break
+        last_id = chunk[-1].pk
+        weights = {
+            news.pk: news_terms(news.title, news.text) for news in chunk
+        }
+        comments = Comment.objects.filter(
+            news_id__in=weights
+        ).values_list('news_id', 'text').iterator(chunk_size=2000)
+        for news_id, text in comments:
+            weights[news_id].update(comment_terms(text))
+        NewsSearchTerm.objects.bulk_create(
+            NewsSearchTerm(term=term, news_id=news_id, weight=weight)
+            for news_id, counter in weights.items()
+            for term, weight in counter.items()
+        )
+
+
+class SearchResults:
+    """
+    Новости, содержащие все слова запроса, по убыванию суммарного веса.
+
+    Пересечение, ранжирование и страницы считаются в SQL: записи индекса
+    читаются по покрывающему индексу (term, news, weight) и группируются
+    по новости, HAVING оставляет новости, где нашлась основа каждого
+    слова. Если какого-то слова нет в индексе, SQLite не читает записи
+    вовсе. Поддерживает count() и срезы, поэтому с ним работает Paginator.
+    """
+    # Столько первых id приходит вместе с count(), и первые страницы
+    # выдачи не повторяют группировку.
+    HEAD = 100
+
+    def __init__(self, query):
+        self.terms = query_terms(query)
+        self._count = None
+        self._head = []
+
+    def grouped(self):
+        if not self.terms:
+            return NewsSearchTerm.objects.none()
+        matched = {
+            f'word_{index}': Count('pk', filter=Q(term__in=variants))
+            for index, variants in enumerate(self.terms)
+        }
+        return NewsSearchTerm.objects.filter(
+            *(
+                Exists(NewsSearchTerm.objects.filter(term__in=variants))
+                for variants in self.terms
+            ),
+            term__in=set().union(*self.terms),
+        ).values('news_id').annotate(
+            score=Sum('weight'), **matched
+        ).filter(
+            **{f'{name}__gt': 0 for name in matched}
+        ).order_by('-score', '-news_id')
+
+    def ranked(self):
+        """Запрос id новостей в порядке выдачи (QuerySet)."""
+        return self.grouped().values_list('news_id', flat=True)
+
+    def count(self):
+        if self._count is None:
+            rows = list(self.grouped().annotate(
+                total=Window(Count('news_id'))
+            ).values_list('news_id', 'total')[:self.HEAD])
+            self._head = [news_id for news_id, _ in rows]
+            self._count = rows[0][1] if rows else 0
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, page):
+        if self._count is not None and (
+            self._count <= self.HEAD
+            or page.stop is not None and page.stop <= self.HEAD
+        ):
+            ids = self._head[page]
+        else:
+            ids = list(self.ranked()[page])
+        news = News.objects.for_list().in_bulk(ids)
+        return [news[pk] for pk in ids if pk in news]
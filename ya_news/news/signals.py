@@ -0,0 +1,154 @@
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from . import search
+from .cache import invalidate_news
+from .models import Comment, News, make_excerpt, render_comment_html
+
+# Поля, из которых строится поисковый индекс.
+INDEXED_FIELDS = {
+    News: ('title', 'text'),
+    Comment: ('text',),
+}
+
+
+# Новости, которые сейчас удаляются: их комментарии уходят каскадом,
+# и для каждого не нужно менять ни счётчик, ни индекс.
+_deleting_news = set()
+
+
+def change_comment_count(news_id, delta):
+    """Атомарно изменяет счётчик комментариев новости на delta."""
+    News.objects.filter(pk=news_id).update(
+        comment_count=F('comment_count') + delta
+    )
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    """Увеличиваем счётчик при создании комментария и сбрасываем кэш."""
+    if created and not raw:
+        change_comment_count(instance.news_id, 1)
+    invalidate_news(instance.news_id)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    """
+    Уменьшаем счётчик при удалении комментария и сбрасываем кэш.
+
+    Сигнал приходит и при каскадном удалении, и при QuerySet.delete().
+    Комментарии удаляемой новости пропускаем: её строка и кэш всё
+    равно уходят вместе с ней.
+    """
+    if instance.news_id in _deleting_news:
+        return
+    change_comment_count(instance.news_id, -1)
+    invalidate_news(instance.news_id)
+
+
+@receiver(pre_delete, sender=News)
+def news_deleting(sender, instance, **kwargs):
+    """Запоминаем новость до каскадного удаления её комментариев."""
+    _deleting_news.add(instance.pk)
+
+
+@receiver(pre_save, sender=News)
+def fill_excerpt(sender, instance, **kwargs):
+    """
+    Считаем анонс перед записью новости, в том числе из loaddata.
+
+    loaddata сохраняет с raw=True в обход News.save(), поэтому анонс
+    считается здесь. Текст, не загруженный через only()/defer(), не
+    менялся.
+    """
+    if 'text' in instance.__dict__:
+        instance.excerpt = make_excerpt(instance.text)
+
+
+@receiver(pre_save, sender=Comment)
+def fill_comment_html(sender, instance, **kwargs):
+    """Считаем HTML комментария перед записью, в том числе из loaddata."""
+    if 'text' in instance.__dict__:
+        instance.text_html = render_comment_html(instance.text)
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+def news_changed(sender, instance, **kwargs):
+    # post_delete новости приходит после сигналов её комментариев.
+    _deleting_news.discard(instance.pk)
+    invalidate_news(instance.pk)
+
+
+def document_terms(sender, values):
+    if sender is News:
+        return search.news_terms(values['title'], values['text'])
+    return search.comment_terms(values['text'])
+
+
+def document_news_id(instance):
+    return instance.pk if isinstance(instance, News) else instance.news_id
+
+
+@receiver(post_init, sender=News)
+@receiver(post_init, sender=Comment)
+def remember_indexed_fields(sender, instance, **kwargs):
+    """Запоминаем проиндексированный текст, чтобы потом считать разницу."""
+    instance._indexed = {
+        field: instance.__dict__.get(field)
+        for field in INDEXED_FIELDS[sender]
+    }
+
+
+@receiver(pre_save, sender=News)
+@receiver(pre_save, sender=Comment)
+def load_deferred_indexed_fields(sender, instance, raw=False, **kwargs):
+    """Если текст не был загружен (only/defer), берём старый из базы."""
+    if raw or instance.pk is None:
+        return
+    if None in instance._indexed.values():
+        instance._indexed = sender.objects.filter(pk=instance.pk).values(
+            *INDEXED_FIELDS[sender]
+        ).first()
+
+
+@receiver(post_save, sender=News)
+@receiver(post_save, sender=Comment)
+def update_search_index(sender, instance, created, raw=False, **kwargs):
+    """
+    Меняем веса в индексе на разницу между старым и новым текстом.
+
+    Записи из loaddata (raw=True) не индексируются: после загрузки
+    фикстур индекс пересобирается командой rebuild_search_index.
+    """
+    if raw:
+        return
+    new = {
+        field: getattr(instance, field) for field in INDEXED_FIELDS[sender]
+    }
+    old = None if created else instance._indexed
+    if old != new:
+        search.apply_delta(document_news_id(instance), search.subtract(
+            document_terms(sender, new),
+            document_terms(sender, old) if old else {}
+        ))
+    instance._indexed = new
+
+
+@receiver(post_delete, sender=Comment)
+def remove_comment_from_index(sender, instance, **kwargs):
+    """
+    Вычитаем удалённый комментарий из индекса.
+
+    Записи удалённой новости удаляются каскадом, для них ничего не нужно.
+    """
+    if instance.news_id in _deleting_news:
+        return
+    if None not in instance._indexed.values():
+        search.apply_delta(instance.news_id, search.subtract(
+            {}, document_terms(sender, instance._indexed)
+        ))
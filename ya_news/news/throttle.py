@@ -0,0 +1,32 @@
+"""
+Ограничение частоты комментариев на пользователя.
+
+Счётчик хранится в кэше страниц (NEWS_CACHE_ALIAS) с фиксированным
+окном: ключ включает номер окна, поэтому сбрасывать его не нужно —
+старые счётчики истекают сами.
+"""
+import time
+
+from django.conf import settings
+
+from .cache import get_cache
+
+RATE_KEY = 'news:comment-rate:{user_id}:{window}'
+MESSAGE = 'Слишком много комментариев. Попробуйте чуть позже.'
+
+
+def allow_comment(user):
+    """Учитывает комментарий; False, если лимит в текущем окне исчерпан."""
+    if settings.NEWS_COMMENT_RATE_LIMIT is None:
+        return True
+    limit, period = settings.NEWS_COMMENT_RATE_LIMIT
+    key = RATE_KEY.format(user_id=user.pk, window=int(time.time() // period))
+    cache = get_cache()
+    cache.add(key, 0, period)
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        # Счётчик истёк между add и incr.
+        cache.set(key, 1, period)
+        count = 1
+    return count <= limit
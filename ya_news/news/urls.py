@@ -1,12 +1,24 @@
+from django.conf import settings
 from django.urls import path
 
 from news import views
 
 app_name = 'news'
 
+if settings.NEWS_ASYNC_VIEWS:
+    news_list, news_detail = views.AsyncNewsList, views.AsyncNewsDetail
+else:
+    news_list, news_detail = views.NewsList, views.NewsDetailView
+
 urlpatterns = [
-    path('', views.NewsList.as_view(), name='home'),
-    path('news/<int:pk>/', views.NewsDetailView.as_view(), name='detail'),
+    path('', news_list.as_view(), name='home'),
+    path('news/<int:pk>/', news_detail.as_view(), name='detail'),
+    path(
+        'news/<int:pk>/comments/',
+        views.NewsCommentsPage.as_view(),
+        name='comments'
+    ),
+    path('search/', views.NewsSearch.as_view(), name='search'),
     path(
         'delete_comment/<int:pk>/',
         views.CommentDelete.as_view(),
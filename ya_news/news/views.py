@@ -1,17 +1,141 @@
+from http import HTTPStatus
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import get_object_or_404
+from django.core.exceptions import BadRequest
+from django.http import Http404, HttpResponse, JsonResponse
+from django.middleware.csrf import get_token
+from django.shortcuts import render
+from django.template.response import SimpleTemplateResponse
 from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
 from django.views import generic
 
+from . import cache, conditional, throttle
+from .comment_queue import save_comment
 from .forms import CommentForm
 from .models import Comment, News
+from .pagination import comments_page
+from .search import SearchResults
+
+
+def next_comments_url(news_id, cursor, html=True):
+    """Адрес следующей страницы комментариев (HTML-фрагмент или JSON)."""
+    if cursor is None:
+        return None
+    url = reverse('news:comments', kwargs={'pk': news_id})
+    url = f'{url}?after={cursor}'
+    return f'{url}&format=html' if html else url
+
+
+class NewsCommentsMixin:
+    """Добавляет в контекст первую страницу комментариев новости."""
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        comments, next_cursor = comments_page(self.object.pk)
+        context['comments'] = comments
+        context['next_url'] = next_comments_url(self.object.pk, next_cursor)
+        return context
 
 
-class NewsList(generic.ListView):
+VALIDATOR_HEADERS = ('ETag', 'Last-Modified')
+
+
+def cached_page_response(request, page):
+    """Ответ из кэша страниц; 304, если у клиента та же версия."""
+    response = HttpResponse(page['content'])
+    for header in VALIDATOR_HEADERS:
+        if page.get(header):
+            response[header] = page[header]
+    return get_conditional_response(
+        request,
+        etag=page.get('ETag'),
+        last_modified=parse_http_date_safe(page.get('Last-Modified')),
+        response=response,
+    )
+
+
+class ConditionalGetMixin:
+    """
+    Отвечает 304 Not Modified, если страница у клиента не устарела.
+
+    Валидаторы считаются до рендеринга (см. news.conditional), так что
+    повторный запрос без изменений обходится без выборки новостей
+    и комментариев. Их считает функция из атрибута validators, которой
+    передаются пользователь, секрет CSRF из cookie и именованные
+    аргументы из URL.
+    """
+
+    def get(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            # Секрет появляется в META до рендеринга формы, поэтому ETag
+            # первого ответа совпадает со следующими.
+            get_token(request)
+        etag, last_modified = self.validators(
+            user=request.user,
+            csrf_secret=request.META.get('CSRF_COOKIE'),
+            **self.kwargs
+        )
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            if etag:
+                response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class AnonymousPageCacheMixin:
+    """
+    Отдаёт анонимным пользователям готовую страницу из кэша.
+
+    Авторизованным пользователям страница рендерится заново: в ней есть
+    форма комментария и ссылки на редактирование своих комментариев.
+    Вместе со страницей хранятся её ETag и Last-Modified, поэтому
+    условный запрос к закэшированной странице не обращается к БД.
+
+    Ключ страницы строит функция из атрибута page_cache_key, которой
+    передаются именованные аргументы из URL.
+    """
+
+    def get(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+        key = self.page_cache_key(**self.kwargs)
+        page = cache.get_page(key)
+        if page is not None:
+            return cached_page_response(request, page)
+        response = super().get(request, *args, **kwargs)
+        if isinstance(response, SimpleTemplateResponse):
+            response.add_post_render_callback(
+                lambda response: cache.set_page(key, {
+                    'content': response.content,
+                    **{
+                        header: response[header]
+                        for header in VALIDATOR_HEADERS
+                        if response.has_header(header)
+                    },
+                })
+            )
+        return response
+
+
+class NewsList(
+        AnonymousPageCacheMixin, ConditionalGetMixin, generic.ListView
+):
     """Список новостей."""
     model = News
     template_name = 'news/home.html'
+    replica_reads = True
+    page_cache_key = staticmethod(cache.home_page_key)
+    validators = staticmethod(conditional.home_validators)
 
     def get_queryset(self):
         """
@@ -19,21 +143,21 @@ class NewsList(generic.ListView):
 
         Их количество определяется в настройках проекта.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        return self.model.objects.for_list()[
+            :settings.NEWS_COUNT_ON_HOME_PAGE
+        ]
 
 
-class NewsDetail(generic.DetailView):
+class NewsDetail(
+        AnonymousPageCacheMixin,
+        ConditionalGetMixin,
+        NewsCommentsMixin,
+        generic.DetailView
+):
     model = News
     template_name = 'news/detail.html'
-
-    def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
-        )
-        return obj
+    page_cache_key = staticmethod(cache.detail_page_key)
+    validators = staticmethod(conditional.detail_validators)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -42,8 +166,41 @@ class NewsDetail(generic.DetailView):
         return context
 
 
+class NewsCommentsPage(generic.View):
+    """Подгрузка следующей страницы комментариев в JSON или HTML."""
+
+    def get(self, request, *args, **kwargs):
+        news_id = self.kwargs['pk']
+        if not News.objects.filter(pk=news_id).exists():
+            raise Http404
+        try:
+            comments, next_cursor = comments_page(
+                news_id, after=request.GET.get('after')
+            )
+        except ValueError:
+            raise BadRequest('Некорректный курсор.')
+        if request.GET.get('format') == 'html':
+            return render(request, 'includes/comments.html', {
+                'comments': comments,
+                'next_url': next_comments_url(news_id, next_cursor),
+            })
+        return JsonResponse({
+            'comments': [
+                {
+                    'id': comment.pk,
+                    'author': comment.author.get_username(),
+                    'text': comment.text,
+                    'created': comment.created.isoformat(),
+                }
+                for comment in comments
+            ],
+            'next': next_comments_url(news_id, next_cursor, html=False),
+        })
+
+
 class NewsComment(
         LoginRequiredMixin,
+        NewsCommentsMixin,
         generic.detail.SingleObjectMixin,
         generic.FormView
 ):
@@ -56,18 +213,25 @@ class NewsComment(
         return super().post(request, *args, **kwargs)
 
     def form_valid(self, form):
+        if not throttle.allow_comment(self.request.user):
+            form.add_error(None, throttle.MESSAGE)
+            response = self.form_invalid(form)
+            response.status_code = HTTPStatus.TOO_MANY_REQUESTS
+            return response
         comment = form.save(commit=False)
         comment.news = self.object
         comment.author = self.request.user
-        comment.save()
+        save_comment(comment)
         return super().form_valid(form)
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        return reverse(
+            'news:detail', kwargs={'pk': self.object.pk}
+        ) + '#comments'
 
 
 class NewsDetailView(generic.View):
+    replica_reads = True
 
     def get(self, request, *args, **kwargs):
         view = NewsDetail.as_view()
@@ -78,19 +242,89 @@ class NewsDetailView(generic.View):
         return view(request, *args, **kwargs)
 
 
+class AsyncViewMixin:
+    """
+    Асинхронный вариант представления для запуска под ASGI.
+
+    Django 3.2 считает представление асинхронным, только если корутиной
+    является сама функция из as_view(), поэтому она оборачивается.
+    ORM и шаблоны синхронные: обработка запроса вместе с рендерингом
+    выполняется одним переходом через sync_to_async в потоке для работы
+    с БД, а цикл событий в это время обслуживает другие соединения.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            return await view(request, *args, **kwargs)
+
+        async_view.__dict__.update(view.__dict__)
+        async_view.__doc__ = view.__doc__
+        return async_view
+
+    async def dispatch(self, request, *args, **kwargs):
+        return await sync_to_async(self.dispatch_sync)(
+            request, *args, **kwargs
+        )
+
+    def dispatch_sync(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        if isinstance(response, SimpleTemplateResponse):
+            response.render()
+        return response
+
+
+class AsyncAnonymousPageCacheMixin(AsyncViewMixin):
+    """
+    Отдаёт кэшированную страницу, не занимая поток для работы с БД.
+
+    Запрос без сессии заведомо анонимный, и проверка пользователя
+    не нужна: страница читается из кэша в общем пуле потоков.
+    Остальные запросы обрабатываются как в AnonymousPageCacheMixin.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method == 'GET' and request.session.session_key is None:
+            page = await sync_to_async(
+                cache.get_page, thread_sensitive=False
+            )(self.page_cache_key(**self.kwargs))
+            if page is not None:
+                return cached_page_response(request, page)
+        return await super().dispatch(request, *args, **kwargs)
+
+
+class AsyncNewsList(AsyncAnonymousPageCacheMixin, NewsList):
+    """Список новостей для ASGI."""
+
+
+class AsyncNewsDetail(AsyncAnonymousPageCacheMixin, NewsDetailView):
+    """Страница новости для ASGI: GET — NewsDetail, POST — NewsComment."""
+
+    page_cache_key = staticmethod(cache.detail_page_key)
+
+
 class CommentBase(LoginRequiredMixin):
     """Базовый класс для работы с комментариями."""
     model = Comment
 
     def get_success_url(self):
-        comment = self.get_object()
+        """Комментарий уже загружен: новость берём из news_id без запроса."""
         return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
+            'news:detail', kwargs={'pk': self.object.news_id}
         ) + '#comments'
 
     def get_queryset(self):
-        """Пользователь может работать только со своими комментариями."""
-        return self.model.objects.filter(author=self.request.user)
+        """
+        Пользователь может работать только со своими комментариями.
+
+        Заголовок новости нужен шаблонам, поэтому подгружаем её тем же
+        запросом, но без длинного текста.
+        """
+        return self.model.objects.filter(
+            author=self.request.user
+        ).select_related('news').defer('news__text')
 
 
 class CommentUpdate(CommentBase, generic.UpdateView):
@@ -102,3 +336,19 @@ class CommentUpdate(CommentBase, generic.UpdateView):
 class CommentDelete(CommentBase, generic.DeleteView):
     """Удаление комментария."""
     template_name = 'news/delete.html'
+
+
+class NewsSearch(generic.ListView):
+    """Поиск по новостям и комментариям к ним."""
+    template_name = 'news/search.html'
+
+    def get_paginate_by(self, queryset):
+        return settings.NEWS_COUNT_ON_HOME_PAGE
+
+    def get_queryset(self):
+        return SearchResults(self.request.GET.get('q', ''))
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.request.GET.get('q', '')
+        return context
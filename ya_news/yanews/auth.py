@@ -0,0 +1,115 @@
+"""
+Кэш пользователя для CachedAuthenticationMiddleware.
+
+Пользователь хранится под ключом из его id и хэша сессии
+(HASH_SESSION_KEY, производный от пароля), поэтому после смены пароля
+старая запись больше не запрашивается. Запись действительна, пока не
+сменилось поколение пользователя: любое сохранение или удаление
+пользователя (в том числе из админки и manage.py changepassword) меняет
+поколение, а выход из системы удаляет запись.
+
+Кэш включается настройкой USER_CACHE_ENABLED. Поколения и сессии
+cached_db работают, только если кэш общий для всех процессов. С
+LocMemCache у каждого процесса своя копия, и выход или смена пароля в
+одном процессе не видны в остальных; об этом предупреждает
+check_shared_cache (manage.py check --deploy).
+"""
+from uuid import uuid4
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.signals import user_logged_out
+from django.core.cache import caches
+from django.core import checks
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+CACHED_SESSION_ENGINES = (
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.cached_db',
+)
+USER_KEY = 'auth:user:{pk}:{session_hash}'
+GENERATION_KEY = 'auth:user:{pk}:generation'
+
+
+def get_cache():
+    return caches[settings.USER_CACHE_ALIAS]
+
+
+def process_local_caches():
+    """Псевдонимы кэшей пользователя и сессий, живущих в памяти процесса."""
+    aliases = set()
+    if settings.USER_CACHE_ENABLED:
+        aliases.add(settings.USER_CACHE_ALIAS)
+    if settings.SESSION_ENGINE in CACHED_SESSION_ENGINES:
+        aliases.add(settings.SESSION_CACHE_ALIAS)
+    return sorted(
+        alias for alias in aliases if isinstance(caches[alias], LocMemCache)
+    )
+
+
+@checks.register(checks.Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Предупреждает о кэше пользователя в памяти процесса."""
+    aliases = process_local_caches()
+    if not aliases:
+        return []
+    return [checks.Warning(
+        f'Кэши {", ".join(aliases)} хранятся в памяти процесса '
+        '(LocMemCache): выход и смена пароля не дойдут до других '
+        'процессов.',
+        hint='Настройте общий кэш (Memcached, Redis) или, если процесс '
+             'один, отключите проверку в SILENCED_SYSTEM_CHECKS.',
+        id='yanews.W001',
+    )]
+
+
+def cache_keys(request):
+    """Ключи записи и поколения; None, если в сессии нет пользователя."""
+    pk = request.session.get(auth.SESSION_KEY)
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    if pk is None or not session_hash:
+        return None
+    return (
+        USER_KEY.format(pk=pk, session_hash=session_hash),
+        GENERATION_KEY.format(pk=pk),
+    )
+
+
+def get_user(request):
+    """django.contrib.auth.get_user с кэшем: при попадании — без запросов."""
+    keys = cache_keys(request)
+    if keys is None:
+        return auth.get_user(request)
+    user_key, generation_key = keys
+    cache = get_cache()
+    cached = cache.get_many(keys)
+    entry = cached.get(user_key)
+    generation = cached.get(generation_key)
+    if entry is not None and generation is not None:
+        entry_generation, user = entry
+        if entry_generation == generation:
+            return user
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        if generation is None:
+            cache.add(generation_key, uuid4().hex, None)
+            generation = cache.get(generation_key)
+        cache.set(user_key, (generation, user), settings.USER_CACHE_TIMEOUT)
+    return user
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def user_changed(sender, instance, **kwargs):
+    get_cache().set(
+        GENERATION_KEY.format(pk=instance.pk), uuid4().hex, None
+    )
+
+
+@receiver(user_logged_out)
+def user_left(sender, request, user, **kwargs):
+    keys = cache_keys(request)
+    if keys is not None:
+        get_cache().delete(keys[0])
@@ -0,0 +1,269 @@
+"""
+Промежуточные слои проекта.
+
+QueryBudgetMiddleware учитывает SQL-запросы и время рендеринга для
+каждого запроса. Включается настройкой QUERY_BUDGET_ENABLED. Метрики
+отдаются в заголовке Server-Timing и дописываются строкой JSON в файл
+QUERY_BUDGET_LOG; сводку по URL строит команда query_report. Если
+движок шаблонов настроен через template_profile.timed, в запись
+попадает и время по шаблонам и фильтрам.
+
+ReplicaMiddleware направляет чтение на реплики (см. routers).
+
+Оба слоя поддерживают и синхронный, и асинхронный режим: под ASGI
+Django не оборачивает из-за них всю цепочку в sync_to_async, и
+асинхронные представления не выполняются в одном потоке.
+
+CachedAuthenticationMiddleware с USER_CACHE_ENABLED берёт пользователя
+из кэша (см. auth).
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
+
+from . import template_profile
+from .auth import get_user
+
+from .routers import choose_replica, read_alias
+
+_log_lock = threading.Lock()
+_collector = ContextVar('query_collector', default=None)
+
+PIN_COOKIE = 'primary_pin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+class QueryCollector:
+    """Обёртка для connection.execute_wrapper, считающая запросы."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.signatures = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            # Параметры передаются отдельно, поэтому одинаковый SQL —
+            # это один и тот же запрос с разными значениями (N+1).
+            self.signatures[sql] += 1
+
+    @property
+    def duplicates(self):
+        return {
+            sql: count for sql, count in self.signatures.items() if count > 1
+        }
+
+
+def count_query(execute, sql, params, many, context):
+    """Передаёт запрос счётчику текущего HTTP-запроса, если он есть."""
+    collector = _collector.get()
+    if collector is None:
+        return execute(sql, params, many, context)
+    return collector(execute, sql, params, many, context)
+
+
+def watch_connections():
+    """
+    Подключает count_query к соединениям текущего потока, один раз.
+
+    Обёртка остаётся на соединении: счётчик выбирается по ContextVar,
+    поэтому параллельные запросы, которые под ASGI выполняют SQL в
+    одном потоке sync_to_async, не попадают в чужую статистику.
+    """
+    for connection in connections.all():
+        if count_query not in connection.execute_wrappers:
+            connection.execute_wrappers.append(count_query)
+
+
+class QueryBudgetMiddleware(MiddlewareMixin):
+
+    def __init__(self, get_response):
+        if not settings.QUERY_BUDGET_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.template_timing = template_profile.is_timed()
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        watch_connections()
+        with ExitStack() as stack:
+            collector, templates = self.start(request, stack)
+            start = time.perf_counter()
+            response = self.get_response(request)
+            total = time.perf_counter() - start
+        return self.finish(request, response, collector, templates, total)
+
+    async def __acall__(self, request):
+        # SQL асинхронные представления выполняют через sync_to_async,
+        # в потоке для синхронного кода, а не в потоке event loop.
+        await sync_to_async(watch_connections)()
+        with ExitStack() as stack:
+            collector, templates = self.start(request, stack)
+            start = time.perf_counter()
+            response = await self.get_response(request)
+            total = time.perf_counter() - start
+        return self.finish(request, response, collector, templates, total)
+
+    def start(self, request, stack):
+        """Включает счётчики запросов и шаблонов до конца stack."""
+        collector = QueryCollector()
+        token = _collector.set(collector)
+        stack.callback(_collector.reset, token)
+        request._template_timing = [None, None]
+        templates = None
+        if self.template_timing:
+            templates = stack.enter_context(template_profile.collect())
+        return collector, templates
+
+    def finish(self, request, response, collector, templates, total):
+        render_start, render_end = request._template_timing
+        template = (
+            render_end - render_start if render_end is not None else 0.0
+        )
+        record = {
+            'url_name': self.get_url_name(request),
+            'method': request.method,
+            'status': response.status_code,
+            'queries': collector.count,
+            'db_ms': round(collector.duration * 1000, 3),
+            'template_ms': round(template * 1000, 3),
+            'total_ms': round(total * 1000, 3),
+            'duplicates': collector.duplicates,
+        }
+        if templates is not None:
+            record['templates'] = {
+                name: round(seconds * 1000, 3)
+                for name, seconds in templates.most_common()
+            }
+        response['Server-Timing'] = self.server_timing(record)
+        self.write(record)
+        return response
+
+    def process_template_response(self, request, response):
+        """Вызывается непосредственно перед рендерингом шаблона."""
+        timing = request._template_timing
+        timing[0] = time.perf_counter()
+
+        def stop(response):
+            timing[1] = time.perf_counter()
+
+        response.add_post_render_callback(stop)
+        return response
+
+    @staticmethod
+    def get_url_name(request):
+        match = request.resolver_match
+        if match is None or not match.view_name:
+            return request.path
+        return match.view_name
+
+    @staticmethod
+    def server_timing(record):
+        duplicated = sum(record['duplicates'].values())
+        return ', '.join((
+            'db;dur={};desc="{} queries, {} duplicated"'.format(
+                record['db_ms'], record['queries'], duplicated
+            ),
+            'tpl;dur={}'.format(record['template_ms']),
+            'total;dur={}'.format(record['total_ms']),
+        ))
+
+    @staticmethod
+    def write(record):
+        line = json.dumps(record, ensure_ascii=False)
+        with _log_lock:
+            with open(
+                settings.QUERY_BUDGET_LOG, 'a', encoding='utf-8'
+            ) as log:
+                log.write(line + '\n')
+
+
+class ReplicaMiddleware(MiddlewareMixin):
+    """
+    Включает чтение с реплики для представлений с replica_reads = True.
+
+    Реплика используется только для GET/HEAD авторизованных пользователей:
+    анонимные страницы news попадают в кэш, и промах кэша читается
+    из default, чтобы не закэшировать отстающую копию. После любого
+    изменяющего запроса клиент получает cookie на REPLICA_PIN_SECONDS;
+    пока она жива, всё читается из default, и редирект после формы
+    показывает только что сохранённые данные.
+    """
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        token = read_alias.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            read_alias.reset(token)
+        return self.pin_primary(request, response)
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+        token = read_alias.set(None)
+        try:
+            response = await self.get_response(request)
+        finally:
+            read_alias.reset(token)
+        return self.pin_primary(request, response)
+
+    @staticmethod
+    def pin_primary(request, response):
+        if request.method not in SAFE_METHODS:
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        if (
+            settings.DATABASE_REPLICAS
+            and getattr(view_class, 'replica_reads', False)
+            and request.method in ('GET', 'HEAD')
+            and PIN_COOKIE not in request.COOKIES
+            and request.user.is_authenticated
+        ):
+            read_alias.set(choose_replica())
+
+
+class CachedAuthenticationMiddleware(MiddlewareMixin):
+    """
+    Пользователь из кэша вместо AuthenticationMiddleware.
+
+    Ставится после AuthenticationMiddleware и заменяет request.user,
+    пока тот ещё не загружен. Включается настройкой USER_CACHE_ENABLED.
+    """
+
+    def __init__(self, get_response):
+        if not settings.USER_CACHE_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def process_request(self, request):
+        request.user = SimpleLazyObject(lambda: get_user(request))
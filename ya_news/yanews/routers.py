@@ -0,0 +1,35 @@
+"""
+Чтение с реплик для представлений, которые только читают.
+
+Реплика выбирается один раз на запрос (ReplicaMiddleware) и хранится
+в contextvars, так что все запросы страницы видят один снимок данных,
+в том числе под ASGI. Запись и чтение вне таких представлений идут
+в default.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+
+read_alias = ContextVar('read_alias', default=None)
+
+
+def choose_replica():
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        return read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии default: объекты с разных псевдонимов
+        # относятся к одной базе.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in settings.DATABASE_REPLICAS
@@ -21,12 +21,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yanews.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'yanews.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'yanews.middleware.ReplicaMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -51,10 +54,54 @@ TEMPLATES = [
 WSGI_APPLICATION = 'yanews.wsgi.application'
 
 
+# WAL позволяет читать во время записи; режим сохраняется в файле базы
+# и включается один раз после migrate (см. sqlite_backend).
+SQLITE_JOURNAL_MODE = 'WAL'
+# synchronous=NORMAL в режиме WAL не теряет целостность, а fsync делает
+# только на контрольных точках. Конкурентные записи ждут блокировку до
+# busy_timeout миллисекунд.
+SQLITE_INIT_COMMAND = ';'.join((
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA busy_timeout=5000',
+    'PRAGMA mmap_size=134217728',
+    'PRAGMA cache_size=-20000',
+    'PRAGMA temp_store=MEMORY',
+))
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'yanews.sqlite_backend',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 60,
+        'OPTIONS': {
+            'init_command': SQLITE_INIT_COMMAND,
+            'transaction_mode': 'IMMEDIATE',
+        },
+    }
+}
+# Локальная копия для чтения, например:
+#   sqlite3 db.sqlite3 ".backup replica.sqlite3"
+# В тестах это зеркало тестовой базы default.
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'NAME': BASE_DIR / 'replica.sqlite3',
+    'TEST': {'MIRROR': 'default'},
+}
+
+DATABASE_ROUTERS = ['yanews.routers.ReplicaRouter']
+
+# Реплики для представлений с replica_reads = True; пустой список —
+# всё читается из default.
+DATABASE_REPLICAS = []
+# Сколько секунд после изменяющего запроса клиент читает из default.
+REPLICA_PIN_SECONDS = 10
+
+# Для проверки на файловом кэше:
+# 'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+# 'LOCATION': BASE_DIR / 'cache',
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
@@ -80,3 +127,52 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+# Длина анонса новости в словах (News.excerpt).
+NEWS_EXCERPT_WORDS = 15
+
+COMMENTS_PAGE_SIZE = 50
+
+NEWS_CACHE_ALIAS = 'default'
+NEWS_PAGE_CACHE_TIMEOUT = 60 * 5
+
+# Список запрещённых слов: файл (по слову в строке) или перечень в настройках.
+# Если не задано ни то, ни другое, используется news.forms.BAD_WORDS.
+BAD_WORDS_FILE = None
+BAD_WORDS = None
+
+# Учёт SQL-запросов и времени рендеринга по страницам (см. query_report).
+QUERY_BUDGET_ENABLED = False
+QUERY_BUDGET_LOG = BASE_DIR / 'query_budget.jsonl'
+# Время по шаблонам и фильтрам в тех же записях (query_report --templates)
+# пишется, если в модуле настроек TEMPLATES заменены на
+# yanews.template_profile.timed(TEMPLATES).
+# Компилировать все шаблоны при запуске WSGI/ASGI (см. settings_production).
+TEMPLATE_WARMUP = False
+
+# Искать кириллические новости по запросам латиницей (транслит pytils).
+NEWS_SEARCH_TRANSLIT = True
+
+# Асинхронные варианты списка и страницы новости для запуска под ASGI.
+NEWS_ASYNC_VIEWS = False
+
+# Не больше N комментариев от пользователя за период в секундах;
+# None — без ограничения.
+NEWS_COMMENT_RATE_LIMIT = (10, 60)
+
+# Отложенная пакетная запись комментариев (см. news.comment_queue).
+NEWS_COMMENT_QUEUE_ENABLED = False
+NEWS_COMMENT_QUEUE_BATCH_SIZE = 100
+NEWS_COMMENT_QUEUE_INTERVAL = 0.5
+NEWS_COMMENT_QUEUE_SYNC = False
+# Сколько раз подряд повторять пачку после OperationalError.
+NEWS_COMMENT_QUEUE_MAX_RETRIES = 5
+
+# Кэш пользователя по хэшу сессии (см. auth); вместе с ним сессии
+# можно читать из кэша:
+# SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+# Кэш должен быть общим для всех процессов, иначе выход и смена пароля
+# в одном процессе не видны в остальных (manage.py check --deploy).
+# Если процесс один: SILENCED_SYSTEM_CHECKS = ['yanews.W001'].
+USER_CACHE_ENABLED = False
+USER_CACHE_ALIAS = 'default'
+USER_CACHE_TIMEOUT = 60 * 5
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class NotesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'notes'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        # Сброс кэша пользователя при изменении учётной записи.
+        from yanote import auth  # noqa: F401
+        from yanote.sqlite_backend.base import set_journal_mode
+        post_migrate.connect(set_journal_mode, sender=self)
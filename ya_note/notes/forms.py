@@ -1,5 +1,3 @@
-from pytils.translit import slugify
-
 from django import forms
 from django.core.exceptions import ValidationError
 
@@ -16,14 +14,32 @@ class NoteForm(forms.ModelForm):
         fields = ('title', 'text', 'slug')
 
     def clean_slug(self):
-        """Обрабатывает случай, если slug не уникален."""
-        cleaned_data = super().clean()
-        slug = cleaned_data.get('slug')
-        if not slug:
-            title = cleaned_data.get('title')
-            slug = slugify(title)[:100]
-        if Note.objects.filter(
+        """
+        Обрабатывает случай, если slug не уникален.
+
+        Пустой slug не проверяем: уникальное значение на основе заголовка
+        выдаст notes.slugs при сохранении заметки, без отказа в форме.
+        """
+        slug = self.cleaned_data.get('slug')
+        if slug and Note.objects.filter(
                 slug=slug
         ).exclude(id=self.instance.pk).exists():
             raise ValidationError(slug + WARNING)
         return slug
+
+    def validate_unique(self):
+        """
+        Уникальность slug уже проверена в clean_slug.
+
+        Повторная проверка моделью стоила бы ещё одного запроса, поэтому
+        slug исключается вместе с полями не из формы и полями с ошибками.
+        """
+        exclude = {
+            field.name for field in self.instance._meta.fields
+            if field.name not in self.fields
+        }
+        exclude.update(self.errors, ('slug',))
+        try:
+            self.instance.validate_unique(exclude=exclude)
+        except ValidationError as error:
+            self.add_error(None, error)
@@ -0,0 +1,48 @@
+import csv
+import json
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand
+
+from notes.models import Note
+
+FIELDS = ('title', 'text', 'slug', 'author')
+
+
+class Command(BaseCommand):
+    help = 'Потоково выгружает заметки в JSONL или CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл .jsonl или .csv; - для stdout.')
+        parser.add_argument('--format', choices=('jsonl', 'csv'))
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format'] or (
+            'csv' if path.endswith('.csv') else 'jsonl'
+        )
+        rows = Note.objects.order_by('pk').values_list(
+            'title', 'text', 'slug', 'author__username'
+        ).iterator(chunk_size=options['batch_size'])
+        opened = (
+            nullcontext(self.stdout) if path == '-'
+            else open(path, 'w', encoding='utf-8', newline='')
+        )
+        exported = 0
+        with opened as stream:
+            if format == 'csv':
+                writer = csv.writer(stream)
+                writer.writerow(FIELDS)
+                for row in rows:
+                    writer.writerow(row)
+                    exported += 1
+            else:
+                for row in rows:
+                    stream.write(
+                        json.dumps(dict(zip(FIELDS, row)), ensure_ascii=False)
+                        + '\n'
+                    )
+                    exported += 1
+        if path != '-':
+            self.stdout.write(f'Выгружено заметок: {exported}')
@@ -0,0 +1,112 @@
+import csv
+import json
+import sys
+from contextlib import nullcontext
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from notes import search
+from notes.models import Note
+from notes.slugs import BatchSlugAllocator, slug_from_title
+
+User = get_user_model()
+
+
+def read_records(stream, format):
+    """Построчно читает записи, не загружая файл в память целиком."""
+    if format == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+class Command(BaseCommand):
+    help = 'Потоково загружает заметки из JSONL или CSV пачками bulk_create.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл .jsonl или .csv; - для stdin.')
+        parser.add_argument('--format', choices=('jsonl', 'csv'))
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--author', help='Автор всех заметок вместо поля author.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format'] or (
+            'csv' if path.endswith('.csv') else 'jsonl'
+        )
+        self.authors = {}
+        self.slugs = BatchSlugAllocator()
+        created = skipped = 0
+        opened = (
+            nullcontext(sys.stdin) if path == '-'
+            else open(path, encoding='utf-8', newline='')
+        )
+        with opened as stream:
+            records = read_records(stream, format)
+            while True:
+                batch = list(islice(records, options['batch_size']))
+                if not batch:
+                    break
+                batch_created, batch_skipped = self.import_batch(
+                    batch, options['author']
+                )
+                created += batch_created
+                skipped += batch_skipped
+        self.stdout.write(f'Загружено заметок: {created}')
+        if skipped:
+            self.stderr.write(f'Пропущено (неизвестный автор): {skipped}')
+
+    def import_batch(self, batch, author=None):
+        if author is not None:
+            for record in batch:
+                record['author'] = author
+        self.resolve_authors({record.get('author') for record in batch})
+        known = [
+            record for record in batch
+            if self.authors.get(record.get('author'))
+        ]
+        slugs = self.slugs.allocate([
+            record.get('slug') or slug_from_title(record['title'])
+            for record in known
+        ])
+        notes = [
+            Note(
+                title=record['title'],
+                text=record['text'],
+                slug=slug,
+                author_id=self.authors[record['author']],
+            )
+            for record, slug in zip(known, slugs)
+        ]
+        chunk = BatchSlugAllocator.LOOKUP_CHUNK
+        with transaction.atomic():
+            Note.objects.bulk_create(notes)
+            # bulk_create не отправляет сигналы и не возвращает id
+            # в SQLite, поэтому индексируем пачку по уникальным slug.
+            for start in range(0, len(slugs), chunk):
+                search.index_new_notes(Note.objects.filter(
+                    slug__in=slugs[start:start + chunk]
+                ).only('id', 'title', 'text', 'author_id'))
+        return len(notes), len(batch) - len(notes)
+
+    def resolve_authors(self, usernames):
+        """Запрашивает из базы только ещё не встречавшихся авторов."""
+        missing = [
+            name for name in usernames
+            if name is not None and name not in self.authors
+        ]
+        chunk = BatchSlugAllocator.LOOKUP_CHUNK
+        found = {}
+        for start in range(0, len(missing), chunk):
+            found.update(User.objects.filter(
+                username__in=missing[start:start + chunk]
+            ).values_list('username', 'pk'))
+        for name in missing:
+            self.authors[name] = found.get(name)
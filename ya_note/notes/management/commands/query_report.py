@@ -0,0 +1,103 @@
+import json
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+SORT_KEYS = {
+    'queries': 'avg_queries',
+    'db': 'avg_db_ms',
+    'template': 'avg_template_ms',
+    'duplicates': 'duplicates',
+}
+
+
+class Command(BaseCommand):
+    help = 'Выводит самые затратные по SQL страницы из QUERY_BUDGET_LOG.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sort', choices=tuple(SORT_KEYS), default='queries'
+        )
+        parser.add_argument('--limit', type=int, default=10)
+        parser.add_argument('--log', default=settings.QUERY_BUDGET_LOG)
+        parser.add_argument(
+            '--templates', action='store_true',
+            help='Время по шаблонам и фильтрам (template_profile.timed).'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['log'], encoding='utf-8') as log:
+                records = [json.loads(line) for line in log]
+        except FileNotFoundError:
+            raise CommandError(f'Файл {options["log"]} не найден.')
+        if options['templates']:
+            return self.report_templates(records, options['limit'])
+        stats = self.aggregate(records)
+        key = SORT_KEYS[options['sort']]
+        rows = sorted(stats, key=lambda row: row[key], reverse=True)
+        self.stdout.write(
+            f'{"URL":<24}{"вызовов":>9}{"ср.SQL":>9}{"макс.SQL":>9}'
+            f'{"SQL, мс":>10}{"шабл., мс":>10}{"повторы":>9}'
+        )
+        for row in rows[:options['limit']]:
+            self.stdout.write(
+                f'{row["url_name"]:<24}{row["requests"]:>9}'
+                f'{row["avg_queries"]:>9.1f}{row["max_queries"]:>9}'
+                f'{row["avg_db_ms"]:>10.2f}{row["avg_template_ms"]:>10.2f}'
+                f'{row["duplicates"]:>9}'
+            )
+            if row['top_duplicate']:
+                sql, count = row['top_duplicate']
+                self.stdout.write(f'    x{count}: {sql[:100]}')
+
+    def report_templates(self, records, limit):
+        """Собственное время шаблонов и фильтров по всем страницам."""
+        totals = Counter()
+        for record in records:
+            totals.update(record.get('templates', {}))
+        if not totals:
+            raise CommandError(
+                'В журнале нет времени по шаблонам: настройте TEMPLATES '
+                'через template_profile.timed.'
+            )
+        requests = sum('templates' in record for record in records)
+        overall = sum(totals.values())
+        self.stdout.write(
+            f'{"шаблон или фильтр":<32}{"всего, мс":>11}'
+            f'{"на запрос":>11}{"доля":>7}'
+        )
+        for name, total in totals.most_common(limit):
+            self.stdout.write(
+                f'{name:<32}{total:>11.2f}{total / requests:>11.3f}'
+                f'{total / overall:>7.0%}'
+            )
+
+    @staticmethod
+    def aggregate(records):
+        """Сводит записи по отдельным запросам в статистику по URL."""
+        groups = defaultdict(list)
+        for record in records:
+            groups[record['url_name']].append(record)
+        stats = []
+        for url_name, group in groups.items():
+            duplicates = Counter()
+            for record in group:
+                duplicates.update(record['duplicates'])
+            requests = len(group)
+            stats.append({
+                'url_name': url_name,
+                'requests': requests,
+                'avg_queries': sum(r['queries'] for r in group) / requests,
+                'max_queries': max(r['queries'] for r in group),
+                'avg_db_ms': sum(r['db_ms'] for r in group) / requests,
+                'avg_template_ms': (
+                    sum(r['template_ms'] for r in group) / requests
+                ),
+                'duplicates': sum(duplicates.values()),
+                'top_duplicate': (
+                    duplicates.most_common(1)[0] if duplicates else None
+                ),
+            })
+        return stats
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from notes import search
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает поисковый индекс заметок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        search.rebuild(chunk_size=options['chunk_size'])
+        backend = 'FTS5' if search.use_fts() else 'NoteSearchTerm'
+        self.stdout.write(f'Индекс пересобран ({backend}).')
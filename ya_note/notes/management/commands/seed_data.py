@@ -0,0 +1,133 @@
+import random
+from itertools import accumulate, islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from notes import search
+from notes.models import Note
+from notes.slugs import BatchSlugAllocator, slug_from_title
+
+User = get_user_model()
+
+TITLES = (
+    'Список покупок', 'Планы на неделю', 'Идеи для подарков',
+    'Рецепт борща', 'Книги на лето', 'Заметки с совещания', 'Расходы',
+    'Тренировки', 'Дела по дому', 'Поездка на дачу', 'Фильмы',
+    'Вопросы к врачу', 'Учёба', 'Цитаты', 'Пароли от Wi-Fi', 'Черновик',
+)
+WORDS = (
+    'купить', 'молоко', 'хлеб', 'позвонить', 'маме', 'записаться',
+    'к', 'врачу', 'прочитать', 'книгу', 'оплатить', 'счёт', 'за',
+    'квартиру', 'сходить', 'в', 'спортзал', 'подготовить', 'отчёт',
+    'забрать', 'посылку', 'полить', 'цветы', 'написать', 'письмо',
+)
+
+
+def popularity(count, skew):
+    """Кумулятивные веса закона Ципфа: k-й по популярности получает 1/k**s."""
+    return list(accumulate(1 / rank ** skew for rank in range(1, count + 1)))
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def create_users(count, prefix, password):
+    """Создаёт недостающих пользователей prefix0..prefixN-1, возвращает id."""
+    usernames = [f'{prefix}{index}' for index in range(count)]
+    password = make_password(password)
+    User.objects.bulk_create(
+        (User(username=name, password=password) for name in usernames),
+        ignore_conflicts=True,
+    )
+    ids = []
+    for batch in batches(usernames, BatchSlugAllocator.LOOKUP_CHUNK):
+        ids.extend(User.objects.filter(
+            username__in=batch
+        ).values_list('pk', flat=True))
+    return ids
+
+
+def title(rng):
+    """
+    Кириллический заголовок; часть заголовков повторяется дословно.
+
+    Совпадающие заголовки дают одинаковый slug, поэтому загрузка
+    проходит и через подбор суффиксов -2, -3, ...
+    """
+    base = rng.choice(TITLES)
+    if rng.random() < 0.5:
+        return base
+    return f'{base} {rng.randint(1, 500)}'
+
+
+def text(rng):
+    lines = rng.randint(1, 10)
+    return '\n'.join(
+        ' '.join(rng.choices(WORDS, k=rng.randint(2, 8))).capitalize()
+        for _ in range(lines)
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет базу пользователями и заметками для нагрузочных проверок.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--notes', type=int, default=5000)
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Показатель закона Ципфа для заметок по авторам.'
+        )
+        parser.add_argument('--prefix', default='writer')
+        parser.add_argument('--password', default='password')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        users = create_users(
+            options['users'], options['prefix'], options['password']
+        )
+        created = 0
+        if users:
+            authors = popularity(len(users), options['skew'])
+            allocator = BatchSlugAllocator()
+            for batch in batches(
+                range(options['notes']), options['batch_size']
+            ):
+                titles = [title(rng) for _ in batch]
+                created += self.create_batch(
+                    rng, titles, allocator.allocate(
+                        [slug_from_title(value) for value in titles]
+                    ),
+                    rng.choices(users, cum_weights=authors, k=len(batch)),
+                )
+        self.stdout.write(
+            f'Создано: пользователей {len(users)}, заметок {created}'
+        )
+
+    def create_batch(self, rng, titles, slugs, authors):
+        notes = [
+            Note(title=value, text=text(rng), slug=slug, author_id=author)
+            for value, slug, author in zip(titles, slugs, authors)
+        ]
+        with transaction.atomic():
+            Note.objects.bulk_create(notes)
+            # Как в import_notes: bulk_create не отправляет сигналы.
+            search.index_new_notes(
+                Note.objects.filter(slug__in=slugs).only(
+                    'id', 'title', 'text', 'author_id'
+                )
+            )
+        return len(notes)
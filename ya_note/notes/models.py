@@ -1,8 +1,6 @@
 from django.conf import settings
 from django.db import models
 
-from pytils.translit import slugify
-
 
 class Note(models.Model):
     title = models.CharField(
@@ -26,13 +24,47 @@ class Note(models.Model):
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
+        # Покрывается составным индексом note_author_id_idx.
+        db_index=False,
     )
 
+    class Meta:
+        indexes = (
+            models.Index(fields=('author', 'id'), name='note_author_id_idx'),
+        )
+
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        """Пустой slug выдаётся уникальным на основе заголовка."""
+        if self.slug:
+            return super().save(*args, **kwargs)
+        from .slugs import save_with_unique_slug
+        return save_with_unique_slug(
+            self, lambda: super(Note, self).save(*args, **kwargs)
+        )
+
+
+class NoteSearchTerm(models.Model):
+    """
+    Запись обратного индекса для поиска без FTS5.
+
+    Автор продублирован из заметки, чтобы поиск в пределах заметок
+    пользователя шёл по индексу без соединения с таблицей заметок.
+    """
+    note = models.ForeignKey(Note, on_delete=models.CASCADE)
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    term = models.CharField(max_length=100)
+    weight = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('author', 'term'), name='note_term_author_idx'
+            ),
+        )
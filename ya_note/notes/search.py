@@ -0,0 +1,174 @@
+"""
+Полнотекстовый поиск по заметкам пользователя.
+
+Основной вариант — таблица SQLite FTS5 notes_note_fts (создаётся
+миграцией, если SQLite собран с FTS5) с ранжированием bm25. Если FTS5 нет,
+используется обратный индекс в модели NoteSearchTerm. Оба индекса
+обновляются сигналами при сохранении и удалении заметки; при смене
+варианта индекс пересобирается командой rebuild_search_index.
+"""
+import re
+from collections import Counter
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Sum
+
+from .models import Note, NoteSearchTerm
+
+FTS_TABLE = 'notes_note_fts'
+TITLE_WEIGHT = 10
+TOKEN = re.compile(r'\w+')
+
+_fts_available = {}
+
+
+def tokenize(text):
+    max_length = NoteSearchTerm._meta.get_field('term').max_length
+    return [
+        token[:max_length]
+        for token in TOKEN.findall(text.lower().replace('ё', 'е'))
+    ]
+
+
+def use_fts():
+    backend = settings.NOTES_SEARCH_BACKEND
+    if backend != 'auto':
+        return backend == 'fts5'
+    key = connection.settings_dict['NAME']
+    if key not in _fts_available:
+        _fts_available[key] = (
+            connection.vendor == 'sqlite'
+            and FTS_TABLE in connection.introspection.table_names()
+        )
+    return _fts_available[key]
+
+
+def index_note(note):
+    """Добавляет заметку в индекс или обновляет её запись."""
+    remove_note(note.pk)
+    index_new_notes([note])
+
+
+def index_new_notes(notes):
+    """Добавляет в индекс пачку заметок, которых там ещё нет."""
+    if use_fts():
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE}(rowid, title, text, author_id) '
+                'VALUES (%s, %s, %s, %s)',
+                [
+                    (note.pk, note.title, note.text, note.author_id)
+                    for note in notes
+                ]
+            )
+        return
+    terms = []
+    for note in notes:
+        weights = Counter()
+        for token in tokenize(note.title):
+            weights[token] += TITLE_WEIGHT
+        for token in tokenize(note.text):
+            weights[token] += 1
+        terms.extend(
+            NoteSearchTerm(
+                note_id=note.pk, author_id=note.author_id,
+                term=term, weight=weight
+            )
+            for term, weight in weights.items()
+        )
+    NoteSearchTerm.objects.bulk_create(terms)
+
+
+def remove_note(note_id):
+    if use_fts():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', (note_id,)
+            )
+        return
+    NoteSearchTerm.objects.filter(note_id=note_id).delete()
+
+
+def rebuild(chunk_size=2000):
+    """Пересобирает индекс с нуля, читая заметки порциями."""
+    if use_fts():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    else:
+        NoteSearchTerm.objects.all().delete()
+    notes = Note.objects.only(
+        'id', 'title', 'text', 'author_id'
+    ).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(notes, chunk_size))
+        if not chunk:
+            break
+        index_new_notes(chunk)
+
+
+class SearchResults:
+    """
+    Ранжированные результаты поиска заметок одного автора.
+
+    Поддерживает count() и срезы, поэтому с ним работает Paginator:
+    каждая страница — это один запрос к индексу с LIMIT/OFFSET и один
+    запрос за самими заметками.
+    """
+
+    def __init__(self, author, query):
+        self.author = author
+        self.terms = list(dict.fromkeys(tokenize(query)))
+
+    def count(self):
+        if not self.terms:
+            return 0
+        if use_fts():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'SELECT COUNT(*) FROM {FTS_TABLE} '
+                    f'WHERE {FTS_TABLE} MATCH %s AND author_id = %s',
+                    (self.match_expression(), self.author.pk)
+                )
+                return cursor.fetchone()[0]
+        return self.term_hits().count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, page):
+        if not self.terms:
+            return []
+        offset = page.start or 0
+        limit = page.stop - offset
+        if use_fts():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'SELECT rowid FROM {FTS_TABLE} '
+                    f'WHERE {FTS_TABLE} MATCH %s AND author_id = %s '
+                    f'ORDER BY bm25({FTS_TABLE}, {TITLE_WEIGHT}, 1) '
+                    'LIMIT %s OFFSET %s',
+                    (self.match_expression(), self.author.pk, limit, offset)
+                )
+                ids = [row[0] for row in cursor.fetchall()]
+        else:
+            ids = list(self.term_hits().order_by(
+                '-score', 'note_id'
+            ).values_list('note_id', flat=True)[offset:offset + limit])
+        notes = Note.objects.filter(
+            author=self.author, pk__in=ids
+        ).only('id', 'slug', 'title').in_bulk()
+        return [notes[pk] for pk in ids if pk in notes]
+
+    def match_expression(self):
+        """Все слова запроса в кавычках: синтаксис FTS5 не пропускаем."""
+        return ' '.join(f'"{term}"' for term in self.terms)
+
+    def term_hits(self):
+        """Заметки автора, содержащие все слова запроса, с весом."""
+        return NoteSearchTerm.objects.filter(
+            author=self.author, term__in=self.terms
+        ).values('note_id').annotate(
+            matched=Count('term'), score=Sum('weight')
+        ).filter(matched=len(self.terms))
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import search
+from .models import Note
+
+
+@receiver(post_save, sender=Note)
+def note_saved(sender, instance, raw=False, **kwargs):
+    """Обновляем поисковый индекс при сохранении заметки."""
+    if not raw:
+        search.index_note(instance)
+
+
+@receiver(post_delete, sender=Note)
+def note_deleted(sender, instance, **kwargs):
+    search.remove_note(instance.pk)
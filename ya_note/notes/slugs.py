@@ -0,0 +1,145 @@
+"""Выдача уникальных slug для заметок."""
+import re
+from functools import lru_cache
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from pytils.translit import slugify
+
+from .models import Note
+
+SLUG_MAX_LENGTH = Note._meta.get_field('slug').max_length
+# Самый длинный суффикс, который мы допускаем: дефис и десять цифр.
+MAX_SUFFIX_LENGTH = 11
+SUFFIX = re.compile(r'-(\d+)$')
+
+
+@lru_cache(maxsize=2 ** 16)
+def slug_from_title(title):
+    """
+    Тот же slug, что формирует Note.save для пустого поля.
+
+    Транслитерация — самая дорогая часть массовой загрузки, а заголовки
+    часто повторяются, поэтому результаты кэшируются.
+    """
+    return slugify(title)[:SLUG_MAX_LENGTH]
+
+
+def with_suffix(base, number):
+    suffix = f'-{number}'
+    return base[:SLUG_MAX_LENGTH - len(suffix)] + suffix
+
+
+def taken_variants(base, exclude_pk=None):
+    """
+    Занятые slug среди base и base-2, base-3, ... — одним запросом.
+
+    Префикс проверяется диапазонным условием, а не LIKE: так запрос идёт
+    по уникальному индексу на slug при любых настройках LIKE в SQLite.
+    """
+    prefix = base[:SLUG_MAX_LENGTH - MAX_SUFFIX_LENGTH]
+    if prefix == base:
+        prefix += '-'
+    queryset = Note.objects.filter(
+        Q(slug=base) | Q(slug__gte=prefix, slug__lt=prefix + '\uffff')
+    )
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    return set(queryset.values_list('slug', flat=True))
+
+
+def used_numbers(taken, base):
+    """Номера суффиксов, уже занятые вариантами base."""
+    numbers = set()
+    for slug in taken:
+        match = SUFFIX.search(slug)
+        if match and with_suffix(base, int(match[1])) == slug:
+            numbers.add(int(match[1]))
+    return numbers
+
+
+def allocate_slug(base, exclude_pk=None):
+    """Возвращает base, если он свободен, иначе первый свободный base-N."""
+    taken = taken_variants(base, exclude_pk)
+    if base not in taken:
+        return base
+    numbers = used_numbers(taken, base)
+    number = 2
+    while number in numbers:
+        number += 1
+    return with_suffix(base, number)
+
+
+def save_with_unique_slug(note, save, attempts=5):
+    """
+    Сохраняет заметку с автоматически выданным slug.
+
+    Между выбором slug и INSERT его может занять конкурентный запрос:
+    тогда ловим IntegrityError и выбираем slug заново.
+    """
+    base = slug_from_title(note.title)
+    for attempt in range(attempts):
+        note.slug = allocate_slug(base, exclude_pk=note.pk)
+        try:
+            with transaction.atomic():
+                return save()
+        except IntegrityError:
+            collided = Note.objects.filter(
+                slug=note.slug
+            ).exclude(pk=note.pk).exists()
+            if not collided or attempt == attempts - 1:
+                raise
+
+
+class BatchSlugAllocator:
+    """
+    Раздаёт уникальные slug пачкам новых заметок.
+
+    На пачку выполняется один запрос slug__in; для каждого slug, который
+    оказался занят, — ещё один запрос по префиксу, после чего следующий
+    свободный номер запоминается и дальше выдаётся без обращения к базе.
+    """
+
+    # Ограничение SQLite на число параметров в одном запросе.
+    LOOKUP_CHUNK = 900
+
+    def __init__(self):
+        self.next_number = {}
+
+    def allocate(self, slugs):
+        existing = set()
+        unique = list(set(slugs))
+        for start in range(0, len(unique), self.LOOKUP_CHUNK):
+            existing.update(Note.objects.filter(
+                slug__in=unique[start:start + self.LOOKUP_CHUNK]
+            ).values_list('slug', flat=True))
+        allocated = []
+        seen = set()
+        for slug in slugs:
+            if slug in existing or slug in seen:
+                slug = self.next_free(slug, existing, seen)
+            else:
+                self.reserve(slug)
+            seen.add(slug)
+            allocated.append(slug)
+        return allocated
+
+    def next_free(self, base, *taken):
+        if base not in self.next_number:
+            numbers = used_numbers(taken_variants(base), base)
+            self.next_number[base] = max(numbers, default=1) + 1
+        while True:
+            number = self.next_number[base]
+            self.next_number[base] = number + 1
+            slug = with_suffix(base, number)
+            if not any(slug in slugs for slugs in taken):
+                return slug
+
+    def reserve(self, slug):
+        """Не выдавать позже slug вида base-N, пришедший в данных явно."""
+        match = SUFFIX.search(slug)
+        if match is None:
+            return
+        base, number = slug[:match.start()], int(match[1])
+        if self.next_number.get(base, number + 1) <= number:
+            self.next_number[base] = number + 1
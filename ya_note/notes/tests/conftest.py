@@ -0,0 +1,13 @@
+import os
+
+import pytest
+
+from django.conf import settings
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix):
+    """Файл тестовой БД воркера, который задаёт run_tests.py."""
+    name = os.environ.get('TEST_DB_NAME')
+    if name:
+        settings.DATABASES['default'].setdefault('TEST', {})['NAME'] = name
@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from yanote import auth
+
+User = get_user_model()
+
+
+@override_settings(
+    USER_CACHE_ENABLED=True,
+    SESSION_ENGINE='django.contrib.sessions.backends.cached_db',
+)
+class TestCachedUser(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.list_url = reverse('notes:list')
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def test_user_loaded_from_cache(self):
+        """Проверка, что повторный запрос не читает сессию и пользователя"""
+        self.client.get(self.list_url)
+        # Только COUNT для пагинации: заметок у автора нет.
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url)
+        self.assertTrue(response.context['user'].is_authenticated)
+
+    def test_password_change_invalidates_cached_user(self):
+        """Проверка выхода из всех сессий после смены пароля"""
+        self.client.get(self.list_url)
+        self.author.set_password('новый пароль')
+        self.author.save()
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, 302)
+
+    def test_logout_drops_cached_user(self):
+        """Проверка удаления пользователя из кэша при выходе"""
+        response = self.client.get(self.list_url)
+        user_key, _ = auth.cache_keys(response.wsgi_request)
+        self.assertIsNotNone(auth.get_cache().get(user_key))
+        self.client.get(reverse('users:logout'))
+        self.assertIsNone(auth.get_cache().get(user_key))
+
+
+class TestSharedCacheCheck(SimpleTestCase):
+
+    def test_disabled_by_default(self):
+        """Проверка отсутствия предупреждения без кэша пользователя"""
+        self.assertEqual(auth.check_shared_cache(None), [])
+
+    @override_settings(USER_CACHE_ENABLED=True)
+    def test_process_local_cache_warning(self):
+        """Проверка предупреждения о LocMemCache при кэше пользователя"""
+        self.assertEqual(
+            [warning.id for warning in auth.check_shared_cache(None)],
+            ['yanote.W001'],
+        )
+
+    @override_settings(
+        SESSION_ENGINE='django.contrib.sessions.backends.cached_db'
+    )
+    def test_session_cache_warning(self):
+        """Проверка предупреждения о сессиях в LocMemCache"""
+        self.assertEqual(len(auth.check_shared_cache(None)), 1)
+
+    @override_settings(USER_CACHE_ENABLED=True, CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        },
+    })
+    def test_shared_cache_allowed(self):
+        """Проверка отсутствия предупреждения с кэшем вне памяти процесса"""
+        self.assertEqual(auth.check_shared_cache(None), [])
@@ -0,0 +1,107 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from notes import search
+from notes.models import Note
+from notes.slugs import BatchSlugAllocator
+
+User = get_user_model()
+
+
+class TestImportExport(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.note = Note.objects.create(
+            title='Заметка',
+            text='Текст',
+            author=cls.author
+        )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def test_import_resolves_slug_collisions(self):
+        """Проверка загрузки заметок с совпадающими заголовками"""
+        path = self.directory / 'notes.jsonl'
+        records = [
+            {'title': 'Заметка', 'text': f'Текст {index}', 'author': 'Автор'}
+            for index in range(3)
+        ]
+        records.append(
+            {'title': 'Чужая', 'text': 'Текст', 'author': 'Незнакомец'}
+        )
+        path.write_text(
+            '\n'.join(json.dumps(record) for record in records),
+            encoding='utf-8'
+        )
+        call_command(
+            'import_notes', str(path), batch_size=2,
+            stdout=StringIO(), stderr=StringIO()
+        )
+        slugs = set(Note.objects.values_list('slug', flat=True))
+        self.assertEqual(
+            slugs, {'zametka', 'zametka-2', 'zametka-3', 'zametka-4'}
+        )
+
+    def test_import_indexes_in_lookup_chunks(self):
+        """Проверка индексации пачки больше LOOKUP_CHUNK"""
+        path = self.directory / 'notes.jsonl'
+        path.write_text('\n'.join(
+            json.dumps({
+                'title': f'Поиск {index}', 'text': 'Текст', 'author': 'Автор'
+            })
+            for index in range(5)
+        ), encoding='utf-8')
+        with mock.patch.object(BatchSlugAllocator, 'LOOKUP_CHUNK', 2):
+            with CaptureQueriesContext(connection) as queries:
+                call_command('import_notes', str(path), stdout=StringIO())
+        # Заметки для индекса выбираются по 2, 2 и 1 slug.
+        lookups = [
+            query for query in queries
+            if '"notes_note"."text"' in query['sql']
+            and ' IN (' in query['sql']
+        ]
+        self.assertEqual(len(lookups), 3)
+        self.assertEqual(
+            search.SearchResults(self.author, 'поиск').count(), 5
+        )
+
+    def test_export_import_roundtrip(self):
+        """Проверка выгрузки в CSV и повторной загрузки"""
+        path = self.directory / 'notes.csv'
+        call_command('export_notes', str(path), stdout=StringIO())
+        Note.objects.all().delete()
+        call_command('import_notes', str(path), stdout=StringIO())
+        note = Note.objects.get()
+        self.assertEqual(
+            (note.title, note.text, note.slug, note.author),
+            (self.note.title, self.note.text, self.note.slug, self.author)
+        )
+
+
+class TestSeedData(TestCase):
+
+    def test_seed_data_creates_unique_slugs(self):
+        """Проверка генерации заметок с кириллическими заголовками"""
+        call_command(
+            'seed_data', users=3, notes=300, batch_size=100,
+            stdout=StringIO()
+        )
+        slugs = list(Note.objects.values_list('slug', flat=True))
+        self.assertEqual(len(slugs), 300)
+        self.assertEqual(len(set(slugs)), 300)
+        self.assertTrue(all(slug.isascii() for slug in slugs))
+        self.assertEqual(User.objects.count(), 3)
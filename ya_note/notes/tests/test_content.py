@@ -51,3 +51,29 @@ class TestContent(TestCase):
                 response = self.client.get(url)
                 self.assertIn('form', response.context)
                 self.assertIsInstance(response.context['form'], NoteForm)
+
+    def test_note_list_is_paginated(self):
+        """Проверка постраничного вывода и загрузки только нужных полей"""
+        Note.objects.bulk_create(
+            Note(title=f'Заметка {index}', text='Текст',
+                 slug=f'note-{index}', author=self.author)
+            for index in range(2)
+        )
+        self.client.force_login(self.author)
+        with self.settings(NOTES_PAGE_SIZE=2):
+            response = self.client.get(self.list_url)
+        notes = response.context['note_list']
+        self.assertEqual(len(notes), 2)
+        self.assertTrue(response.context['is_paginated'])
+        self.assertEqual(notes[0].get_deferred_fields(), {'text', 'author_id'})
+
+    def test_note_feed_cursor(self):
+        """Проверка курсорной JSON-ленты заметок"""
+        Note.objects.create(title='Вторая', text='Текст', author=self.author)
+        self.client.force_login(self.author)
+        with self.settings(NOTES_PAGE_SIZE=1):
+            first = self.client.get(reverse('notes:feed')).json()
+            second = self.client.get(first['next']).json()
+        self.assertEqual(first['notes'][0]['slug'], self.note.slug)
+        self.assertEqual(second['notes'][0]['title'], 'Вторая')
+        self.assertIsNone(second['next'])
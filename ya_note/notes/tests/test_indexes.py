@@ -0,0 +1,55 @@
+from unittest import skipIf
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.models import Note
+
+User = get_user_model()
+
+
+@skipIf(connection.vendor != 'sqlite', 'План запроса проверяем на SQLite')
+class TestIndexes(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.note = Note.objects.create(
+            title='Заметка',
+            text='Текст',
+            author=cls.author
+        )
+
+    def assert_uses_index(self, captured, table):
+        """Проверяет, что SELECT-запросы к таблице идут по индексу SQLite."""
+        queries = [
+            query['sql'] for query in captured
+            if query['sql'].startswith('SELECT')
+            and f'FROM "{table}"' in query['sql']
+        ]
+        self.assertTrue(queries, f'Запросы к {table} не выполнялись')
+        with connection.cursor() as cursor:
+            for sql in queries:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plan = ' | '.join(row[-1] for row in cursor.fetchall())
+                self.assertTrue(
+                    'INDEX' in plan or 'PRIMARY KEY' in plan, plan
+                )
+                self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_hot_views_use_indexes(self):
+        """Проверка использования индексов в запросах нагруженных страниц"""
+        self.client.force_login(self.author)
+        urls = (
+            ('notes:list', None),
+            ('notes:detail', (self.note.slug,)),
+            ('notes:edit', (self.note.slug,)),
+        )
+        for name, args in urls:
+            with self.subTest(name=name):
+                with CaptureQueriesContext(connection) as captured:
+                    self.client.get(reverse(name, args=args))
+                self.assert_uses_index(captured, 'notes_note')
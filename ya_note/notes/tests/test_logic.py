@@ -1,9 +1,12 @@
+from unittest import mock
+
 from pytils.translit import slugify
 
 from django.contrib.auth import get_user_model
 from django.test import Client, TestCase
 from django.urls import reverse
 
+from notes import slugs
 from notes.forms import WARNING
 from notes.models import Note
 
@@ -98,3 +101,34 @@ class TestLogic(TestCase):
         new_note = Note.objects.get(id=2)
         expected_slug = slugify(self.form_data['title'])
         self.assertEqual(new_note.slug, expected_slug)
+
+    def test_empty_slug_collision_gets_suffix(self):
+        """Проверка выдачи свободного slug при совпадении заголовков"""
+        self.form_data['title'] = self.note.title
+        for expected_slug in ('zametka-2', 'zametka-3'):
+            with self.subTest(slug=expected_slug):
+                response = self.author_client.post(
+                    self.add_url, data=self.form_data
+                )
+                self.assertRedirects(response, self.success_url)
+                self.assertTrue(
+                    Note.objects.filter(slug=expected_slug).exists()
+                )
+
+    def test_slug_allocation_retries_on_race(self):
+        """Проверка повторного выбора slug, если его успели занять"""
+        note = Note(title=self.note.title, text='Текст', author=self.author)
+        real_allocate = slugs.allocate_slug
+        calls = []
+
+        def stale_allocate(base, exclude_pk=None):
+            # Первый вызов «не видит» заметку, созданную конкурентно.
+            calls.append(base)
+            if len(calls) == 1:
+                return self.note.slug
+            return real_allocate(base, exclude_pk)
+
+        with mock.patch.object(slugs, 'allocate_slug', stale_allocate):
+            note.save()
+        self.assertEqual(note.slug, f'{self.note.slug}-2')
+        self.assertEqual(len(calls), 2)
@@ -0,0 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from notes.models import Note
+
+User = get_user_model()
+
+
+class TestQueries(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.note = Note.objects.create(
+            title='Заметка',
+            text='Текст',
+            author=cls.author
+        )
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def test_read_query_budget(self):
+        """Проверка количества SQL-запросов при просмотре страниц"""
+        slug = (self.note.slug,)
+        urls_and_budgets = (
+            ('notes:home', None, None, 2),
+            ('notes:list', None, None, 4),
+            ('notes:feed', None, None, 3),
+            ('notes:feed', None, {'after': self.note.id}, 3),
+            ('notes:search', None, {'q': 'заметка'}, 5),
+            ('notes:success', None, None, 2),
+            ('notes:add', None, None, 2),
+            ('notes:detail', slug, None, 3),
+            ('notes:edit', slug, None, 3),
+            ('notes:delete', slug, None, 3),
+        )
+        for name, args, data, expected_queries in urls_and_budgets:
+            with self.subTest(name=name, data=data):
+                url = reverse(name, args=args)
+                with self.assertNumQueries(expected_queries):
+                    self.client.get(url, data)
+
+    def test_write_query_budget(self):
+        """Проверка количества SQL-запросов при изменении заметок"""
+        # Сохранение с автоматическим slug идёт в точке сохранения
+        # (SAVEPOINT и RELEASE), чтобы повторить его при гонке за slug.
+        # Ещё два запроса обновляют поисковый индекс.
+        slug = (self.note.slug,)
+        urls_and_budgets = (
+            ('notes:add', None, {'title': 'Новая', 'text': 'Текст'}, 8),
+            (
+                'notes:edit',
+                slug,
+                {'title': 'Заметка', 'text': 'Другой текст'},
+                9
+            ),
+            ('notes:delete', slug, None, 6),
+        )
+        for name, args, form_data, expected_queries in urls_and_budgets:
+            with self.subTest(name=name):
+                url = reverse(name, args=args)
+                with self.assertNumQueries(expected_queries):
+                    self.client.post(url, data=form_data)
@@ -0,0 +1,82 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from notes.models import Note
+from yanote import template_profile
+
+User = get_user_model()
+
+
+class TestQueryBudget(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        Note.objects.create(title='Заметка', text='Текст', author=cls.author)
+
+    def test_server_timing_and_report(self):
+        """Проверка заголовка Server-Timing и отчёта query_report"""
+        with tempfile.TemporaryDirectory() as directory:
+            log = Path(directory) / 'query_budget.jsonl'
+            with override_settings(
+                QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_LOG=log
+            ):
+                self.client.force_login(self.author)
+                response = self.client.get(reverse('notes:list'))
+                self.assertIn('4 queries', response['Server-Timing'])
+                out = StringIO()
+                call_command('query_report', log=log, stdout=out)
+        self.assertIn('notes:list', out.getvalue())
+
+    async def get_async(self, url):
+        return await self.async_client.get(url)
+
+    def test_server_timing_under_asgi(self):
+        """Проверка подсчёта запросов асинхронной цепочкой middleware"""
+        with tempfile.TemporaryDirectory() as directory:
+            log = Path(directory) / 'query_budget.jsonl'
+            with override_settings(
+                QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_LOG=log
+            ):
+                self.async_client.force_login(self.author)
+                response = async_to_sync(self.get_async)(
+                    reverse('notes:list')
+                )
+        self.assertIn('4 queries', response['Server-Timing'])
+
+    def test_template_timing_report(self):
+        """Проверка времени по шаблонам в журнале и отчёте query_report"""
+        with tempfile.TemporaryDirectory() as directory:
+            log = Path(directory) / 'query_budget.jsonl'
+            with override_settings(
+                QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_LOG=log,
+                TEMPLATES=template_profile.timed(settings.TEMPLATES),
+            ):
+                self.client.force_login(self.author)
+                self.client.get(reverse('notes:list'))
+                record = json.loads(log.read_text())
+                out = StringIO()
+                call_command(
+                    'query_report', log=log, templates=True, stdout=out
+                )
+        self.assertLessEqual(
+            {'base.html', 'notes/list.html'}, set(record['templates'])
+        )
+        self.assertIn('notes/list.html', out.getvalue())
+
+    def test_warmup_templates(self):
+        """Проверка компиляции всех шаблонов командой warmup_templates"""
+        out = StringIO()
+        call_command(
+            'warmup_templates', limit=100, stdout=out, stderr=StringIO()
+        )
+        self.assertIn('notes/detail.html', out.getvalue())
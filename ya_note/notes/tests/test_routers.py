@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.models import Note
+from yanote.middleware import PIN_COOKIE
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class TestReplicaRouting(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.author = User.objects.create(username='Автор')
+        self.note = Note.objects.create(
+            title='Заметка', text='Текст', slug='zametka', author=self.author
+        )
+        self.client.force_login(self.author)
+
+    def replica_queries(self, url):
+        with CaptureQueriesContext(connections['replica']) as queries:
+            response = self.client.get(url)
+        return response, len(queries)
+
+    def test_reads_go_to_replica(self):
+        """Проверка чтения списка и заметки с реплики"""
+        for url in (
+            reverse('notes:list'),
+            reverse('notes:detail', args=(self.note.slug,)),
+        ):
+            with self.subTest(url=url):
+                response, count = self.replica_queries(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertGreater(count, 0)
+
+    def test_read_after_write_is_pinned(self):
+        """Проверка, что после записи автор читает из default и видит её"""
+        response = self.client.post(
+            reverse('notes:edit', args=(self.note.slug,)),
+            {'title': 'Новый заголовок', 'text': 'Текст', 'slug': 'zametka'},
+        )
+        self.assertRedirects(response, reverse('notes:success'))
+        self.assertIn(PIN_COOKIE, response.cookies)
+        response, count = self.replica_queries(
+            reverse('notes:detail', args=(self.note.slug,))
+        )
+        self.assertEqual(count, 0)
+        self.assertContains(response, 'Новый заголовок')
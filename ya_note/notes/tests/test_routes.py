@@ -31,6 +31,8 @@ class TestRoutes(TestCase):
             ('users:signup', None, None, HTTPStatus.OK),
             ('notes:add', None, self.author, HTTPStatus.OK),
             ('notes:list', None, self.author, HTTPStatus.OK),
+            ('notes:feed', None, self.author, HTTPStatus.OK),
+            ('notes:search', None, self.author, HTTPStatus.OK),
             ('notes:success', None, self.author, HTTPStatus.OK),
             ('notes:edit', (self.note.slug,), self.author, HTTPStatus.OK),
             (
@@ -70,6 +72,8 @@ class TestRoutes(TestCase):
         urls = (
             ('notes:add', None),
             ('notes:list', None),
+            ('notes:feed', None),
+            ('notes:search', None),
             ('notes:success', None),
             ('notes:edit', (self.note.slug,)),
             ('notes:detail', (self.note.slug,)),
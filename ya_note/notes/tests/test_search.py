@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from notes.models import Note
+
+User = get_user_model()
+
+
+@override_settings(NOTES_SEARCH_BACKEND='fts5')
+class TestSearch(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.reader = User.objects.create(username='Другой пользователь')
+        cls.in_title = Note.objects.create(
+            title='Рецепт борща', text='Свёкла, капуста', author=cls.author
+        )
+        cls.in_text = Note.objects.create(
+            title='Покупки', text='Купить свеклу для борща',
+            author=cls.author
+        )
+        cls.foreign = Note.objects.create(
+            title='Борщ', text='Чужая заметка', author=cls.reader
+        )
+        cls.url = reverse('notes:search')
+
+    def search(self, query):
+        self.client.force_login(self.author)
+        response = self.client.get(self.url, {'q': query})
+        return list(response.context['object_list'])
+
+    def test_results_are_ranked_and_scoped_to_author(self):
+        """Проверка ранжирования и поиска только по своим заметкам"""
+        self.assertEqual(self.search('борща'), [self.in_title, self.in_text])
+
+    def test_all_words_must_match(self):
+        """Проверка, что найдены заметки со всеми словами запроса"""
+        self.assertEqual(self.search('свеклу БОРЩА'), [self.in_text])
+
+    def test_index_follows_updates_and_deletes(self):
+        """Проверка обновления индекса при изменении и удалении заметки"""
+        self.in_text.text = 'Купить хлеб'
+        self.in_text.save()
+        self.assertEqual(self.search('борща'), [self.in_title])
+        self.in_title.delete()
+        self.assertEqual(self.search('борща'), [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        """Проверка, что служебные символы запроса не ломают поиск"""
+        self.assertEqual(self.search('борща" OR *'), [])
+
+
+@override_settings(NOTES_SEARCH_BACKEND='python')
+class TestPythonSearch(TestSearch):
+    """Те же проверки для обратного индекса без FTS5."""
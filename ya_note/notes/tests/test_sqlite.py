@@ -0,0 +1,59 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from django.db import connections
+from django.test import SimpleTestCase
+
+from yanote.sqlite_backend.base import set_journal_mode
+
+
+class TestSQLiteConnection(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.wrapper = connections['default'].__class__(
+            {
+                **connections['default'].settings_dict,
+                'NAME': str(Path(directory.name) / 'db.sqlite3'),
+            },
+            alias='file',
+        )
+        self.addCleanup(self.wrapper.close)
+        connections['file'] = self.wrapper
+        self.addCleanup(connections.__delitem__, 'file')
+
+    def test_pragmas_applied(self):
+        """Проверка PRAGMA, выполняемых при открытии соединения"""
+        with self.wrapper.cursor() as cursor:
+            pragmas = {
+                name: cursor.execute(f'PRAGMA {name}').fetchone()[0]
+                for name in ('journal_mode', 'synchronous', 'busy_timeout')
+            }
+        self.assertEqual(pragmas, {
+            'journal_mode': 'delete', 'synchronous': 1, 'busy_timeout': 5000
+        })
+
+    def test_migrate_switches_to_wal(self):
+        """Проверка, что WAL включается после migrate и остаётся в файле"""
+        set_journal_mode(using='file')
+        self.wrapper.close()
+        with self.wrapper.cursor() as cursor:
+            self.assertEqual(
+                cursor.execute('PRAGMA journal_mode').fetchone()[0], 'wal'
+            )
+
+    def test_transaction_takes_write_lock_immediately(self):
+        """Проверка, что atomic начинается с BEGIN IMMEDIATE"""
+        self.wrapper.set_autocommit(
+            False, force_begin_transaction_with_broken_autocommit=True
+        )
+        other = sqlite3.connect(self.wrapper.settings_dict['NAME'], timeout=0)
+        try:
+            with self.assertRaisesRegex(sqlite3.OperationalError, 'locked'):
+                other.execute('BEGIN IMMEDIATE')
+        finally:
+            other.close()
+            self.wrapper.rollback()
+            self.wrapper.set_autocommit(True)
@@ -1,9 +1,13 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.urls import reverse_lazy
+from django.core.exceptions import BadRequest
+from django.http import JsonResponse
+from django.urls import reverse, reverse_lazy
 from django.views import generic
 
 from .forms import NoteForm
 from .models import Note
+from .search import SearchResults
 
 
 class Home(generic.TemplateView):
@@ -32,9 +36,8 @@ class NoteCreate(NoteBase, generic.CreateView):
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
+        """Заметка сохраняется один раз — в ModelFormMixin.form_valid."""
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
@@ -52,8 +55,65 @@ class NoteDelete(NoteBase, generic.DeleteView):
 class NotesList(NoteBase, generic.ListView):
     """Список всех заметок пользователя."""
     template_name = 'notes/list.html'
+    list_fields = ('id', 'slug', 'title')
+    replica_reads = True
+
+    def get_paginate_by(self, queryset):
+        return settings.NOTES_PAGE_SIZE
+
+    def get_queryset(self):
+        """Для списка нужны только id, slug и заголовок — без текста."""
+        return super().get_queryset().only(*self.list_fields).order_by('id')
+
+
+class NotesFeed(NotesList):
+    """Список заметок в JSON с курсором по id для бесконечной прокрутки."""
+
+    def get(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        after = request.GET.get('after')
+        if after:
+            try:
+                queryset = queryset.filter(id__gt=int(after))
+            except ValueError:
+                raise BadRequest('Некорректный курсор.')
+        size = self.get_paginate_by(queryset)
+        notes = list(queryset[:size + 1])
+        next_url = None
+        if len(notes) > size:
+            notes = notes[:size]
+            next_url = f'{reverse("notes:feed")}?after={notes[-1].id}'
+        return JsonResponse({
+            'notes': [
+                {
+                    'id': note.id,
+                    'slug': note.slug,
+                    'title': note.title,
+                    'url': reverse('notes:detail', args=(note.slug,)),
+                }
+                for note in notes
+            ],
+            'next': next_url,
+        })
 
 
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
+    replica_reads = True
+
+
+class NoteSearch(NoteBase, generic.ListView):
+    """Поиск по заметкам пользователя."""
+    template_name = 'notes/search.html'
+
+    def get_paginate_by(self, queryset):
+        return settings.NOTES_PAGE_SIZE
+
+    def get_queryset(self):
+        return SearchResults(self.request.user, self.request.GET.get('q', ''))
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.request.GET.get('q', '')
+        return context
@@ -22,12 +22,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yanote.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'yanote.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'yanote.middleware.ReplicaMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -52,12 +55,47 @@ TEMPLATES = [
 WSGI_APPLICATION = 'yanote.wsgi.application'
 
 
+# WAL позволяет читать во время записи; режим сохраняется в файле базы
+# и включается один раз после migrate (см. sqlite_backend).
+SQLITE_JOURNAL_MODE = 'WAL'
+# synchronous=NORMAL в режиме WAL не теряет целостность, а fsync делает
+# только на контрольных точках. Конкурентные записи ждут блокировку до
+# busy_timeout миллисекунд.
+SQLITE_INIT_COMMAND = ';'.join((
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA busy_timeout=5000',
+    'PRAGMA mmap_size=134217728',
+    'PRAGMA cache_size=-20000',
+    'PRAGMA temp_store=MEMORY',
+))
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'yanote.sqlite_backend',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 60,
+        'OPTIONS': {
+            'init_command': SQLITE_INIT_COMMAND,
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
+# Локальная копия для чтения, например:
+#   sqlite3 db.sqlite3 ".backup replica.sqlite3"
+# В тестах это зеркало тестовой базы default.
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'NAME': BASE_DIR / 'replica.sqlite3',
+    'TEST': {'MIRROR': 'default'},
+}
+
+DATABASE_ROUTERS = ['yanote.routers.ReplicaRouter']
+
+# Реплики для представлений с replica_reads = True; пустой список —
+# всё читается из default.
+DATABASE_REPLICAS = []
+# Сколько секунд после изменяющего запроса клиент читает из default.
+REPLICA_PIN_SECONDS = 10
 
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -87,3 +125,26 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+NOTES_PAGE_SIZE = 50
+# Поиск по заметкам: 'auto' (FTS5, если есть), 'fts5' или 'python'.
+NOTES_SEARCH_BACKEND = 'auto'
+
+# Учёт SQL-запросов и времени рендеринга по страницам (см. query_report).
+QUERY_BUDGET_ENABLED = False
+QUERY_BUDGET_LOG = BASE_DIR / 'query_budget.jsonl'
+# Время по шаблонам и фильтрам в тех же записях (query_report --templates)
+# пишется, если в модуле настроек TEMPLATES заменены на
+# yanote.template_profile.timed(TEMPLATES).
+# Компилировать все шаблоны при запуске WSGI/ASGI (см. settings_production).
+TEMPLATE_WARMUP = False
+
+# Кэш пользователя по хэшу сессии (см. auth); вместе с ним сессии
+# можно читать из кэша:
+# SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+# Кэш должен быть общим для всех процессов, иначе выход и смена пароля
+# в одном процессе не видны в остальных (manage.py check --deploy).
+# Если процесс один: SILENCED_SYSTEM_CHECKS = ['yanote.W001'].
+USER_CACHE_ENABLED = False
+USER_CACHE_ALIAS = 'default'
+USER_CACHE_TIMEOUT = 60 * 5
@@ -0,0 +1,30 @@
+"""
+Профиль для боевого запуска: DJANGO_SETTINGS_MODULE=yanote.settings_production.
+
+Шаблоны читаются кэширующим загрузчиком и компилируются один раз при
+запуске процесса (TEMPLATE_WARMUP), а не при первом запросе к странице.
+
+С USER_CACHE_ENABLED или сессиями в кэше CACHES нужно задать общим
+для всех процессов (Memcached, Redis); manage.py check --deploy
+предупреждает о LocMemCache.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import TEMPLATES
+
+DEBUG = False
+
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
+
+TEMPLATE_WARMUP = True
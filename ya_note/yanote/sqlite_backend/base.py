@@ -0,0 +1,53 @@
+"""
+SQLite с настройкой каждого нового соединения.
+
+Повторяет опции, появившиеся в Django 5.1, поэтому после обновления
+достаточно вернуть ENGINE 'django.db.backends.sqlite3':
+
+* OPTIONS['init_command'] — SQL (обычно PRAGMA через «;»), который
+  выполняется сразу после открытия соединения;
+* OPTIONS['transaction_mode'] — режим BEGIN для transaction.atomic.
+  С IMMEDIATE пишущая транзакция берёт блокировку сразу и ждёт её
+  в пределах busy_timeout, а не падает с «database is locked» при
+  попытке повысить уже открытую читающую транзакцию до записи.
+
+Режим журнала хранится в самом файле базы, поэтому его не нужно
+задавать при каждом соединении: set_journal_mode включает
+SQLITE_JOURNAL_MODE один раз после migrate. Чтение базы её файл
+не меняет.
+"""
+from django.conf import settings
+from django.db import connections
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.init_command = params.pop('init_command', None)
+        self.transaction_mode = params.pop('transaction_mode', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        if self.init_command:
+            for statement in self.init_command.split(';'):
+                if statement.strip():
+                    conn.execute(statement)
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode is None:
+            super()._start_transaction_under_autocommit()
+        else:
+            self.cursor().execute(f'BEGIN {self.transaction_mode}')
+
+
+def set_journal_mode(using, **kwargs):
+    """Получатель post_migrate: SQLITE_JOURNAL_MODE для базы using."""
+    connection = connections[using]
+    if isinstance(connection, DatabaseWrapper):
+        mode = settings.SQLITE_JOURNAL_MODE
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA journal_mode={mode}')
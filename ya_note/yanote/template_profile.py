@@ -0,0 +1,228 @@
+"""
+Предварительная компиляция шаблонов и время рендеринга по шаблонам.
+
+warm_up компилирует все шаблоны проекта. С кэширующим загрузчиком
+(settings_production) они остаются в памяти процесса, и первый запрос
+к странице не разбирает base.html и остальные файлы с диска.
+
+Собственное время каждого шаблона считается только в движке,
+настроенном через timed(TEMPLATES): Loader подключает замер к узлам
+загруженных им шаблонов, а встроенные фильтры движка заменяются
+копиями с замером из register этого модуля. Сам Django не меняется,
+и остальные движки работают как обычно.
+
+Узел учитывается в том файле, где он написан, поэтому блок из
+notes/detail.html относится к нему, а не к base.html, а время
+вложенных {% include %} вычитается. Встроенные фильтры учитываются
+отдельно, как «|urlencode», «|date» и т. д. Время
+собирает collect (см. QueryBudgetMiddleware).
+"""
+import functools
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from django.template import Library, TemplateDoesNotExist, engines
+from django.template.base import Node
+from django.template.defaultfilters import register as builtin_filters
+from django.template.loaders.base import Loader as BaseLoader
+from django.template.loaders.cached import Loader as CachedLoader
+
+DJANGO_BACKEND = 'django.template.backends.django.DjangoTemplates'
+UNKNOWN = '<строка>'
+
+_timings = ContextVar('template_timings', default=None)
+
+
+def template_names(engine, include_all=False):
+    """
+    Имена всех шаблонов, которые видят загрузчики движка.
+
+    Без include_all — только файлы внутри BASE_DIR, без шаблонов
+    django.contrib и других установленных пакетов.
+    """
+    names = set()
+    for loader in all_loaders(engine):
+        if not hasattr(loader, 'get_dirs'):
+            continue
+        for directory in map(Path, loader.get_dirs()):
+            if not include_all and settings.BASE_DIR not in directory.parents:
+                continue
+            names.update(
+                path.relative_to(directory).as_posix()
+                for path in directory.rglob('*') if path.is_file()
+            )
+    return sorted(names)
+
+
+def warm_up(include_all=False):
+    """Компилирует шаблоны; возвращает список (имя, секунды)."""
+    engine = engines['django'].engine
+    compiled = []
+    for name in template_names(engine, include_all):
+        start = time.perf_counter()
+        engine.get_template(name)
+        compiled.append((name, time.perf_counter() - start))
+    return compiled
+
+
+def all_loaders(engine):
+    """Загрузчики движка вместе с вложенными."""
+    loaders = list(engine.template_loaders)
+    while loaders:
+        loader = loaders.pop()
+        loaders.extend(getattr(loader, 'loaders', ()))
+        yield loader
+
+
+def is_cached():
+    """Включён ли кэширующий загрузчик шаблонов."""
+    return any(
+        isinstance(loader, CachedLoader)
+        for loader in all_loaders(engines['django'].engine)
+    )
+
+
+def is_timed():
+    """Настроен ли движок через timed()."""
+    return any(
+        isinstance(loader, Loader)
+        for loader in all_loaders(engines['django'].engine)
+    )
+
+
+def measure(name, function, *args, **kwargs):
+    timings, stack = _timings.get()
+    frame = [name, 0.0]
+    stack.append(frame)
+    start = time.perf_counter()
+    try:
+        return function(*args, **kwargs)
+    finally:
+        elapsed = time.perf_counter() - start
+        stack.pop()
+        timings[name] += elapsed - frame[1]
+        if stack:
+            stack[-1][1] += elapsed
+
+
+def timed_filter(name, function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if _timings.get() is None:
+            return function(*args, **kwargs)
+        return measure(f'|{name}', function, *args, **kwargs)
+    return wrapper
+
+
+# Встроенные фильтры с замером. Библиотека подключается через OPTIONS
+# 'builtins' после стандартных и подменяет их только в этом движке.
+register = Library()
+register.filters.update(
+    (name, timed_filter(name, function))
+    for name, function in builtin_filters.filters.items()
+)
+
+
+def timed_render(node, render_annotated, context):
+    state = _timings.get()
+    if state is None:
+        return render_annotated(node, context)
+    origin = getattr(node, 'origin', None)
+    name = getattr(origin, 'template_name', None) or UNKNOWN
+    stack = state[1]
+    if stack and stack[-1][0] == name:
+        return render_annotated(node, context)
+    return measure(name, render_annotated, node, context)
+
+
+def instrument(template):
+    """
+    Подключает замер к узлам шаблона.
+
+    Обёртка ставится атрибутом каждого узла, а не в класс Node, поэтому
+    касается только шаблонов, загруженных через Loader. Без активного
+    collect замер обходится одной проверкой на узел.
+    """
+    if getattr(template, '_timed', False):
+        return
+    for node in template.nodelist.get_nodes_by_type(Node):
+        node.render_annotated = functools.partial(
+            timed_render, node, type(node).render_annotated
+        )
+    template._timed = True
+
+
+class Loader(BaseLoader):
+    """Загрузчик-обёртка: шаблоны вложенных загрузчиков с замером."""
+
+    def __init__(self, engine, loaders):
+        super().__init__(engine)
+        self.loaders = engine.get_template_loaders(loaders)
+
+    def get_dirs(self):
+        for loader in self.loaders:
+            if hasattr(loader, 'get_dirs'):
+                yield from loader.get_dirs()
+
+    def get_template_sources(self, template_name):
+        for loader in self.loaders:
+            yield from loader.get_template_sources(template_name)
+
+    def get_template(self, template_name, skip=None):
+        tried = []
+        for loader in self.loaders:
+            try:
+                template = loader.get_template(template_name, skip=skip)
+            except TemplateDoesNotExist as error:
+                tried.extend(error.tried)
+                continue
+            instrument(template)
+            return template
+        raise TemplateDoesNotExist(template_name, tried=tried)
+
+    def reset(self):
+        for loader in self.loaders:
+            if hasattr(loader, 'reset'):
+                loader.reset()
+
+
+def timed(templates):
+    """
+    Копия настройки TEMPLATES с замером времени в движках Django.
+
+    Загрузчики оборачиваются в Loader (при APP_DIRS — стандартные
+    filesystem и app_directories), а к встроенным фильтрам
+    добавляется register этого модуля.
+    """
+    result = []
+    for config in templates:
+        if config['BACKEND'] != DJANGO_BACKEND:
+            result.append(config)
+            continue
+        options = dict(config.get('OPTIONS', {}))
+        loaders = options.get('loaders')
+        if loaders is None:
+            loaders = ['django.template.loaders.filesystem.Loader']
+            if config.get('APP_DIRS'):
+                loaders.append(
+                    'django.template.loaders.app_directories.Loader'
+                )
+        options['loaders'] = [(f'{__name__}.Loader', loaders)]
+        options['builtins'] = [*options.get('builtins', ()), __name__]
+        result.append({**config, 'APP_DIRS': False, 'OPTIONS': options})
+    return result
+
+
+@contextmanager
+def collect():
+    """Собирает в Counter секунды по шаблонам и фильтрам внутри блока."""
+    timings = Counter()
+    token = _timings.set((timings, []))
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)